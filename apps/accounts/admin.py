@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from .models import User, EmailNotification, OutboxMessage
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -34,4 +34,23 @@ class CustomUserAdmin(UserAdmin):
         if obj.role == User.Role.ORGANIZATION:
             return obj.organization_name
         return f"{obj.first_name} {obj.last_name}"
-    get_display_name.short_description = 'Name'
\ No newline at end of file
+    get_display_name.short_description = 'Name'
+
+
+@admin.register(EmailNotification)
+class EmailNotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'recipient', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('kind', 'status')
+    search_fields = ('recipient',)
+    readonly_fields = ('created_at', 'sent_at')
+    ordering = ('-created_at',)
+
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task_name', 'attempts', 'next_attempt_at', 'parked_at', 'created_at')
+    list_filter = (('parked_at', admin.EmptyFieldListFilter),)
+    search_fields = ('task_name',)
+    readonly_fields = ('created_at',)
+    ordering = ('id',)
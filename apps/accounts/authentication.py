@@ -0,0 +1,87 @@
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from job_portal.db_routing import read_from_primary
+
+logger = logging.getLogger(__name__)
+
+
+def user_cache_key(user_id):
+    return f"users:auth:v2:{user_id}"  # v2: column values, no longer pickled User instances
+
+
+def _cached_fields(user_model):
+    """Every column but the password hash; the revocation check only needs its digest."""
+    return [field.attname for field in user_model._meta.concrete_fields if field.attname != 'password']
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached user once the current transaction commits."""
+    def delete():
+        try:
+            cache.delete(user_cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed for user_id={user_id}: {str(e)}")
+
+    # Deleting after commit keeps a concurrent request from re-caching the old row
+    transaction.on_commit(delete)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that loads request.user from the shared cache, falling
+    back to the database (and repopulating the cache) on a miss. The cache
+    holds the user's columns without the password hash; a cached user is
+    rebuilt with the password deferred, so reading it (or check_password())
+    costs a query and save() leaves it untouched.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)  # Raises InvalidToken
+
+        key = user_cache_key(user_id)
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning(f"User cache read failed for user_id={user_id}: {str(e)}")
+            return super().get_user(validated_token)
+
+        if cached is None:
+            # Filled from a lagging replica, the cache would serve the old row for its whole timeout
+            with read_from_primary():
+                user = super().get_user(validated_token)
+            try:
+                cache.set(key, self.cache_entry(user), timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"User cache write failed for user_id={user_id}: {str(e)}")
+            return user
+
+        fields, password_hash = cached
+        user = self.rebuild_user(fields)
+        # Same checks JWTAuthentication.get_user applies to a freshly loaded user
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    def cache_entry(self, user):
+        """(column values, digest of the password hash as carried by the token)"""
+        fields = {name: getattr(user, name) for name in _cached_fields(self.user_model)}
+        return fields, get_md5_hash_password(user.password)
+
+    def rebuild_user(self, fields):
+        names = _cached_fields(self.user_model)
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model), names, [fields[name] for name in names]
+        )
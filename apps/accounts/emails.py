@@ -0,0 +1,105 @@
+"""
+Email rendering for Celery workers.
+
+Each email template is loaded and compiled once per process together with a
+plain-text template derived from its HTML source. Rendering a message is then
+two in-memory template renders, with no loader lookups or per-message
+strip_tags() pass.
+"""
+import html
+import re
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import engines
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+from .models import EmailNotification
+
+# Template and subject for each kind of email
+EMAIL_KINDS = {
+    EmailNotification.Kind.ACTIVATION: ('emails/activation_email.html', "Activate Your JobBoard Account"),
+    EmailNotification.Kind.PASSWORD_RESET: ('emails/password_reset_email.html', "Password Reset Request"),
+    EmailNotification.Kind.JOB_ALERT: ('emails/job_alert_email.html', "A New Job Matches Your Alert"),
+}
+
+_HEAD_RE = re.compile(r'<head\b.*?</head>', re.IGNORECASE | re.DOTALL)
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+def plain_text_source(html_source):
+    """
+    Derive a plain-text template from an HTML template's source: drop <head>
+    (title and CSS), strip the markup and keep the template variables, which
+    are rendered without HTML escaping.
+    """
+    text = html.unescape(strip_tags(_HEAD_RE.sub('', html_source)))
+    text = '\n'.join(line.strip() for line in text.splitlines())
+    text = _BLANK_LINES_RE.sub('\n\n', text).strip()
+    return f"{{% autoescape off %}}{text}\n{{% endautoescape %}}"
+
+
+class EmailTemplates:
+    """Per-process cache of (subject, HTML template, plain-text template) by email kind."""
+
+    def __init__(self):
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind):
+        compiled = self._compiled.get(kind)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(kind)
+                if compiled is None:
+                    compiled = self._compiled[kind] = self._compile(kind)
+        return compiled
+
+    def _compile(self, kind):
+        template_name, subject = EMAIL_KINDS[kind]
+        html_template = get_template(template_name)
+        text_template = engines['django'].from_string(plain_text_source(html_template.template.source))
+        return subject, html_template, text_template
+
+    def render(self, kind, context):
+        """Return (subject, html, text) for one recipient."""
+        subject, html_template, text_template = self.get(kind)
+        return subject, html_template.render(context), text_template.render(context)
+
+    def render_many(self, kind, contexts):
+        """Render one kind for many recipients; returns [(html, text), ...]."""
+        subject, html_template, text_template = self.get(kind)
+        return [(html_template.render(context), text_template.render(context)) for context in contexts]
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+
+
+email_templates = EmailTemplates()
+
+
+def _message(subject, html_body, text_body, recipient):
+    from_email = f'"JobBoard Support Team" <{settings.EMAIL_HOST_USER}>'
+    message = EmailMultiAlternatives(subject=subject, body=text_body, from_email=from_email, to=[recipient])
+    message.attach_alternative(html_body, "text/html")
+    return message
+
+
+def build_email(kind, recipient, context):
+    """Render one email kind into an HTML + plain text message."""
+    subject, html_body, text_body = email_templates.render(kind, context)
+    return _message(subject, html_body, text_body, recipient)
+
+
+def build_emails(kind, recipients_and_contexts):
+    """Render one email kind for many (recipient, context) pairs in a single pass."""
+    recipients_and_contexts = list(recipients_and_contexts)
+    subject = email_templates.get(kind)[0]
+    rendered = email_templates.render_many(kind, [context for _, context in recipients_and_contexts])
+    return [
+        _message(subject, html_body, text_body, recipient)
+        for (recipient, _), (html_body, text_body) in zip(recipients_and_contexts, rendered)
+    ]
@@ -0,0 +1,81 @@
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from apps.accounts.models import EmailNotification
+from apps.accounts.emails import build_email
+from apps.accounts.tasks import send_with_connection
+
+BACKENDS = {
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+    'file': 'django.core.mail.backends.filebased.EmailBackend',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare messages/sec for one connection per email (the per-task path) "
+        "against one pooled connection per batch (send_queued_emails)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1000, help='Emails per mode (default: 1000).')
+        parser.add_argument('--backend', choices=sorted(BACKENDS), default='locmem')
+        parser.add_argument(
+            '--connect-delay-ms', type=float, default=0.0,
+            help='Simulated connection setup cost (SMTP + TLS handshake and login) added to open().',
+        )
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        delay = options['connect_delay_ms'] / 1000
+        with tempfile.TemporaryDirectory() as file_path:
+            make_connection = self._connection_factory(options['backend'], delay, file_path)
+            per_message = self._run(count, lambda messages: self._send_individually(make_connection, messages))
+            pooled = self._run(count, lambda messages: self._send_pooled(make_connection, messages))
+
+        self.stdout.write(f"{count} messages via {options['backend']} backend, "
+                          f"{options['connect_delay_ms']:.1f} ms connection setup")
+        self.stdout.write(f"  connection per message: {per_message:10.1f} msg/s")
+        self.stdout.write(f"  pooled connection:      {pooled:10.1f} msg/s ({pooled / per_message:.1f}x)")
+
+    def _connection_factory(self, backend, delay, file_path):
+        backend_class = import_string(BACKENDS[backend])
+        kwargs = {'file_path': file_path} if backend == 'file' else {}
+
+        class DelayedOpenBackend(backend_class):
+            def open(self):
+                opened = super().open()
+                time.sleep(delay)
+                return opened
+
+        return lambda: DelayedOpenBackend(fail_silently=False, **kwargs)
+
+    def _run(self, count, send):
+        started = time.perf_counter()
+        messages = [
+            build_email(
+                EmailNotification.Kind.ACTIVATION, f"user{i}@example.com",
+                {'activation_url': f"https://example.com/activate/{i}/", 'user_id': i},
+            )
+            for i in range(count)
+        ]
+        send(messages)
+        return count / (time.perf_counter() - started)
+
+    def _send_individually(self, make_connection, messages):
+        for message in messages:
+            connection = make_connection()
+            connection.open()
+            connection.send_messages([message])
+            connection.close()
+
+    def _send_pooled(self, make_connection, messages):
+        connection = make_connection()
+        connection.open()
+        try:
+            send_with_connection(connection, messages)
+        finally:
+            connection.close()
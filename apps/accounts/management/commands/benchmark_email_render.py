@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from apps.accounts.emails import EMAIL_KINDS, EmailTemplates
+from apps.accounts.models import EmailNotification
+
+
+class Command(BaseCommand):
+    help = "Per-message render cost: render_to_string + strip_tags versus the cached EmailTemplates layer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=5000, help='Recipients rendered per mode (default: 5000).')
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        kind = EmailNotification.Kind.ACTIVATION
+        template_name = EMAIL_KINDS[kind][0]
+        contexts = [
+            {'activation_url': f"https://example.com/activate/{i}/", 'user_id': i} for i in range(count)
+        ]
+
+        def uncached():
+            for context in contexts:
+                html_message = render_to_string(template_name, context)
+                strip_tags(html_message)
+
+        templates = EmailTemplates()
+
+        def cached():
+            for context in contexts:
+                templates.render(kind, context)
+
+        def batched():
+            templates.render_many(kind, contexts)
+
+        self.stdout.write(f"{count} activation emails, mean cost per message:")
+        for label, run in (
+            ('render_to_string + strip_tags', uncached),
+            ('EmailTemplates.render', cached),
+            ('EmailTemplates.render_many', batched),
+        ):
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {label:<30} {elapsed / count * 1_000_000:8.1f} µs")
@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.accounts.outbox import relay_pending
+
+
+class Command(BaseCommand):
+    help = "Publish pending outbox messages to the Celery broker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep relaying, sleeping --interval seconds whenever the outbox is empty.',
+        )
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        while True:
+            published = relay_pending(batch_size)
+            if published:
+                self.stdout.write(f"Published {published} outbox message(s)")
+            if published < batch_size:
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
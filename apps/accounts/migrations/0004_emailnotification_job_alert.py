@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_outbox_message'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailnotification',
+            name='kind',
+            field=models.CharField(choices=[('activation', 'Account activation'), ('password_reset', 'Password reset'), ('job_alert', 'Job alert')], max_length=30),
+        ),
+    ]
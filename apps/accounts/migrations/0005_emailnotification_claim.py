@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_emailnotification_job_alert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailnotification',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='emailnotification',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='emailnotification',
+            index=models.Index(condition=models.Q(('status', 'sending')), fields=['claimed_at'], name='email_sending_idx'),
+        ),
+    ]
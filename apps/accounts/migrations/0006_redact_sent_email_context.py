@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def redact_sent_context(apps, schema_editor):
+    """Sent emails no longer keep their context; drop what earlier sends left behind."""
+    EmailNotification = apps.get_model('accounts', 'EmailNotification')
+    EmailNotification.objects.filter(status='sent').exclude(context={}).update(context={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_emailnotification_claim'),
+    ]
+
+    operations = [
+        migrations.RunPython(redact_sent_context, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.db import models
+from django.utils import timezone
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -55,3 +56,73 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         ordering = ['-date_joined']
+
+
+class EmailNotification(models.Model):
+    """An outgoing email waiting to be sent in a batch by send_queued_emails."""
+
+    class Kind(models.TextChoices):
+        ACTIVATION = 'activation', 'Account activation'
+        PASSWORD_RESET = 'password_reset', 'Password reset'
+        JOB_ALERT = 'job_alert', 'Job alert'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENDING = 'sending', 'Sending'  # Claimed by a send_queued_emails worker
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    recipient = models.EmailField()
+    context = models.JSONField(default=dict, blank=True)  # Emptied once sent: it holds live tokens
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The drain query only ever looks at pending rows, oldest first
+            models.Index(
+                fields=['id'], name='email_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+            # Claims abandoned by a crashed worker are found by age
+            models.Index(
+                fields=['claimed_at'], name='email_sending_idx',
+                condition=models.Q(status='sending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} -> {self.recipient} ({self.status})"
+
+
+class OutboxMessage(models.Model):
+    """
+    A Celery task call recorded in the same transaction as the data it is
+    about. relay_outbox publishes pending rows to the broker and deletes them.
+    A row that fails to publish waits until next_attempt_at (backing off
+    exponentially) and is parked after OUTBOX_MAX_ATTEMPTS; clearing
+    parked_at puts it back in the queue.
+    """
+
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    parked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The relay only ever looks at unparked rows, oldest first
+            models.Index(fields=['id'], name='outbox_pending_idx', condition=models.Q(parked_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} #{self.pk}"
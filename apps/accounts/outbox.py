@@ -0,0 +1,90 @@
+"""
+Transactional outbox for Celery tasks.
+
+enqueue_task() writes an OutboxMessage inside the caller's transaction
+instead of talking to the broker, so the task exists exactly when the data
+it refers to was committed, and a slow or unreachable broker never reaches
+the request path. relay_pending() publishes the rows in bulk over one
+producer connection (at-least-once: a crash between publishing and deleting
+a row publishes it again). A row that fails is retried with exponential
+backoff and parked after OUTBOX_MAX_ATTEMPTS, so it never holds up the rows
+queued behind it.
+"""
+import logging
+from datetime import timedelta
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_task(task, *args, **kwargs):
+    """
+    Record task.delay(*args, **kwargs) as an OutboxMessage row; nothing is
+    published here. The row commits or rolls back with the caller's
+    transaction, and relay_pending() publishes it once it is committed.
+    """
+    return OutboxMessage.objects.create(task_name=task.name, args=list(args), kwargs=kwargs)
+
+
+def enqueue_tasks(task, calls):
+    """enqueue_task() for many calls of one task (tuples of positional arguments), in one INSERT."""
+    return OutboxMessage.objects.bulk_create(
+        [OutboxMessage(task_name=task.name, args=list(args)) for args in calls]
+    )
+
+
+def relay_pending(batch_size):
+    """Publish up to batch_size pending messages; returns how many were published."""
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(parked_at__isnull=True, next_attempt_at__lte=timezone.now())
+            .order_by('id')[:batch_size]
+        )
+        if not messages:
+            return 0
+
+        published, failed, error = [], None, ''
+        try:
+            with current_app.producer_or_acquire() as producer:
+                for message in messages:
+                    _publish(message, producer)
+                    published.append(message.id)
+        except Exception as e:
+            failed, error = messages[len(published)], str(e)
+            logger.error(f"Outbox relay stopped at message id={failed.id} ({failed.task_name}): {str(e)}")
+
+        OutboxMessage.objects.filter(id__in=published).delete()
+        if failed is not None:
+            _record_failure(failed, error)
+    return len(published)
+
+
+def _record_failure(message, error):
+    """Back the message off (OUTBOX_RETRY_DELAY, doubling per attempt), or park it once out of attempts."""
+    message.attempts += 1
+    message.last_error = error
+    now = timezone.now()
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.parked_at = now
+        logger.critical(
+            f"Outbox message id={message.id} ({message.task_name}) parked after {message.attempts} attempts"
+        )
+    else:
+        delay = min(settings.OUTBOX_RETRY_DELAY * 2 ** (message.attempts - 1), settings.OUTBOX_MAX_RETRY_DELAY)
+        message.next_attempt_at = now + timedelta(seconds=delay)
+    message.save(update_fields=['attempts', 'last_error', 'next_attempt_at', 'parked_at'])
+
+
+def _publish(message, producer):
+    task = current_app.tasks.get(message.task_name)
+    if task is not None:
+        task.apply_async(args=message.args, kwargs=message.kwargs, producer=producer)
+    else:
+        current_app.send_task(message.task_name, args=message.args, kwargs=message.kwargs, producer=producer)
@@ -1,85 +1,186 @@
 import logging
+import smtplib
+from datetime import timedelta
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
 from django.conf import settings
 from django.template import TemplateDoesNotExist
+from .emails import build_email
+from .models import EmailNotification
+from .outbox import relay_pending
 
 logger = logging.getLogger(__name__)
 
-@shared_task(bind=True, max_retries=3)
-def send_activation_email(self, user_id, activation_url, email):
-    try:
-        email_html_message = render_to_string(
-            'emails/activation_email.html',
-            {'activation_url': activation_url, 'user_id': user_id}
-        )
-    except TemplateDoesNotExist as e:
-        logger.error(f"Template error for user_id={user_id}, email={email}: {str(e)}")
-        return False
-    email_plain_message = strip_tags(email_html_message)
-    from_email = f'"JobBoard Support Team" <{settings.EMAIL_HOST_USER}>'
-    email = EmailMultiAlternatives(
-        subject="Activate Your JobBoard Account",
-        body=email_plain_message,
-        from_email=from_email,
-        to=[email],
-    )
-    email.attach_alternative(email_html_message, "text/html")
-    try:
-        email.send(fail_silently=False)
-        logger.info(f"Activation email sent successfully to {email} for user_id={user_id}")
-    except Exception as e:
-        logger.error(f"Failed to send activation email to {email} for user_id={user_id}: {str(e)}")
+
+def queue_email(kind, recipient, context):
+    """Store an email for the next send_queued_emails batch."""
+    return EmailNotification.objects.create(kind=kind, recipient=recipient, context=context)
+
+
+def send_with_connection(connection, messages):
+    """
+    Send messages one by one over an already open connection and return
+    (sent, error) per message, reconnecting once if the server drops us.
+    """
+    outcomes = []
+    for message in messages:
         try:
-            self.retry(countdown=60)  # Retry after 60 seconds
-        except self.MaxRetriesExceededError:
-            logger.critical(f"Max retries exceeded for sending activation email to {email} for user_id={user_id}")
-            return False
-        return False
-    return True
+            try:
+                sent = connection.send_messages([message])
+            except smtplib.SMTPServerDisconnected:
+                connection.close()
+                connection.open()
+                sent = connection.send_messages([message])
+            outcomes.append((bool(sent), None))
+        except Exception as e:
+            outcomes.append((False, str(e)))
+    return outcomes
 
 
-@shared_task(bind=True, max_retries=3)
-def send_password_reset_email(self, user_id, reset_url, email):
+@shared_task
+def send_queued_emails(batch_size=None, max_batches=None):
+    """
+    Drain pending EmailNotification rows in batches of EMAIL_BATCH_SIZE over a
+    single authenticated mail connection. Each batch is claimed in a short
+    transaction (SKIP LOCKED, so several workers can drain the queue
+    concurrently) and sent after it commits, so no row lock is held while
+    talking to the mail server. The connection is only opened once a batch
+    has been claimed: beat runs this every few seconds, mostly on an empty
+    queue. Returns the per-message outcomes.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    max_batches = max_batches or settings.EMAIL_MAX_BATCHES_PER_TASK
+    _release_stale_claims()
+    outcomes = []
+    connection = None
     try:
-        # Render HTML email template
-        email_html_message = render_to_string(
-            'emails/password_reset_email.html',  # Updated to match folder naming style
-            {
-                'reset_url': reset_url,
-                'expiry_hours': 1  # Matches token expiry
-            }
-        )
-    except TemplateDoesNotExist as e:
-        logger.error(f"Template error for password reset user_id={user_id}, email={email}: {str(e)}")
-        return False
-
-    # Create plain text version
-    email_plain_message = strip_tags(email_html_message)
-    from_email = f'"JobBoard Support Team" <{settings.EMAIL_HOST_USER}>'
-
-    # Prepare email with both HTML & plain text
-    email_msg = EmailMultiAlternatives(
-        subject="Password Reset Request",
-        body=email_plain_message,
-        from_email=from_email,
-        to=[email],
-    )
-    email_msg.attach_alternative(email_html_message, "text/html")
+        for _ in range(max_batches):
+            notifications = _claim_batch(batch_size)
+            if not notifications:
+                break
+            if connection is None:
+                connection = _open_connection(notifications)
+            outcomes.extend(_send_batch(connection, notifications))
+            if len(notifications) < batch_size:
+                break
+    finally:
+        if connection is not None:
+            connection.close()
+
+    if outcomes:
+        sent = sum(1 for outcome in outcomes if outcome['sent'])
+        logger.info(f"Email batch finished: {sent} sent, {len(outcomes) - sent} not sent")
+    return outcomes
+
 
+def _open_connection(notifications):
+    """Open the mail connection, handing the claimed rows back if the server cannot be reached."""
+    connection = get_connection(fail_silently=False)
     try:
-        email_msg.send(fail_silently=False)
-        logger.info(f"Password reset email sent successfully to {email} for user_id={user_id}")
+        connection.open()
     except Exception as e:
-        logger.error(f"Failed to send password reset email to {email} for user_id={user_id}: {str(e)}")
+        # Not counted as an attempt: nothing was sent, and the next run tries again
+        EmailNotification.objects.filter(id__in=[notification.id for notification in notifications]).update(
+            status=EmailNotification.Status.PENDING, claimed_at=None,
+        )
+        logger.error(f"Cannot open mail connection, {len(notifications)} emails left pending: {str(e)}")
+        raise
+    return connection
+
+
+def _release_stale_claims():
+    """Put back rows claimed by a worker that died before recording the outcome."""
+    stale_before = timezone.now() - timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT)
+    released = EmailNotification.objects.filter(
+        status=EmailNotification.Status.SENDING, claimed_at__lt=stale_before,
+    ).update(status=EmailNotification.Status.PENDING, claimed_at=None)
+    if released:
+        logger.warning(f"Released {released} email claims older than {settings.EMAIL_CLAIM_TIMEOUT}s")
+
+
+def _claim_batch(batch_size):
+    with transaction.atomic():
+        notifications = list(
+            EmailNotification.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailNotification.Status.PENDING)
+            .order_by('id')[:batch_size]
+        )
+        now = timezone.now()
+        for notification in notifications:
+            notification.status = EmailNotification.Status.SENDING
+            notification.claimed_at = now
+        EmailNotification.objects.bulk_update(notifications, ['status', 'claimed_at'])
+    return notifications
+
+
+def _send_batch(connection, notifications):
+    messages, sendable, outcomes = [], [], []
+    for notification in notifications:
         try:
-            self.retry(countdown=60)  # Retry after 60 seconds
-        except self.MaxRetriesExceededError:
-            logger.critical(f"Max retries exceeded for sending password reset email to {email} for user_id={user_id}")
-            return False
-        return False
+            messages.append(build_email(notification.kind, notification.recipient, notification.context))
+            sendable.append(notification)
+        except (KeyError, TemplateDoesNotExist) as e:
+            _record_failure(notification, f"Cannot render email: {str(e)}", final=True)
+            outcomes.append(_outcome(notification, False, notification.last_error))
+
+    results = send_with_connection(connection, messages)
+    now = timezone.now()
+    for notification, (sent, error) in zip(sendable, results):
+        if sent:
+            notification.status = EmailNotification.Status.SENT
+            notification.sent_at = now
+            notification.attempts += 1
+            notification.claimed_at = None
+            notification.context = {}  # Activation and reset links stay valid for a while
+        else:
+            _record_failure(notification, error or "Backend reported the message as not sent")
+            logger.error(f"Failed to send {notification.kind} email to {notification.recipient}: {error}")
+        outcomes.append(_outcome(notification, sent, error))
+
+    EmailNotification.objects.bulk_update(
+        notifications, ['status', 'attempts', 'last_error', 'sent_at', 'claimed_at', 'context']
+    )
+    return outcomes
+
+
+def _record_failure(notification, error, final=False):
+    notification.attempts += 1
+    notification.last_error = error
+    notification.claimed_at = None
+    if final or notification.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        notification.status = EmailNotification.Status.FAILED
+    else:
+        notification.status = EmailNotification.Status.PENDING  # Retried by a later batch
 
+
+def _outcome(notification, sent, error):
+    return {'id': notification.id, 'recipient': notification.recipient, 'sent': sent, 'error': error}
+
+
+@shared_task
+def relay_outbox(batch_size=None):
+    """Publish pending outbox rows to the broker until the outbox is empty."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    total = 0
+    while True:
+        published = relay_pending(batch_size)
+        total += published
+        if published < batch_size:
+            return total
+
+
+# Registration and password reset queue their emails directly (see queue_email); these
+# tasks only drain outbox messages recorded before that, through the same batches.
+
+@shared_task
+def send_activation_email(user_id, activation_url, email):
+    queue_email(EmailNotification.Kind.ACTIVATION, email, {'activation_url': activation_url, 'user_id': user_id})
     return True
 
+
+@shared_task
+def send_password_reset_email(user_id, reset_url, email):
+    queue_email(EmailNotification.Kind.PASSWORD_RESET, email, {'reset_url': reset_url, 'expiry_hours': 1})
+    return True
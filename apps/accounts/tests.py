@@ -1,3 +1,476 @@
-from django.test import TestCase
+import datetime
+import smtplib
+import threading
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.jobs.models import Application, Category, Job
+from apps.jobs.tests import QueryCountTestCase
+from job_portal.db_routing import RoutingState, _current
+from .authentication import CachedJWTAuthentication, user_cache_key
+from .emails import EMAIL_KINDS, email_templates
+from .models import EmailNotification, OutboxMessage, User
+from .outbox import enqueue_task, relay_pending
+from .tasks import queue_email, send_queued_emails
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AccountEndpointQueryCountTests(QueryCountTestCase):
+    """
+    Every route in apps/accounts/urls.py, measured with 9 and 90 other
+    users in the table and, for the profile routes, 9 and 90 applications.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seeker = User.objects.create_user(
+            'account-seeker@example.com', 'old-password', role=User.Role.JOB_SEEKER,
+            first_name='Account', last_name='Seeker',
+        )
+
+    def seed_users(self, size):
+        existing = User.objects.filter(email__startswith='member-').count()
+        User.objects.bulk_create([
+            User(email=f'member-{existing + i}@example.com', role=User.Role.JOB_SEEKER, first_name='Member')
+            for i in range(size - existing)
+        ])
+
+    def seed_applications(self, seeker, size):
+        organization, _ = User.objects.get_or_create(
+            email='account-org@example.com',
+            defaults={'role': User.Role.ORGANIZATION, 'organization_name': 'Accounts'},
+        )
+        category, _ = Category.objects.get_or_create(title='Accounts')
+        for i in range(size - seeker.applications.count()):
+            job = Job.objects.create(
+                organization=organization, category=category, title=f'Opening {size}-{i}',
+                description='Open role', location='Remote',
+            )
+            Application.objects.create(job=job, seeker=seeker, phone='0123', message='Hello')
+
+    def token(self, user, hours=1, **claims):
+        expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=hours)
+        return jwt.encode({'user_id': user.id, 'exp': expires, **claims}, settings.SECRET_KEY, algorithm='HS256')
+
+    def test_register(self):
+        self.assertQueryCeiling(5, lambda size: self.client_for().post('/api/register/', {
+            'email': f'new-{size}@example.com', 'password': 'a-long-password', 'confirm_password': 'a-long-password',
+            'role': User.Role.JOB_SEEKER, 'first_name': 'New', 'last_name': 'Member',
+        }, format='json'), self.seed_users)
+
+    def test_activate(self):
+        users = {}
+
+        def seed(size):
+            self.seed_users(size)
+            users[size] = User.objects.create_user(
+                f'inactive-{size}@example.com', 'password', role=User.Role.JOB_SEEKER, is_active=False,
+            )
+        self.assertQueryCeiling(
+            2, lambda size: self.client_for().get(f'/api/activate/{self.token(users[size], hours=24)}/'), seed,
+        )
+
+    def test_login(self):
+        self.assertQueryCeiling(1, lambda size: self.client_for().post('/api/login/', {
+            'email': self.seeker.email, 'password': 'old-password',
+        }, format='json'), self.seed_users)
+
+    def test_logout(self):
+        client = self.client_for(self.seeker)
+        self.assertQueryCeiling(0, lambda size: client.post('/api/logout/'), self.seed_users)
+
+    def test_token_refresh(self):
+        client = self.client_for()
+        client.cookies['refresh_token'] = str(RefreshToken.for_user(self.seeker))
+        self.assertQueryCeiling(1, lambda size: client.post('/api/token/refresh/'), self.seed_users)
+
+    def test_password_reset_request(self):
+        self.assertQueryCeiling(3, lambda size: self.client_for().post('/api/password-reset/request/', {
+            'email': self.seeker.email,
+        }, format='json'), self.seed_users)
+
+    def test_password_reset_confirm(self):
+        self.assertQueryCeiling(2, lambda size: self.client_for().post(
+            f'/api/password-reset/confirm/{self.token(self.seeker, type="password_reset")}/',
+            {'new_password': f'Fresh-password-{size}', 'confirm_new_password': f'Fresh-password-{size}'},
+            format='json',
+        ), self.seed_users)
+
+    def test_profile_list(self):
+        client = self.client_for(self.seeker)
+
+        def seed(size):
+            self.seed_users(size)
+            self.seed_applications(self.seeker, size)
+        self.assertQueryCeiling(1, lambda size: client.get('/api/profile/'), seed)
+
+    def test_profile_detail(self):
+        client = self.client_for(self.seeker)
+        self.assertQueryCeiling(1, lambda size: client.get(f'/api/profile/{self.seeker.id}/'), self.seed_users)
+
+    def test_profile_update(self):
+        client = self.client_for(self.seeker)
+        self.assertQueryCeiling(2, lambda size: client.patch(f'/api/profile/{self.seeker.id}/', {
+            'first_name': f'Renamed {size}',
+        }, format='json'), self.seed_users)
+
+    def test_profile_delete(self):
+        users = {}
+
+        def seed(size):
+            users[size] = User.objects.create_user(
+                f'leaving-{size}@example.com', 'password', role=User.Role.JOB_SEEKER,
+                first_name='Leaving', last_name='Seeker',
+            )
+            self.seed_applications(users[size], size)
+        self.assertQueryCeiling(
+            10, lambda size: self.client_for(users[size]).delete(f'/api/profile/{users[size].id}/'), seed,
+        )
+
+
+class OutboxTests(TestCase):
+    """enqueue_task() only writes a row; relay_pending() publishes it, through a stand-in Celery app."""
+
+    def setUp(self):
+        self.task = mock.Mock()
+        self.task.name = 'accounts.outbox_test_task'
+        app = mock.MagicMock()
+        app.tasks = {self.task.name: self.task}
+        patcher = mock.patch('apps.accounts.outbox.current_app', app)
+        self.app = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rolled_back_transaction_leaves_no_message(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                enqueue_task(self.task, 1, kind='rollback')
+                self.assertEqual(OutboxMessage.objects.count(), 1)
+                raise RuntimeError('Roll back')
+        self.assertFalse(OutboxMessage.objects.exists())
+        self.task.delay.assert_not_called()
+        self.task.apply_async.assert_not_called()
+
+    def test_relay_publishes_each_message_once(self):
+        for i in range(3):
+            enqueue_task(self.task, i, kind='relay')
+        self.task.apply_async.assert_not_called()  # Nothing goes out at enqueue time
+
+        self.assertEqual(relay_pending(batch_size=2), 2)
+        self.assertEqual(relay_pending(batch_size=2), 1)
+        self.assertEqual(relay_pending(batch_size=2), 0)
+
+        producer = self.app.producer_or_acquire.return_value.__enter__.return_value
+        self.assertEqual(self.task.apply_async.call_args_list, [
+            mock.call(args=[i], kwargs={'kind': 'relay'}, producer=producer) for i in range(3)
+        ])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_failed_publish_is_kept_for_the_next_relay(self):
+        for i in range(2):
+            enqueue_task(self.task, i)
+        self.task.apply_async.side_effect = [None, ConnectionError('Broker down')]
+        with self.assertLogs('apps.accounts.outbox', 'ERROR'):
+            self.assertEqual(relay_pending(batch_size=10), 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.args, message.attempts, message.last_error), ([1], 1, 'Broker down'))
+
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=3)
+    def test_failing_message_backs_off_and_is_parked_without_blocking_the_rest(self):
+        broken = mock.Mock()
+        broken.name = 'accounts.unregistered_task'
+        broken.apply_async.side_effect = ValueError('Unknown task')
+        self.app.tasks[broken.name] = broken
+        head = enqueue_task(broken)
+        for i in range(3):
+            enqueue_task(self.task, i)
+
+        def due_now():
+            OutboxMessage.objects.update(next_attempt_at=datetime.datetime.now(datetime.timezone.utc))
+
+        published = []
+        for run in range(3):
+            with self.assertLogs('apps.accounts.outbox', 'ERROR'):
+                published.append(relay_pending(batch_size=10))
+            head.refresh_from_db()
+            self.assertEqual(head.attempts, run + 1)
+            if run < 2:
+                self.assertGreater(head.next_attempt_at, datetime.datetime.now(datetime.timezone.utc))
+                # Backed off, so the next run publishes the rest instead of failing on it again
+                self.assertEqual(relay_pending(batch_size=10), 3 if run == 0 else 0)
+                due_now()
+        self.assertEqual(published, [0, 0, 0])
+        self.assertIsNotNone(head.parked_at)
+        self.assertEqual(self.task.apply_async.call_count, 3)
+
+        due_now()
+        self.assertEqual(relay_pending(batch_size=10), 0)  # Parked: never tried again
+        self.assertEqual(broken.apply_async.call_count, 3)
+
+    def test_backoff_doubles_per_failure(self):
+        self.task.apply_async.side_effect = ValueError('Unknown task')
+        message = enqueue_task(self.task)
+        delays = []
+        for _ in range(3):
+            OutboxMessage.objects.update(next_attempt_at=datetime.datetime.now(datetime.timezone.utc))
+            before = datetime.datetime.now(datetime.timezone.utc)
+            with self.assertLogs('apps.accounts.outbox', 'ERROR'):
+                relay_pending(batch_size=10)
+            message.refresh_from_db()
+            delays.append(round((message.next_attempt_at - before).total_seconds()))
+        retry = settings.OUTBOX_RETRY_DELAY
+        self.assertEqual(delays, [retry, retry * 2, retry * 4])
+
+
+class OutboxConcurrentRelayTests(TransactionTestCase):
+    """Two relays share the table without publishing the same row."""
+
+    def test_relay_skips_rows_locked_by_another_relay(self):
+        task = mock.Mock()
+        task.name = 'accounts.outbox_test_task'
+        first, second = (OutboxMessage.objects.create(task_name=task.name, args=[i]) for i in range(2))
+        locked, release = threading.Event(), threading.Event()
+
+        def other_relay():
+            # Holds first's row lock in its own connection, as a relay mid-publish would
+            try:
+                with transaction.atomic():
+                    list(OutboxMessage.objects.select_for_update().filter(pk=first.pk))
+                    locked.set()
+                    release.wait(timeout=10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=other_relay)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(timeout=10))
+            app = mock.MagicMock()
+            app.tasks = {task.name: task}
+            with mock.patch('apps.accounts.outbox.current_app', app):
+                self.assertEqual(relay_pending(batch_size=10), 1)
+        finally:
+            release.set()
+            thread.join()
+
+        task.apply_async.assert_called_once_with(args=[1], kwargs={}, producer=mock.ANY)
+        self.assertEqual(list(OutboxMessage.objects.values_list('pk', flat=True)), [first.pk])
+        self.assertFalse(OutboxMessage.objects.filter(pk=second.pk).exists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CachedJWTAuthenticationTests(TestCase):
+    """The cached user carries no password hash and passes the same checks as a loaded one."""
+
+    def setUp(self):
+        cache.clear()
+        # simplejwt modules keep the api_settings they imported, so SIMPLE_JWT
+        # overrides would not reach them; token revocation is patched on instead
+        for module in ('rest_framework_simplejwt.tokens', 'apps.accounts.authentication'):
+            patcher = mock.patch(f'{module}.api_settings.CHECK_REVOKE_TOKEN', True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            'cached@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Cached',
+        )
+        self.authentication = CachedJWTAuthentication()
+
+    def get_user(self, token=None):
+        token = token or AccessToken.for_user(self.user)
+        return self.authentication.get_user(self.authentication.get_validated_token(str(token).encode()))
+
+    def test_cache_holds_no_password_hash(self):
+        self.get_user()
+        fields, password_hash = cache.get(user_cache_key(self.user.id))
+        self.assertNotIn('password', fields)
+        self.assertNotIn(self.user.password, [*map(str, fields.values()), password_hash])
+        self.assertEqual(fields['email'], 'cached@example.com')
+
+    def test_cached_user_is_rebuilt_without_queries(self):
+        self.get_user()
+        with self.assertNumQueries(0):
+            user = self.get_user()
+        self.assertEqual(
+            (user.pk, user.email, user.role, user.organization_name, user.is_active),
+            (self.user.pk, 'cached@example.com', User.Role.ORGANIZATION, 'Cached', True),
+        )
+        self.assertEqual(user.get_deferred_fields(), {'password'})
+        self.assertFalse(user._state.adding)
+
+    def test_saving_a_cached_user_keeps_the_password(self):
+        self.get_user()
+        user = self.get_user()
+        user.organization_name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.organization_name, 'Renamed')
+        self.assertTrue(self.user.check_password('password'))
+        self.assertTrue(user.check_password('password'))  # Loads the deferred hash
+
+    def test_password_change_revokes_tokens_served_from_cache(self):
+        old_token = AccessToken.for_user(self.user)
+        self.user.set_password('new-password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.get_user()  # Caches the user as it is now
+        with self.assertNumQueries(0), self.assertRaises(AuthenticationFailed):
+            self.get_user(old_token)
+
+    def test_cache_miss_loads_the_user_from_the_primary(self):
+        routing = RoutingState('replica_0')
+        token = _current.set(routing)
+        self.addCleanup(_current.reset, token)
+        load, replicas = JWTAuthentication.get_user, []
+
+        def get_user(authentication, validated_token):
+            replicas.append(_current.get().replica)
+            return load(authentication, validated_token)
+
+        with mock.patch.object(JWTAuthentication, 'get_user', autospec=True, side_effect=get_user):
+            self.get_user()
+            self.get_user()  # Cached
+        self.assertEqual(replicas, [None])
+        self.assertEqual(routing.replica, 'replica_0')
+
+    def test_inactive_cached_user_is_rejected(self):
+        self.get_user()
+        fields, password_hash = cache.get(user_cache_key(self.user.id))
+        cache.set(user_cache_key(self.user.id), ({**fields, 'is_active': False}, password_hash))
+        with self.assertRaises(AuthenticationFailed):
+            self.get_user()
+
+
+class SendQueuedEmailsTests(TestCase):
+    """Claiming, sending, retrying and releasing queued emails, through the locmem backend."""
+
+    def queue(self, count=1, kind=EmailNotification.Kind.ACTIVATION):
+        return [
+            queue_email(kind, f'user{i}@example.com', {'activation_url': f'https://example.com/activate/{i}/'})
+            for i in range(count)
+        ]
+
+    def failing_connection(self, error):
+        connection = mock.MagicMock()
+        connection.send_messages.side_effect = error
+        return mock.patch('apps.accounts.tasks.get_connection', return_value=connection)
+
+    def test_empty_queue_opens_no_connection(self):
+        with mock.patch('apps.accounts.tasks.get_connection') as get_connection:
+            self.assertEqual(send_queued_emails(), [])
+        get_connection.assert_not_called()
+
+    def test_batches_are_claimed_sent_and_redacted(self):
+        notifications = self.queue(5)
+        outcomes = send_queued_emails(batch_size=2)
+        self.assertEqual([outcome['sent'] for outcome in outcomes], [True] * 5)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [n.recipient for n in notifications])
+        self.assertIn('https://example.com/activate/0/', mail.outbox[0].body)
+        for notification in EmailNotification.objects.all():
+            self.assertEqual(notification.status, EmailNotification.Status.SENT)
+            self.assertEqual((notification.attempts, notification.context), (1, {}))
+            self.assertIsNotNone(notification.sent_at)
+            self.assertIsNone(notification.claimed_at)
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=2)
+    def test_failed_send_is_retried_then_given_up(self):
+        [notification] = self.queue()
+        with self.failing_connection(smtplib.SMTPRecipientsRefused({})), self.assertLogs('apps.accounts.tasks', 'ERROR'):
+            self.assertFalse(send_queued_emails()[0]['sent'])
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (EmailNotification.Status.PENDING, 1))
+        self.assertNotEqual(notification.last_error, '')
+        self.assertNotEqual(notification.context, {})  # Kept for the retry
+
+        with self.failing_connection(smtplib.SMTPRecipientsRefused({})), self.assertLogs('apps.accounts.tasks', 'ERROR'):
+            send_queued_emails()
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (EmailNotification.Status.FAILED, 2))
+        self.assertEqual(send_queued_emails(), [])  # Not picked up again
+
+    def test_unrenderable_email_fails_without_retry(self):
+        [notification] = self.queue(kind='unknown')
+        [outcome] = send_queued_emails()
+        self.assertFalse(outcome['sent'])
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (EmailNotification.Status.FAILED, 1))
+        self.assertEqual(mail.outbox, [])
+
+    def test_stale_claims_are_released_and_fresh_ones_kept(self):
+        stale, fresh = self.queue(2)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        EmailNotification.objects.filter(pk=stale.pk).update(
+            status=EmailNotification.Status.SENDING,
+            claimed_at=now - datetime.timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT + 1),
+        )
+        EmailNotification.objects.filter(pk=fresh.pk).update(status=EmailNotification.Status.SENDING, claimed_at=now)
+        with self.assertLogs('apps.accounts.tasks', 'WARNING'):
+            [outcome] = send_queued_emails()
+        self.assertEqual(outcome['id'], stale.pk)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, EmailNotification.Status.SENDING)  # Its worker may still be sending
+
+    def test_unreachable_server_leaves_claims_pending(self):
+        [notification] = self.queue()
+        connection = mock.MagicMock()
+        connection.open.side_effect = ConnectionRefusedError('No server')
+        with mock.patch('apps.accounts.tasks.get_connection', return_value=connection), \
+                self.assertLogs('apps.accounts.tasks', 'ERROR'), self.assertRaises(ConnectionRefusedError):
+            send_queued_emails()
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (EmailNotification.Status.PENDING, 0))
+
+
+class EmailTemplateTests(SimpleTestCase):
+    """Plain-text parts are derived from the HTML templates: no markup, links and values kept verbatim."""
+
+    CONTEXTS = {
+        EmailNotification.Kind.ACTIVATION: {
+            'activation_url': 'https://jobs.example.com/activate/?uid=MQ&token=abc-123',
+        },
+        EmailNotification.Kind.PASSWORD_RESET: {
+            'reset_url': 'https://jobs.example.com/reset/?uid=MQ&token=def-456',
+        },
+        EmailNotification.Kind.JOB_ALERT: {
+            'first_name': 'Rahim', 'job_title': 'Backend developer', 'organization_name': 'R&D Labs',
+            'category': 'Engineering', 'location': 'Dhaka', 'salary': '3000.00',
+            'job_url': 'https://jobs.example.com/jobs/backend-developer/?ref=alert&src=email',
+        },
+    }
+
+    def setUp(self):
+        email_templates.clear()
+        self.addCleanup(email_templates.clear)
+
+    def test_every_kind_has_a_context(self):
+        self.assertEqual(set(self.CONTEXTS), set(EMAIL_KINDS))
+
+    def test_text_part_has_no_markup_and_keeps_links(self):
+        for kind, context in self.CONTEXTS.items():
+            with self.subTest(kind=kind):
+                subject, html_body, text_body = email_templates.render(kind, context)
+                self.assertEqual(subject, EMAIL_KINDS[kind][1])
+                self.assertNotRegex(text_body, r'[<>]')
+                self.assertNotIn('font-family', text_body)  # <head> CSS dropped
+                self.assertNotIn('&amp;', text_body)
+                for value in context.values():
+                    self.assertIn(value, text_body)
+                url = next(value for name, value in context.items() if name.endswith('_url'))
+                self.assertIn(f'href="{url.replace("&", "&amp;")}"', html_body)
+
+    def test_render_many_matches_render(self):
+        kind = EmailNotification.Kind.PASSWORD_RESET
+        other = {'reset_url': 'https://jobs.example.com/reset/?uid=Mg&token=ghi-789'}
+        self.assertEqual(
+            email_templates.render_many(kind, [self.CONTEXTS[kind], other]),
+            [email_templates.render(kind, context)[1:] for context in (self.CONTEXTS[kind], other)],
+        )
@@ -1,14 +1,14 @@
 import logging
 from django.conf import settings
-from celery.exceptions import OperationalError
 from django.contrib.auth import authenticate
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import viewsets, status
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework.permissions import IsAuthenticated
-from .models import User
+from .models import EmailNotification, User
 from .serializers import (
     RegistrationSerializer, 
     UserProfileSerializer, 
@@ -19,10 +19,7 @@ from django.urls import reverse
 from django.shortcuts import redirect
 import jwt
 import datetime
-from .tasks import (
-    send_activation_email, 
-    send_password_reset_email
-)
+from .tasks import queue_email
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -38,33 +35,31 @@ class RegistrationView(APIView):
             )
 
         try:
-            # Create inactive user
-            user = serializer.save(is_active=False)
-            logger.info(f"User created with id={user.id}, email={user.email}")
+            # User row and activation email are committed together;
+            # send_queued_emails delivers it in the next batch.
+            with transaction.atomic():
+                # Create inactive user
+                user = serializer.save(is_active=False)
+                logger.info(f"User created with id={user.id}, email={user.email}")
+
+                # Generate activation token (expires in 24 hours)
+                expiration_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=24)
+                token = jwt.encode(
+                    {"user_id": user.id, "exp": expiration_time},
+                    settings.SECRET_KEY,
+                    algorithm="HS256"
+                )
 
-            # Generate activation token (expires in 24 hours)
-            expiration_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=24)
-            token = jwt.encode(
-                {"user_id": user.id, "exp": expiration_time},
-                settings.SECRET_KEY,
-                algorithm="HS256"
-            )
+                # Generate activation URL dynamically
+                activation_url = request.build_absolute_uri(reverse('activate-account', args=[token]))
+                logger.debug(f"Activation URL generated: {activation_url}")
 
-            # Generate activation URL dynamically
-            activation_url = request.build_absolute_uri(reverse('activate-account', args=[token]))
-            logger.debug(f"Activation URL generated: {activation_url}")
-
-            # Send activation email via Celery
-            try:
-                task = send_activation_email.delay(user.id, activation_url, user.email)
-                logger.info(f"Activation email task queued for user_id={user.id}, email={user.email}, task_id={task.id}")
-            except OperationalError as e:
-                logger.error(f"Failed to queue activation email task for user_id={user.id}, email={user.email}: {str(e)}")
-                user.delete()  # Rollback user creation
-                return Response(
-                    {"status": "error", "message": "Failed to connect to task queue. Please try again."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                # Queue the activation email for the next batch
+                notification = queue_email(
+                    EmailNotification.Kind.ACTIVATION, user.email,
+                    {'activation_url': activation_url, 'user_id': user.id},
                 )
+                logger.info(f"Activation email queued for user_id={user.id}, email={user.email}, notification_id={notification.id}")
 
             return Response(
                 {"status": "success", "message": "User registered. Check your email to activate your account."},
@@ -235,16 +230,12 @@ class PasswordResetRequestView(APIView):
             reset_url = request.build_absolute_uri(reverse('password-reset-confirm', args=[token]))
             logger.info(f"Password reset URL generated for user_id={user.id}: {reset_url}")
 
-            # Send password reset email via Celery
-            try:
-                task = send_password_reset_email.delay(user.id, reset_url, user.email)
-                logger.info(f"Password reset email task queued for user_id={user.id}, task_id={task.id}")
-            except OperationalError as e:
-                logger.error(f"Failed to queue password reset email for user_id={user.id}: {str(e)}")
-                return Response(
-                    {"status": "error", "message": "Failed to connect to email service. Please try again."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            # Queue the password reset email for the next batch
+            notification = queue_email(
+                EmailNotification.Kind.PASSWORD_RESET, user.email,
+                {'reset_url': reset_url, 'expiry_hours': 1},  # Matches token expiry
+            )
+            logger.info(f"Password reset email queued for user_id={user.id}, notification_id={notification.id}")
 
             return Response(
                 {"status": "success", "message": "Password reset link sent to your email."},
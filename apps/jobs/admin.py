@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Tag, Job
+from .models import Category, Tag, Job, Application, JobAlert
 
 
 @admin.register(Category)
@@ -18,6 +18,13 @@ class TagAdmin(admin.ModelAdmin):
     ordering = ('-created_date',)
 
 
+class ApplicationInline(admin.TabularInline):
+    model = Application
+    extra = 0
+    raw_id_fields = ('seeker',)
+    readonly_fields = ('created_at',)
+
+
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'organization', 'category', 'location', 'salary', 'is_active', 'created_at')
@@ -26,7 +33,29 @@ class JobAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     raw_id_fields = ('organization',)
     autocomplete_fields = ('tags',)
-    filter_horizontal = ('jobSeekers_who_apply',)
+    inlines = (ApplicationInline,)
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'created_at'
     ordering = ('-created_at',)
+
+
+
+@admin.register(Application)
+class ApplicationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job', 'seeker', 'status', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('job__title', 'seeker__email')
+    raw_id_fields = ('job', 'seeker')
+    readonly_fields = ('created_at', 'updated_at')
+    ordering = ('-created_at',)
+
+
+@admin.register(JobAlert)
+class JobAlertAdmin(admin.ModelAdmin):
+    list_display = ('id', 'seeker', 'category', 'location', 'min_salary', 'is_active', 'created_at')
+    list_filter = ('is_active', 'category')
+    search_fields = ('seeker__email', 'location')
+    raw_id_fields = ('seeker',)
+    autocomplete_fields = ('tags',)
+    readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
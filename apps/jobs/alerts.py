@@ -0,0 +1,63 @@
+"""
+Matching jobs against JobAlert subscriptions.
+
+A new job is fanned out in pages of seeker ids walked in id order (keyset,
+never OFFSET), so neither the query nor the task holding the page grows with
+the number of subscribers.
+"""
+from django.db.models import Exists, OuterRef, Q
+
+from apps.accounts.models import User
+from .models import Job, JobAlert
+
+
+def matching_alerts(job, tag_ids):
+    """Active alerts, owned by active job seekers, whose criteria the job satisfies."""
+    alert_tags = JobAlert.tags.through.objects.filter(jobalert_id=OuterRef('pk'))
+    salary = Q(min_salary__isnull=True)
+    if job.salary is not None:
+        salary |= Q(min_salary__lte=job.salary)
+
+    return JobAlert.objects.filter(
+        Q(category__isnull=True) | Q(category_id=job.category_id),
+        Q(location='') | Q(location=JobAlert.normalize_location(job.location)),
+        salary,
+        ~Exists(alert_tags) | Exists(alert_tags.filter(tag_id__in=tag_ids)),
+        is_active=True,
+        seeker__is_active=True,
+        seeker__role=User.Role.JOB_SEEKER,
+    )
+
+
+def matching_seeker_ids(job, tag_ids, after_id=0, limit=500):
+    """Next page of distinct seeker ids (ascending, > after_id) with a matching alert."""
+    return list(
+        matching_alerts(job, tag_ids)
+        .filter(seeker_id__gt=after_id)
+        .order_by('seeker_id')
+        .values_list('seeker_id', flat=True)
+        .distinct()[:limit]
+    )
+
+
+def alert_context(job, seeker, job_url):
+    """Template context for one job alert email."""
+    return {
+        'first_name': seeker.first_name or '',
+        'job_title': job.title,
+        'organization_name': job.organization.organization_name or job.organization.email,
+        'category': job.category.title,
+        'location': job.location,
+        'salary': str(job.salary) if job.salary is not None else '',
+        'job_url': job_url,
+    }
+
+
+def load_alert_job(job_id):
+    """The job with the relations alert emails render, or None if it is gone or inactive."""
+    return (
+        Job.objects.select_related('organization', 'category')
+        .defer('search_vector', 'description')
+        .filter(pk=job_id, is_active=True)
+        .first()
+    )
@@ -0,0 +1,121 @@
+"""
+Response cache for read-heavy job endpoints.
+
+Entry keys embed version counters; bumping a counter invalidates every entry
+built from it (including every ?fields= variant) without scanning keys.
+Bumps wait for the surrounding transaction to commit: bumped earlier, a
+concurrent request could rebuild the entry from the old row and store it
+under the new version. A missing (never set or evicted) counter starts at
+the current time in nanoseconds, so it never returns to a version whose
+entries may still be cached. Cache errors are logged and treated as
+misses, so an outage of the cache server never fails a request.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from job_portal.cache import CACHE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+ALL_JOBS_VERSION = 'jobs:version'
+CATEGORIES_VERSION = 'jobs:categories:version'
+TAGS_VERSION = 'jobs:tags:version'
+
+
+def get_cache():
+    return caches[settings.JOBS_CACHE_ALIAS]
+
+
+def _job_version_key(slug):
+    return f"jobs:detail:version:{slug}"
+
+
+def _get_versions(*keys):
+    """Fetch several version counters in one round trip, starting any missing one afresh."""
+    cache = get_cache()
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            fresh = time.time_ns()
+            # Another process may have started it meanwhile; theirs wins
+            values[key] = fresh if cache.add(key, fresh, timeout=None) else cache.get(key, fresh)
+    return [values[key] for key in keys]
+
+
+def _bump(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:  # Counter missing (never set or evicted)
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def job_detail_key(slug, variant=''):
+    all_jobs, job = _get_versions(ALL_JOBS_VERSION, _job_version_key(slug))
+    return f"jobs:detail:{all_jobs}.{job}:{slug}:{variant}"
+
+
+def category_list_key(variant=''):
+    (categories,) = _get_versions(CATEGORIES_VERSION)
+    return f"jobs:categories:{categories}:{variant}"
+
+
+def tag_list_key(variant=''):
+    (tags,) = _get_versions(TAGS_VERSION)
+    return f"jobs:tags:{tags}:{variant}"
+
+
+def build_entry(data):
+    """Cache entry holding the response data and a strong ETag of its JSON form."""
+    body = json.dumps(data, cls=JSONEncoder, separators=(',', ':'))
+    return {'data': json.loads(body), 'etag': f'"{hashlib.md5(body.encode()).hexdigest()}"'}
+
+
+def get_entry(key):
+    try:
+        return get_cache().get(key)
+    except CACHE_ERRORS as e:
+        logger.warning(f"Cache read failed for key={key}: {str(e)}")
+        return None
+
+
+def set_entry(key, entry):
+    try:
+        get_cache().set(key, entry, timeout=settings.JOBS_CACHE_TIMEOUT)
+    except CACHE_ERRORS as e:
+        logger.warning(f"Cache write failed for key={key}: {str(e)}")
+
+
+def _invalidate(*keys):
+    def bump():
+        try:
+            for key in keys:
+                _bump(key)
+        except CACHE_ERRORS as e:
+            logger.warning(f"Cache invalidation failed for keys={keys}: {str(e)}")
+
+    # Runs at once outside a transaction
+    transaction.on_commit(bump)
+
+
+def invalidate_job_detail(*slugs):
+    _invalidate(*(_job_version_key(slug) for slug in slugs if slug))
+
+
+def invalidate_all_jobs():
+    _invalidate(ALL_JOBS_VERSION)
+
+
+def invalidate_categories():
+    _invalidate(CATEGORIES_VERSION)
+
+
+def invalidate_tags():
+    _invalidate(TAGS_VERSION)
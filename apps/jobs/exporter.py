@@ -0,0 +1,116 @@
+"""
+Streaming export of an organization's jobs and applications.
+
+Rows come from a server-side cursor (QuerySet.iterator(chunk_size=...)) as
+plain values, are encoded one at a time and leave the process in blocks of
+about EXPORT_BUFFER_SIZE bytes, so memory does not depend on the number of
+rows exported.
+"""
+import csv
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, OuterRef
+
+from .models import Application, Job, Tag
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+JOB_EXPORT_FIELDS = (
+    'id', 'title', 'slug', 'category', 'tags', 'location', 'salary', 'is_active',
+    'applicant_count', 'created_at', 'updated_at',
+)
+APPLICATION_EXPORT_FIELDS = (
+    'id', 'job_id', 'job_title', 'seeker_email', 'seeker_first_name', 'seeker_last_name',
+    'status', 'phone', 'message', 'resume', 'created_at',
+)
+
+
+def job_rows(organization):
+    """The organization's jobs as dicts keyed by JOB_EXPORT_FIELDS."""
+    # Correlated subquery instead of a join + GROUP BY, so rows stream in id order
+    tag_titles = ArraySubquery(
+        Tag.objects.filter(tag_jobs=OuterRef('pk')).order_by('title').values('title')
+    )
+    queryset = (
+        Job.objects.filter(organization=organization)
+        .order_by('id')
+        .annotate(tag_titles=tag_titles)
+        .values(
+            'id', 'title', 'slug', 'category__title', 'tag_titles', 'location', 'salary',
+            'is_active', 'applicant_count', 'created_at', 'updated_at',
+        )
+    )
+    for row in queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        row['category'] = row.pop('category__title')
+        row['tags'] = row.pop('tag_titles')
+        yield row
+
+
+def application_rows(organization):
+    """Applications to the organization's jobs as dicts keyed by APPLICATION_EXPORT_FIELDS."""
+    queryset = (
+        Application.objects.filter(job__organization=organization)
+        .order_by('job_id', 'id')
+        .values(
+            'id', 'job_id', 'status', 'phone', 'message', 'resume', 'created_at',
+            job_title=F('job__title'),
+            seeker_email=F('seeker__email'),
+            seeker_first_name=F('seeker__first_name'),
+            seeker_last_name=F('seeker__last_name'),
+        )
+    )
+    return queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+EXPORT_RESOURCES = {
+    'jobs': (job_rows, JOB_EXPORT_FIELDS),
+    'applicants': (application_rows, APPLICATION_EXPORT_FIELDS),
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([
+            ','.join(value) if isinstance(value, list) else value
+            for value in (row[field] for field in fields)
+        ])
+
+
+def _jsonl_lines(rows, fields):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode({field: row[field] for field in fields}) + '\n'
+
+
+def _buffered(lines):
+    """Join encoded lines into blocks of about EXPORT_BUFFER_SIZE bytes."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= settings.EXPORT_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_export(organization, resource, fmt):
+    """Generator of text blocks for one resource ('jobs' or 'applicants') in one format."""
+    rows, fields = EXPORT_RESOURCES[resource]
+    lines = _csv_lines if fmt == 'csv' else _jsonl_lines
+    return _buffered(lines(rows(organization), fields))
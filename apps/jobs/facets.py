@@ -0,0 +1,78 @@
+"""
+Facet counts for job search results.
+
+Every facet comes from one GROUP BY GROUPING SETS query over the filtered
+jobs, so the matching rows are read once no matter how many categories,
+locations or salary buckets there are (instead of one COUNT per value).
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+
+from .models import Category
+
+# GROUPING(category_id, location, salary_bucket) bitmask of the columns a row is *not* grouped by
+_CATEGORY_ROWS = 0b011
+_LOCATION_ROWS = 0b101
+_SALARY_ROWS = 0b110
+
+
+def salary_bucket(edges):
+    """Bucket index of Job.salary for ascending bucket edges: 0 below edges[0], len(edges) above the last."""
+    return Case(
+        When(salary__isnull=True, then=Value(None)),
+        *[When(salary__lt=edge, then=Value(index)) for index, edge in enumerate(edges)],
+        default=Value(len(edges)),
+        output_field=IntegerField(),
+    )
+
+
+def facet_counts(queryset):
+    """Raw (category counts, location counts, salary bucket counts) dicts in a single query."""
+    matching = (
+        queryset.order_by()
+        .annotate(salary_bucket=salary_bucket(settings.JOB_SALARY_BUCKETS))
+        .values('category_id', 'location', 'salary_bucket')
+    )
+    sql, params = matching.query.sql_with_params()
+    categories, locations, salaries = {}, {}, {}
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT category_id, location, salary_bucket,
+                   GROUPING(category_id, location, salary_bucket), COUNT(*)
+            FROM ({sql}) AS matching
+            GROUP BY GROUPING SETS ((category_id), (location), (salary_bucket))
+            """,
+            params,
+        )
+        for category_id, location, bucket, grouping, count in cursor.fetchall():
+            if grouping == _CATEGORY_ROWS:
+                categories[category_id] = count
+            elif grouping == _LOCATION_ROWS:
+                locations[location] = count
+            elif grouping == _SALARY_ROWS and bucket is not None:
+                salaries[bucket] = count
+    return categories, locations, salaries
+
+
+def job_facets(queryset):
+    """Facets for the jobs in queryset, ready to serialize next to the search results."""
+    categories, locations, salaries = facet_counts(queryset)
+    titles = dict(Category.objects.filter(pk__in=categories).values_list('id', 'title'))
+    edges = settings.JOB_SALARY_BUCKETS
+    bounds = [None, *edges, None]
+    return {
+        'categories': [
+            {'id': category_id, 'title': titles.get(category_id), 'count': count}
+            for category_id, count in sorted(categories.items(), key=lambda item: -item[1])
+        ],
+        'locations': [
+            {'location': location, 'count': count}
+            for location, count in sorted(locations.items(), key=lambda item: -item[1])
+        ][:settings.JOB_FACET_LOCATION_LIMIT],
+        'salary': [
+            {'min': bounds[index], 'max': bounds[index + 1], 'count': salaries.get(index, 0)}
+            for index in range(len(edges) + 1)
+        ],
+    }
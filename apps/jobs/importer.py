@@ -0,0 +1,209 @@
+"""
+Bulk job import from JSON Lines or CSV.
+
+Rows are read and validated in chunks of JOB_IMPORT_CHUNK_SIZE. Each chunk
+resolves its categories and tags with one query each, allocates slugs with
+one query (slug.assign_bulk_slugs) and is written with bulk_create, tag
+through-rows included, in its own transaction. Invalid rows are reported by
+row number and skipped; they never block the rest of the file.
+
+bulk_create() bypasses Job.save() and the signals: the search document and
+the categories' and tags' active job counts are updated once per chunk, and
+no response cache entry can exist yet for a slug that has just been created.
+The job alert fan-out of the chunk's active jobs is queued through the
+outbox in the chunk's transaction, as PostJobView does for a single job.
+"""
+import codecs
+import csv
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+from rest_framework.exceptions import ValidationError
+
+from apps.accounts.outbox import enqueue_tasks
+from . import cache as job_cache
+from .models import Category, Job, Tag, JOB_SEARCH_VECTOR
+from .serializers import JobImportRowSerializer
+from .slug import MAX_SLUG_ATTEMPTS, assign_bulk_slugs
+from .tasks import fan_out_job_alerts
+
+IMPORT_FORMATS = ('jsonl', 'csv')
+
+
+def detect_format(filename):
+    """Import format implied by a file name, or None."""
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return None
+
+
+def utf8_error_line(blocks):
+    """
+    Line number of the first invalid UTF-8 in an iterable of byte blocks, or
+    None. Checked before importing: chunks commit as they go, so a decoding
+    error met halfway would leave the file partly imported.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    line = 1
+    for block in blocks:
+        pending = len(decoder.getstate()[0])  # Bytes of a character split across blocks
+        try:
+            decoder.decode(block)
+        except UnicodeDecodeError as e:
+            return line + block.count(b'\n', 0, max(e.start - pending, 0))
+        line += block.count(b'\n')
+    try:
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return line
+    return None
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (row number, data, error) for each record of a text stream. data is
+    None when the record could not be parsed. Empty CSV cells are dropped so
+    optional columns fall back to their defaults.
+    """
+    if fmt == 'csv':
+        # Row 1 is the header
+        for number, row in enumerate(csv.DictReader(stream), start=2):
+            yield number, {key: value for key, value in row.items() if key and value not in ('', None)}, None
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "Each line must be a JSON object."
+            continue
+        yield number, data, None
+
+
+class JobImporter:
+    """
+    Import rows for one organization and collect a per-row error report.
+    job_url maps a slug to the absolute job URL used in alert emails; without
+    it no alerts are queued.
+    """
+
+    def __init__(self, organization, chunk_size=None, max_errors=None, job_url=None):
+        self.organization = organization
+        self.job_url = job_url
+        self.chunk_size = chunk_size or settings.JOB_IMPORT_CHUNK_SIZE
+        self.max_errors = max_errors or settings.JOB_IMPORT_MAX_ERRORS
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        # One serializer validates every row: building its fields per row would
+        # cost more than the validation itself
+        self._validator = JobImportRowSerializer()
+
+    def run(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        """Counts plus the first max_errors row errors."""
+        errors = sorted(self.errors, key=lambda error: error['row'])
+        return {'created': self.created, 'failed': self.failed, 'errors': errors}
+
+    def _error(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': number, 'errors': errors})
+
+    def _import_chunk(self, chunk):
+        valid = []
+        for number, data, error in chunk:
+            if error:
+                self._error(number, {'non_field_errors': [error]})
+                continue
+            try:
+                valid.append((number, self._validator.run_validation(data)))
+            except ValidationError as e:
+                self._error(number, e.detail)
+
+        categories = _by_slug(Category, {row['category'] for _, row in valid})
+        tags = _by_slug(Tag, {name for _, row in valid for name in row.get('tags', ())})
+
+        jobs, job_tags = [], []
+        for number, row in valid:
+            category = categories.get(slugify(row['category']))
+            if category is None:
+                self._error(number, {'category': [f"Unknown category '{row['category']}'."]})
+                continue
+            unknown = [name for name in row.get('tags', ()) if slugify(name) not in tags]
+            if unknown:
+                self._error(number, {'tags': [f"Unknown tags: {', '.join(unknown)}."]})
+                continue
+
+            jobs.append(Job(
+                organization=self.organization,
+                category=category,
+                title=row['title'],
+                description=row['description'],
+                location=row['location'],
+                salary=row.get('salary'),
+                is_active=row['is_active'],
+            ))
+            job_tags.append({tags[slugify(name)].id for name in row.get('tags', ())})
+
+        if jobs:
+            self._save(jobs, job_tags)
+            self.created += len(jobs)
+
+    def _save(self, jobs, job_tags):
+        through = Job.tags.through
+        for attempt in range(MAX_SLUG_ATTEMPTS):
+            assign_bulk_slugs(jobs, [job.title for job in jobs])
+            try:
+                with transaction.atomic():
+                    Job.objects.bulk_create(jobs)
+                    through.objects.bulk_create([
+                        through(job_id=job.pk, tag_id=tag_id)
+                        for job, tag_ids in zip(jobs, job_tags) for tag_id in tag_ids
+                    ])
+                    Job.objects.filter(pk__in=[job.pk for job in jobs]).update(search_vector=JOB_SEARCH_VECTOR)
+                    active = [(job, tag_ids) for job, tag_ids in zip(jobs, job_tags) if job.is_active]
+                    if Category.adjust_active_job_counts(Counter(job.category_id for job, _ in active)):
+                        job_cache.invalidate_categories()
+                    if Tag.adjust_active_job_counts(Counter(tag_id for _, tag_ids in active for tag_id in tag_ids)):
+                        job_cache.invalidate_tags()
+                    if self.job_url is not None and active:
+                        enqueue_tasks(fan_out_job_alerts, [(job.id, self.job_url(job.slug)) for job, _ in active])
+                return
+            except IntegrityError:
+                # A concurrent writer took one of the slugs; reallocate and retry the chunk
+                if attempt == MAX_SLUG_ATTEMPTS - 1:
+                    raise
+                for job in jobs:
+                    job.pk = None
+                    job._state.adding = True
+
+
+def _by_slug(model, names):
+    """Map slugified name -> instance for categories or tags, named by title or slug (one query)."""
+    slugs = {slugify(name) for name in names}
+    found = {}
+    for instance in model.objects.filter(slug__in=slugs).order_by('-id'):
+        found[instance.slug] = instance  # Lowest id wins for duplicate tag titles
+    return found
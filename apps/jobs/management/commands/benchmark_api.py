@@ -0,0 +1,355 @@
+import http.client
+import json
+import logging
+import random
+import re
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from celery import current_app
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from django.test.utils import override_settings
+
+from apps.accounts.models import User
+from apps.jobs.models import Category, Job, Tag
+
+PREFIX = 'bench'
+PASSWORD = 'benchmark-password'
+# Scenario order matters: update and delete work on the jobs each client created in post_job
+SCENARIOS = ['login', 'job_detail', 'organization_jobs', 'post_job', 'update_job', 'delete_job']
+READ_SCENARIOS = {'job_detail', 'organization_jobs'}
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Client:
+    """One simulated user: a keep-alive HTTP connection and the jobs it created."""
+
+    def __init__(self, port, email, rng):
+        self.http = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        self.email = email
+        self.rng = rng
+        self.token = None
+        self.created = []
+
+    def request(self, method, path, body=None, auth=True):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        if auth and self.token:
+            headers['Authorization'] = f'JP {self.token}'
+        started = time.perf_counter()
+        self.http.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = self.http.getresponse()
+        payload = response.read()
+        elapsed = time.perf_counter() - started
+        match = SERVER_TIMING_QUERIES.search(response.getheader('Server-Timing', ''))
+        return {
+            'status': response.status,
+            'seconds': elapsed,
+            'queries': int(match.group(2)) if match else None,
+            'db_ms': float(match.group(1)) if match else None,
+            'body': payload,
+        }
+
+    def close(self):
+        self.http.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the API over HTTP with concurrent clients: login, job detail, an organization's job "
+        "list, posting, updating and deleting jobs. Reports throughput, p50/p95/p99 latency and "
+        "queries per request, and can save the results as JSON to compare runs across commits. "
+        "Runs against a separate benchmark database (the test database name of DATABASE_URL), "
+        "filled by seed_portal, with Celery eager, the locmem email backend and local banner "
+        "storage, so it needs no broker, SMTP server or Cloudinary account. It needs PostgreSQL: "
+        "the migrations and every job write depend on it (see handle())."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (default: 8).')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per client per scenario (default: 50).')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed read requests per client before timing.')
+        parser.add_argument(
+            '--scenario', action='append', choices=SCENARIOS, dest='scenarios',
+            help='Run only this scenario (repeatable). update_job and delete_job need post_job.',
+        )
+        parser.add_argument('--jobs', type=int, default=20_000, help='Jobs seeded into the benchmark database.')
+        parser.add_argument('--applications', type=int, default=100_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--keep-db', action='store_true',
+            help='Keep the benchmark database afterwards and reuse it (without reseeding) if it exists.',
+        )
+        parser.add_argument(
+            '--locmem-cache', action='store_true',
+            help='Use a per-process in-memory cache instead of the configured one (e.g. when Redis is not running).',
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='Print the change against the results in this JSON file.')
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'] or SCENARIOS
+        if {'update_job', 'delete_job'} & set(scenarios) and 'post_job' not in scenarios:
+            raise CommandError('update_job and delete_job work on the jobs created by post_job; add --scenario post_job.')
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be at least 1.')
+        if connection.vendor != 'postgresql':
+            # Not a per-scenario limitation: the migrations add the tsvector column, its GIN index
+            # and indexes built CONCURRENTLY, and every job save refreshes the search vector, so
+            # no scenario could run against SQLite
+            raise CommandError(
+                f'The benchmark needs PostgreSQL, like the migrations; DATABASE_URL points at {connection.vendor}.'
+            )
+        baseline = self._load(options['compare']) if options['compare'] else None
+
+        # INFO logging of every request would be measured too; warnings still show, except the
+        # per-request budget warnings, which repeat what the benchmark reports
+        logging.disable(logging.INFO)
+        performance_logger = logging.getLogger('job_portal.performance')
+        performance_logger.disabled = True
+        current_app.conf.update(task_always_eager=True, broker_url='memory://')
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keep_db'], serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media, override_settings(**self._stand_ins(media, options)):
+                self._seed(options)
+                results = self._run(scenarios, options)
+        finally:
+            if not options['keep_db']:
+                creation.destroy_test_db(old_name, verbosity=0)
+            logging.disable(logging.NOTSET)
+            performance_logger.disabled = False
+
+        self._report(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _stand_ins(self, media, options):
+        overrides = {
+            'PERFORMANCE_INSTRUMENTATION': True,  # Queries per request come from the Server-Timing header
+            'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+            'BANNER_STORAGE_BACKEND': 'apps.jobs.storage.LocalBannerStorage',
+            'BANNER_STAGING_ROOT': f'{media}/staging',
+            'BANNER_LOCAL_ROOT': f'{media}/banners',
+            'CELERY_BROKER_URL': 'memory://',
+        }
+        if options['locmem_cache']:
+            overrides['CACHES'] = {
+                'default': {'BACKEND': 'job_portal.cache.LocMemCache', 'KEY_PREFIX': 'job_portal'},
+            }
+        return overrides
+
+    def _seed(self, options):
+        if User.objects.filter(email__startswith=f'{PREFIX}-').exists():
+            self.stdout.write('Reusing the seeded benchmark database')
+            return
+        self.stdout.write('Seeding the benchmark database...')
+        call_command(
+            'seed_portal', organizations=max(options['concurrency'], 200), seekers=5_000, jobs=options['jobs'],
+            applications=options['applications'], seed=options['seed'], prefix=PREFIX, password=PASSWORD,
+            stdout=self.stdout,
+        )
+
+    # Running
+
+    def _run(self, scenarios, options):
+        self.slugs = list(Job.objects.filter(is_active=True).values_list('slug', flat=True)[:10_000])
+        self.category_ids = list(Category.objects.values_list('id', flat=True))
+        self.tag_ids = list(Tag.objects.values_list('id', flat=True))
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietWSGIRequestHandler)
+        server.daemon_threads = False  # server_close() waits for request threads, so their connections close
+        server.set_app(WSGIHandler())
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+
+        clients = [
+            Client(server.server_port, f'{PREFIX}-{User.Role.ORGANIZATION}-{number}@example.com',
+                   random.Random(options['seed'] + number))
+            for number in range(options['concurrency'])
+        ]
+        try:
+            for client in clients:
+                response = client.request('POST', '/api/login/', {'email': client.email, 'password': PASSWORD})
+                if response['status'] != 200:
+                    raise CommandError(f"Login as {client.email} failed with HTTP {response['status']}")
+                client.token = json.loads(response['body'])['access_token']
+            for name in READ_SCENARIOS & set(scenarios):
+                self._parallel(clients, name, options['warmup'])
+
+            results = {}
+            for name in scenarios:
+                self.stdout.write(f"Running {name}...")
+                started = time.perf_counter()
+                samples = self._parallel(clients, name, options['requests'])
+                results[name] = self._summarize(samples, time.perf_counter() - started)
+        finally:
+            for client in clients:
+                client.close()
+            server.shutdown()
+            server.server_close()
+
+        return {
+            'commit': self._commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'options': {key: options[key] for key in ('concurrency', 'requests', 'warmup', 'jobs', 'applications', 'seed')},
+            'database': f"{connection.vendor} {connection.pg_version}",
+            'cache': settings.CACHES['default']['BACKEND'],
+            'scenarios': results,
+        }
+
+    def _parallel(self, clients, name, count):
+        """Run count requests of the scenario on every client at once; returns all samples."""
+        samples, errors = [], []
+
+        def work(client):
+            try:
+                step = getattr(self, f'_{name}')
+                done = [step(client) for _ in range(count)]
+                samples.extend(done)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise CommandError(f"{name}: {errors[0]!r}")
+        return samples
+
+    # Scenarios: one request each
+
+    def _login(self, client):
+        return client.request('POST', '/api/login/', {'email': client.email, 'password': PASSWORD}, auth=False)
+
+    def _job_detail(self, client):
+        return client.request('GET', f'/api/jobs/detail/{client.rng.choice(self.slugs)}/', auth=False)
+
+    def _organization_jobs(self, client):
+        return client.request('GET', '/api/jobs/my-jobs/')
+
+    def _post_job(self, client):
+        rng = client.rng
+        response = client.request('POST', '/api/jobs/', {
+            'title': f'Benchmark opening {rng.randrange(10 ** 6)}',
+            'description': 'Created by manage.py benchmark_api.',
+            'location': rng.choice(['Dhaka', 'Remote', 'Sylhet']),
+            'salary': rng.randrange(500, 15_000),
+            'category_id': rng.choice(self.category_ids),
+            'tags_ids': rng.sample(self.tag_ids, min(3, len(self.tag_ids))),
+        })
+        if response['status'] == 201:
+            client.created.append(json.loads(response['body'])['id'])
+        return response
+
+    def _update_job(self, client):
+        pk = client.rng.choice(client.created)
+        return client.request('PATCH', f'/api/jobs/{pk}/', {'salary': client.rng.randrange(500, 15_000)})
+
+    def _delete_job(self, client):
+        return client.request('DELETE', f'/api/jobs/{client.created.pop()}/')
+
+    # Reporting
+
+    def _summarize(self, samples, elapsed):
+        latencies = sorted(sample['seconds'] * 1000 for sample in samples)
+        queries = [sample['queries'] for sample in samples if sample['queries'] is not None]
+        db_ms = [sample['db_ms'] for sample in samples if sample['db_ms'] is not None]
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if sample['status'] >= 400),
+            'seconds': round(elapsed, 3),
+            'throughput': round(len(samples) / elapsed, 1),
+            'latency_ms': {
+                'mean': round(statistics.fmean(latencies), 2),
+                'p50': round(percentile(latencies, 0.50), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2),
+                'max': round(latencies[-1], 2),
+            },
+            'queries': {
+                'mean': round(statistics.fmean(queries), 2) if queries else None,
+                'max': max(queries) if queries else None,
+            },
+            'db_ms_mean': round(statistics.fmean(db_ms), 2) if db_ms else None,
+        }
+
+    def _report(self, results, baseline):
+        options = results['options']
+        self.stdout.write(
+            f"\n{options['concurrency']} clients x {options['requests']} requests, "
+            f"commit {results['commit'] or 'unknown'}, {results['database']}"
+        )
+        self.stdout.write(
+            f"{'scenario':<18} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'db ms':>7} {'errors':>6}"
+        )
+        for name, result in results['scenarios'].items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<18} {result['throughput']:>8.1f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+                f"{latency['p99']:>8.1f} {result['queries']['mean'] or 0:>8.1f} "
+                f"{result['db_ms_mean'] or 0:>7.1f} {result['errors']:>6}"
+            )
+        if baseline:
+            self._compare(results, baseline)
+
+    def _compare(self, results, baseline):
+        self.stdout.write(f"\nChange against {baseline.get('commit') or 'baseline'} (negative latency is faster)")
+        self.stdout.write(f"{'scenario':<18} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+        for name, result in results['scenarios'].items():
+            before = baseline.get('scenarios', {}).get(name)
+            if not before:
+                continue
+
+            def change(new, old):
+                return f"{(new - old) / old * 100:+.0f}%" if old else '-'
+
+            self.stdout.write(
+                f"{name:<18} {change(result['throughput'], before['throughput']):>8} "
+                + ' '.join(
+                    f"{change(result['latency_ms'][key], before['latency_ms'][key]):>8}" for key in ('p50', 'p95', 'p99')
+                )
+                + f" {(result['queries']['mean'] or 0) - (before['queries']['mean'] or 0):>+8.1f}"
+            )
+
+    def _load(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+    def _commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
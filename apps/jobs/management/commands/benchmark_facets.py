@@ -0,0 +1,103 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.accounts.models import User
+from apps.jobs.facets import facet_counts
+from apps.jobs.models import Category, Job
+
+CATEGORY_COUNT = 20
+LOCATIONS = [f'City {i}' for i in range(50)]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare single-pass search facets (facets.facet_counts) with one COUNT per facet value. "
+        "Benchmark jobs are generated inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Jobs to generate (default: 1M).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per strategy (default: 5).')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options['rows'], options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, rows, repeat):
+        organization = User.objects.create(
+            email='facet-benchmark@example.com', role=User.Role.ORGANIZATION, organization_name='Benchmark',
+        )
+        categories = [Category.objects.create(title=f'Facet benchmark {i}') for i in range(CATEGORY_COUNT)]
+
+        started = time.perf_counter()
+        self._fill(organization, categories, rows)
+        self.stdout.write(f"Generated {rows:,} jobs in {time.perf_counter() - started:.1f}s")
+
+        everything = Job.objects.filter(is_active=True)
+        one_category = everything.filter(category=categories[0])
+        self.stdout.write(f"{'scenario':<16}  {'strategy':<22}  {'queries':>7}  {'median ms':>10}")
+        for name, queryset in (('active jobs', everything), ('one category', one_category)):
+            for strategy, run in (('single pass', self._single_pass), ('COUNT per value', self._per_value)):
+                timings, queries = [], 0
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    queries = run(queryset)
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f"{name:<16}  {strategy:<22}  {queries:>7}  {statistics.median(timings):>10.1f}"
+                )
+
+    def _fill(self, organization, categories, rows):
+        """Insert jobs in one statement; the ORM would spend minutes building a million objects."""
+        category_ids = [category.id for category in categories]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Job._meta.db_table} (
+                    organization_id, category_id, title, slug, description, location, salary,
+                    is_active, banner_status, banner_variants, applicant_count, created_at, updated_at
+                )
+                SELECT %s, (%s::bigint[])[1 + n %% %s], 'Job ' || n, 'facet-benchmark-' || n,
+                       'Benchmark', (%s::text[])[1 + (n * 7) %% %s],
+                       CASE WHEN n %% 10 = 0 THEN NULL ELSE (n * 37) %% 15000 END,
+                       n %% 20 <> 0, 'none', '{{}}', 0, now(), now()
+                FROM generate_series(1, %s) AS n
+                """,
+                [organization.id, category_ids, len(category_ids), LOCATIONS, len(LOCATIONS), rows],
+            )
+            cursor.execute(f"ANALYZE {Job._meta.db_table}")
+
+    def _single_pass(self, queryset):
+        facet_counts(queryset)
+        return 1
+
+    def _per_value(self, queryset):
+        """What facets cost without GROUPING SETS: list the values, then count each one."""
+        category_ids = list(queryset.order_by().values_list('category_id', flat=True).distinct())
+        locations = list(queryset.order_by().values_list('location', flat=True).distinct())
+        queries = 2
+        for category_id in category_ids:
+            queryset.filter(category_id=category_id).count()
+        for location in locations:
+            queryset.filter(location=location).count()
+        edges = settings.JOB_SALARY_BUCKETS
+        for low, high in zip([None, *edges], [*edges, None]):
+            bucket = queryset.filter(salary__isnull=False)
+            if low is not None:
+                bucket = bucket.filter(salary__gte=low)
+            if high is not None:
+                bucket = bucket.filter(salary__lt=high)
+            bucket.count()
+        return queries + len(category_ids) + len(locations) + len(edges) + 1
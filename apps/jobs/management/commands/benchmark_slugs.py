@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from apps.accounts.models import User
+from apps.jobs.models import Category, Job
+
+FILLER_BATCH_SIZE = 10_000
+COMMON_TITLES = ['Software Engineer', 'Data Analyst', 'Product Manager', 'Sales Executive']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure Job insert cost (slug allocation included) as the job table grows. "
+        "Filler rows are bulk-inserted inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10000,100000,1000000,5000000',
+            help='Comma-separated table sizes to measure at (default: 10k,100k,1M,5M).',
+        )
+        parser.add_argument(
+            '--sample', type=int, default=200,
+            help='Number of Job.save() inserts timed at each size (default: 200).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers.')
+
+        try:
+            with transaction.atomic():
+                self._run(sizes, options['sample'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, sizes, sample):
+        organization = User.objects.create(
+            email='slug-benchmark@example.com', role=User.Role.ORGANIZATION, organization_name='Benchmark',
+        )
+        category = Category.objects.create(title='Slug benchmark category')
+        # Take each title's plain slug so every timed insert collides once and retries
+        Job.objects.bulk_create([
+            Job(
+                organization=organization, category=category, title=title, slug=slugify(title),
+                description='Filler', location='Remote',
+            )
+            for title in COMMON_TITLES
+        ], ignore_conflicts=True)
+        rows = Job.objects.count()
+
+        self.stdout.write(f"{'table rows':>12}  {'mean ms/insert':>15}  {'max ms':>8}")
+        for size in sizes:
+            rows = self._fill(organization, category, rows, size)
+            timings = []
+            for i in range(sample):
+                job = Job(
+                    organization=organization, category=category,
+                    title=COMMON_TITLES[i % len(COMMON_TITLES)], description='Benchmark', location='Remote',
+                )
+                started = time.perf_counter()
+                job.save()
+                timings.append((time.perf_counter() - started) * 1000)
+            rows += sample
+            self.stdout.write(f"{size:>12,}  {sum(timings) / len(timings):>15.3f}  {max(timings):>8.3f}")
+
+    def _fill(self, organization, category, rows, target):
+        """
+        Bulk-insert filler jobs with the benchmarked titles until the table holds
+        target rows; their suffixed slugs share the prefix the timed inserts probe.
+        """
+        while rows < target:
+            batch = min(FILLER_BATCH_SIZE, target - rows)
+            jobs = []
+            for i in range(batch):
+                title = COMMON_TITLES[(rows + i) % len(COMMON_TITLES)]
+                jobs.append(Job(
+                    organization=organization, category=category, title=title,
+                    slug=f'{slugify(title)}-{rows + i}', description='Filler', location='Remote',
+                ))
+            Job.objects.bulk_create(jobs)
+            rows += batch
+        return rows
@@ -0,0 +1,74 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.jobs.importer import IMPORT_FORMATS, JobImporter, detect_format, read_rows, utf8_error_line
+
+
+class Command(BaseCommand):
+    help = "Import jobs for an organization from a JSON Lines or CSV file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--organization', required=True, help='Email of the organization user.')
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS,
+            help='Input format (default: from the file extension).',
+        )
+        parser.add_argument('--chunk-size', type=int, help='Rows validated and written per transaction.')
+        parser.add_argument(
+            '--base-url',
+            help='Site root for the job links in alert emails, e.g. https://jobs.example.com. '
+                 'Without it, no job alerts are sent for the imported jobs.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = User.objects.get(email=options['organization'], role=User.Role.ORGANIZATION)
+        except User.DoesNotExist:
+            raise CommandError(f"No organization user with email {options['organization']}")
+
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if fmt is None:
+            raise CommandError('Cannot tell the format from the file name; pass --format.')
+
+        started = time.perf_counter()
+        job_url = None
+        if options['base_url']:
+            base_url = options['base_url'].rstrip('/')
+
+            def job_url(slug):
+                return f"{base_url}{reverse('job-detail', args=[slug])}"
+        importer = JobImporter(organization, chunk_size=options['chunk_size'], job_url=job_url)
+        if path == '-':
+            # stdin cannot be checked ahead; chunks already imported stay imported
+            try:
+                report = importer.run(read_rows(sys.stdin, fmt))
+            except UnicodeDecodeError:
+                raise CommandError(
+                    f"Input is not UTF-8; stopped after importing {importer.created} job(s) "
+                    f"({importer.failed} row(s) failed)"
+                )
+        else:
+            try:
+                with open(path, 'rb') as raw:
+                    error_line = utf8_error_line(iter(lambda: raw.read(64 * 1024), b''))
+                if error_line is not None:
+                    raise CommandError(f"{path} is not UTF-8 (invalid bytes on line {error_line}); nothing was imported")
+                with open(path, encoding='utf-8-sig', newline='') as stream:
+                    report = importer.run(read_rows(stream, fmt))
+            except OSError as e:
+                raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        for error in report['errors']:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        if report['failed'] > len(report['errors']):
+            self.stderr.write(f"... {report['failed'] - len(report['errors'])} more row error(s) not listed")
+        self.stdout.write(
+            f"Imported {report['created']} job(s), {report['failed']} row(s) failed in {elapsed:.1f}s"
+        )
@@ -0,0 +1,378 @@
+import io
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.accounts.models import User
+from apps.jobs import cache as job_cache
+from apps.jobs.models import Application, Category, Job, Tag, JOB_SEARCH_VECTOR
+
+CATEGORY_TITLES = [
+    'Software Engineering', 'Data Science', 'Product Management', 'Design', 'Marketing', 'Sales',
+    'Customer Support', 'Finance', 'Accounting', 'Human Resources', 'Operations', 'Legal',
+    'Healthcare', 'Education', 'Logistics', 'Manufacturing', 'Hospitality', 'Construction',
+    'Retail', 'Media', 'Security', 'Research', 'Consulting', 'Administration',
+]
+SENIORITY = ['Junior', 'Mid-level', 'Senior', 'Lead', 'Principal', 'Intern', 'Staff', 'Head of']
+ROLES = [
+    'Backend Developer', 'Frontend Developer', 'Data Analyst', 'Data Engineer', 'Product Manager',
+    'UX Designer', 'Marketing Specialist', 'Sales Executive', 'Support Agent', 'Accountant',
+    'HR Officer', 'Operations Manager', 'Legal Counsel', 'Nurse', 'Teacher', 'Logistics Coordinator',
+    'Mechanical Engineer', 'Chef', 'Site Supervisor', 'Store Manager', 'Video Editor',
+    'Security Analyst', 'Research Scientist', 'Business Consultant', 'Office Administrator',
+    'DevOps Engineer', 'Mobile Developer', 'QA Engineer', 'Content Writer', 'Recruiter',
+]
+SKILLS = [
+    'Python', 'Django', 'JavaScript', 'React', 'SQL', 'PostgreSQL', 'Excel', 'Communication',
+    'Leadership', 'AWS', 'Docker', 'Kubernetes', 'Figma', 'SEO', 'Negotiation', 'Accounting',
+    'Recruiting', 'Teaching', 'Logistics', 'Machine Learning', 'Statistics', 'Java', 'Go',
+    'Customer Service', 'Project Management', 'Agile', 'Copywriting', 'Photoshop', 'Linux', 'Security',
+]
+CITIES = [
+    'Dhaka', 'Chattogram', 'Khulna', 'Rajshahi', 'Sylhet', 'Barishal', 'Rangpur', 'Mymensingh',
+    'Comilla', 'Gazipur', 'Narayanganj', 'Bogura', 'Remote', 'London', 'Berlin', 'Toronto',
+    'Singapore', 'Dubai', 'Kuala Lumpur', 'Bangalore', 'New York', 'San Francisco', 'Sydney', 'Tokyo',
+]
+SENTENCES = [
+    'You will work closely with a small cross-functional team.',
+    'We value ownership, clear writing and steady delivery.',
+    'The role involves regular collaboration with customers.',
+    'Experience with modern tooling is a plus.',
+    'We offer flexible hours and a yearly learning budget.',
+    'You will help shape the roadmap for the next year.',
+    'Strong communication skills are essential.',
+    'The position reports to the head of the department.',
+    'Occasional travel to regional offices may be required.',
+    'We are growing quickly and hiring across all levels.',
+    'Mentoring junior colleagues is part of the job.',
+    'You will own the quality of what we ship.',
+]
+DESCRIPTION_VARIANTS = 400
+FIRST_NAMES = ['Ayesha', 'Rahim', 'Karim', 'Nadia', 'Sara', 'Imran', 'Tania', 'Farhan', 'Mitu', 'Sakib']
+LAST_NAMES = ['Hossain', 'Ahmed', 'Rahman', 'Islam', 'Chowdhury', 'Khan', 'Akter', 'Das', 'Roy', 'Sarkar']
+
+
+def copy_line(values):
+    """One row in COPY text format. Generated values never contain tabs, newlines or backslashes."""
+    return '\t'.join('\\N' if value is None else str(value) for value in values) + '\n'
+
+
+def zipf_weights(count, skew):
+    """Cumulative weights proportional to 1 / rank**skew for ranks 1..count."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def _coprime_step(count, rng):
+    """A step whose multiples visit every index in range(count) once, to scatter popularity ranks."""
+    while True:
+        step = rng.randrange(1, max(count, 2))
+        a, b = step, count
+        while b:
+            a, b = b, a % b
+        if a == 1:
+            return step
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic job portal: organizations, job seekers, categories, tags, jobs and "
+        "applications. Rows are streamed with COPY, every user shares one precomputed password "
+        "hash and the same --seed on an empty database produces the same data. Applications "
+        "follow a Zipf distribution over jobs (a few viral jobs, a long tail)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=2_000)
+        parser.add_argument('--seekers', type=int, default=100_000)
+        parser.add_argument('--categories', type=int, default=len(CATEGORY_TITLES))
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--jobs', type=int, default=100_000)
+        parser.add_argument('--applications', type=int, default=1_000_000, help='Target number of applications.')
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Zipf exponent for applications per job, jobs per organization, category and city (default: 1.0).',
+        )
+        parser.add_argument('--days', type=int, default=365, help='Jobs are spread over this many past days.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='seed', help='Email prefix of the generated users.')
+        parser.add_argument('--password', default='password', help='Password of every generated user.')
+        parser.add_argument('--chunk-size', type=int, default=50_000, help='Rows per COPY.')
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help="Maintain the job, job tag and application tables' secondary indexes and foreign keys "
+                 "row by row instead of dropping them for the load and rebuilding them at the end. "
+                 "Use it when other sessions must keep using those tables while the seed runs.",
+        )
+
+    def handle(self, *args, **options):
+        if options['organizations'] < 1 and options['jobs']:
+            raise CommandError('Jobs need at least one organization.')
+        if options['applications'] and not (options['seekers'] and options['jobs']):
+            raise CommandError('Applications need seekers and jobs.')
+        if options['categories'] < 1:
+            raise CommandError('--categories must be at least 1.')
+        if User.objects.filter(email__startswith=f"{options['prefix']}-").exists():
+            raise CommandError(f"Users with the prefix '{options['prefix']}' exist already; pass another --prefix.")
+
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+        started = time.perf_counter()
+        with transaction.atomic(), self.deferred_indexes(
+            () if options['keep_indexes'] else (Job, Job.tags.through, Application)
+        ):
+            organization_ids = self._step('organizations', lambda: self.seed_users(
+                options['organizations'], User.Role.ORGANIZATION, options['prefix'], options['password'],
+            ))
+            seeker_ids = self._step('job seekers', lambda: self.seed_users(
+                options['seekers'], User.Role.JOB_SEEKER, options['prefix'], options['password'],
+            ))
+            category_ids = self._step('categories', lambda: self.seed_categories(options['categories']))
+            tag_ids = self._step('tags', lambda: self.seed_tags(options['tags']))
+            self._step('jobs and applications', lambda: self.seed_jobs(
+                options['jobs'], options['applications'], options['skew'], options['days'],
+                organization_ids, seeker_ids, category_ids, tag_ids,
+            ))
+        with connection.cursor() as cursor:
+            for model in (User, Category, Tag, Job, Job.tags.through, Application):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        self.stdout.write(f"Done in {time.perf_counter() - started:.1f}s")
+
+    def _step(self, name, run):
+        started = time.perf_counter()
+        result = run()
+        count = result if isinstance(result, int) else len(result)
+        self.stdout.write(f"{name}: {count:,} in {time.perf_counter() - started:.1f}s")
+        return result
+
+    # COPY helpers
+
+    @contextmanager
+    def deferred_indexes(self, models):
+        """
+        Drop the non-unique indexes and the foreign keys of models, then
+        recreate them from their exact definitions: building an index once
+        from sorted rows, and validating a foreign key with one join, is far
+        cheaper than maintaining them for every copied row. Unique indexes
+        stay and keep guarding slugs, emails and (job, seeker) pairs.
+        """
+        if not models:
+            yield
+            return
+        tables = [model._meta.db_table for model in models]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+                FROM pg_constraint WHERE contype = 'f' AND conrelid::regclass::text = ANY(%s)
+                """,
+                [tables],
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)
+                FROM pg_index
+                WHERE indrelid::regclass::text = ANY(%s) AND NOT indisunique AND NOT indisprimary
+                """,
+                [tables],
+            )
+            indexes = cursor.fetchall()
+            for table, name, _ in foreign_keys:
+                cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {connection.ops.quote_name(name)}")
+            for name, _ in indexes:
+                cursor.execute(f"DROP INDEX {name}")
+        yield
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
+            for _, definition in indexes:
+                cursor.execute(definition)
+            for table, name, definition in foreign_keys:
+                cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {connection.ops.quote_name(name)} {definition}")
+        if indexes or foreign_keys:
+            self.stdout.write(
+                f"rebuilt {len(indexes)} indexes and {len(foreign_keys)} foreign keys "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+
+    def _next_ids(self, model, count):
+        """Reserve count ids from the model's primary key sequence; ids are written explicitly by COPY."""
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+                [table, table, max(count, 1)],
+            )
+            last = cursor.fetchone()[0]
+        return range(last - count + 1, last + 1)
+
+    def _copy(self, table, columns, lines):
+        """COPY text-format lines into table, chunk_size lines per statement."""
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        chunk = []
+        with connection.cursor() as cursor:
+            for line in lines:
+                chunk.append(line)
+                if len(chunk) >= self.chunk_size:
+                    cursor.copy_expert(sql, io.StringIO(''.join(chunk)))
+                    chunk = []
+            if chunk:
+                cursor.copy_expert(sql, io.StringIO(''.join(chunk)))
+
+    # Generators
+
+    def seed_users(self, count, role, prefix, password):
+        ids = self._next_ids(User, count)
+        password_hash = make_password(password)  # Hashing per user would take hours
+        organization = role == User.Role.ORGANIZATION
+        rng = self.rng
+
+        def rows():
+            for number, pk in enumerate(ids):
+                joined = self.now - timedelta(seconds=rng.randrange(2 * 365 * 86400))
+                if organization:
+                    names = (None, None, f'{rng.choice(LAST_NAMES)} {rng.choice(ROLES).split()[0]} Ltd {number}',
+                             f'https://org{number}.example.com')
+                else:
+                    names = (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), None, None)
+                yield copy_line((pk, password_hash, 'f', f'{prefix}-{role}-{number}@example.com', role,
+                                 *names, 't', 'f', joined))
+
+        self._copy(User._meta.db_table, (
+            'id', 'password', 'is_superuser', 'email', 'role', 'first_name', 'last_name',
+            'organization_name', 'website', 'is_active', 'is_staff', 'date_joined',
+        ), rows())
+        return list(ids)
+
+    def seed_categories(self, count):
+        titles = CATEGORY_TITLES[:count] + [f'Category {number}' for number in range(len(CATEGORY_TITLES), count)]
+        Category.objects.bulk_create(
+            [Category(title=title, slug=slugify(title)) for title in titles], ignore_conflicts=True,
+        )
+        by_title = dict(Category.objects.filter(title__in=titles).values_list('title', 'id'))
+        return [by_title[title] for title in titles]
+
+    def seed_tags(self, count):
+        titles = SKILLS[:count] + [f'Skill {number}' for number in range(len(SKILLS), count)]
+        existing = dict(Tag.objects.filter(slug__in=[slugify(title) for title in titles]).values_list('slug', 'id'))
+        Tag.objects.bulk_create([
+            Tag(title=title, slug=slugify(title)) for title in titles if slugify(title) not in existing
+        ])
+        by_slug = dict(Tag.objects.filter(slug__in=[slugify(title) for title in titles]).values_list('slug', 'id'))
+        return [by_slug[slugify(title)] for title in titles]
+
+    def seed_jobs(self, count, applications, skew, days, organization_ids, seeker_ids, category_ids, tag_ids):
+        if not count:
+            return 0
+        rng = self.rng
+        job_ids = self._next_ids(Job, count)
+        titles = [f'{seniority} {role}' for seniority in SENIORITY for role in ROLES]
+        slugs = {title: slugify(title) for title in titles}
+        descriptions = [' '.join(rng.sample(SENTENCES, 4)) for _ in range(DESCRIPTION_VARIANTS)]
+        organization_weights = zipf_weights(len(organization_ids), skew)
+        category_weights = zipf_weights(len(category_ids), skew)
+        city_weights = zipf_weights(len(CITIES), skew)
+        tag_weights = zipf_weights(len(tag_ids), skew) if tag_ids else None
+
+        # Applications per job: expected total * rank**-skew / H, rounded up or down at random.
+        # Popularity ranks are scattered over the jobs so viral jobs are not all the oldest ones.
+        harmonic = zipf_weights(count, skew)[-1]
+        rank_step = _coprime_step(count, rng)
+        span = timedelta(days=days)
+        oldest = self.now - span
+
+        job_lines, link_lines, application_lines = [], [], []
+        active_by_category, active_by_tag = Counter(), Counter()
+        total_applications = 0
+
+        def flush(final=False):
+            if job_lines and (final or len(job_lines) >= self.chunk_size):
+                self._insert_jobs(job_lines)
+                self._copy(Job.tags.through._meta.db_table, ('job_id', 'tag_id'), link_lines)
+                job_lines.clear()
+                link_lines.clear()
+            if application_lines and (final or len(application_lines) >= self.chunk_size):
+                self._copy(Application._meta.db_table, (
+                    'job_id', 'seeker_id', 'status', 'phone', 'message', 'created_at', 'updated_at',
+                ), application_lines)
+                application_lines.clear()
+
+        for number, pk in enumerate(job_ids):
+            title = rng.choice(titles)
+            category_id = rng.choices(category_ids, cum_weights=category_weights)[0]
+            created = oldest + span * (number + rng.random()) / count
+            rank = (number * rank_step) % count + 1
+            applicants = min(int(applications * rank ** -skew / harmonic + rng.random()), len(seeker_ids))
+            is_active = rng.random() < 0.85
+            salary = None if rng.random() < 0.1 else round(rng.lognormvariate(8, 0.6), -1)
+            job_tags = set(rng.choices(tag_ids, cum_weights=tag_weights, k=rng.randint(0, 4))) if tag_ids else ()
+
+            job_lines.append(copy_line((
+                pk, rng.choices(organization_ids, cum_weights=organization_weights)[0], category_id, title,
+                f'{slugs[title]}-{pk}', rng.choice(descriptions), rng.choices(CITIES, cum_weights=city_weights)[0],
+                salary, 't' if is_active else 'f', 'none', '{}', applicants, created, created,
+            )))
+            link_lines.extend(f'{pk}\t{tag_id}\n' for tag_id in job_tags)
+            if is_active:
+                active_by_category[category_id] += 1
+                active_by_tag.update(job_tags)
+
+            window = min((self.now - created).total_seconds(), 30 * 86400)
+            for seeker in rng.sample(seeker_ids, applicants):
+                applied = created + timedelta(seconds=rng.random() * window)
+                application_lines.append(
+                    f'{pk}\t{seeker}\tsubmitted\t01700000000\tI would like to apply.\t{applied}\t{applied}\n'
+                )
+            total_applications += applicants
+            flush()
+            if (number + 1) % 1_000_000 == 0:
+                self.stdout.write(f"  {number + 1:,} jobs, {total_applications:,} applications")
+        flush(final=True)
+
+        # COPY bypasses the signals that maintain these counters
+        if Category.adjust_active_job_counts(active_by_category):
+            job_cache.invalidate_categories()
+        if Tag.adjust_active_job_counts(active_by_tag):
+            job_cache.invalidate_tags()
+        self.stdout.write(f"  {total_applications:,} applications")
+        return count
+
+    def _insert_jobs(self, lines):
+        """
+        COPY jobs into a staging table, then move them with their search
+        document computed by the same expression Job.save() uses, so each
+        row is written once.
+        """
+        columns = (
+            'id', 'organization_id', 'category_id', 'title', 'slug', 'description', 'location', 'salary',
+            'is_active', 'banner_status', 'banner_variants', 'applicant_count', 'created_at', 'updated_at',
+        )
+        table = Job._meta.db_table
+        query = Job.objects.all().query
+        vector_sql, vector_params = query.get_compiler(connection=connection).compile(
+            JOB_SEARCH_VECTOR.resolve_expression(query)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS seed_jobs ON COMMIT DROP AS "
+                f"SELECT {', '.join(columns)} FROM {table} WITH NO DATA"
+            )
+            cursor.execute("TRUNCATE seed_jobs")
+        self._copy('seed_jobs', columns, lines)
+        with connection.cursor() as cursor:
+            # Aliased as the job table, so the compiled expression's column references resolve
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}, search_vector) "
+                f"SELECT {', '.join(columns)}, {vector_sql} FROM seed_jobs AS {connection.ops.quote_name(table)}",
+                vector_params,
+            )
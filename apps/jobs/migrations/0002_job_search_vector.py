@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:53
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+def populate_search_vector(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.update(search_vector=(
+        django.contrib.postgres.search.SearchVector('title', weight='A', config='english')
+        + django.contrib.postgres.search.SearchVector('location', weight='B', config='english')
+        + django.contrib.postgres.search.SearchVector('description', weight='C', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='job_search_vector_gin'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
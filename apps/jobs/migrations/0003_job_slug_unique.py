@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def _free_slug(Job, slug, job_id):
+    """slug suffixed with the job id, counting up while another job already has that slug."""
+    suffix, attempt = f'-{job_id}', 1
+    while True:
+        candidate = slug[:50 - len(suffix)] + suffix
+        if not Job.objects.filter(slug=candidate).exists():
+            return candidate
+        attempt += 1
+        suffix = f'-{job_id}-{attempt}'
+
+
+def deduplicate_slugs(apps, schema_editor):
+    """Make existing slugs unique (keep the oldest, suffix the rest with their id)."""
+    Job = apps.get_model('jobs', 'Job')
+    duplicates = (
+        Job.objects.exclude(slug__isnull=True)
+        .values('slug').annotate(total=Count('id')).filter(total__gt=1)
+        .values_list('slug', flat=True)
+    )
+    for slug in duplicates:
+        for job in Job.objects.filter(slug=slug).order_by('id')[1:]:
+            job.slug = _free_slug(Job, slug, job.id)
+            job.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='job',
+            name='slug',
+            field=models.SlugField(blank=True, null=True, unique=True),
+        ),
+    ]
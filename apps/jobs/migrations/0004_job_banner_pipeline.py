@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:57
+
+from django.db import migrations, models
+
+
+def mark_existing_banners_ready(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.exclude(banner__isnull=True).exclude(banner='').update(banner_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_slug_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='banner_status',
+            field=models.CharField(choices=[('none', 'No banner'), ('pending', 'Upload pending'), ('ready', 'Ready'), ('failed', 'Upload failed')], default='none', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='banner_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(mark_existing_banners_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def copy_existing_applications(apps, schema_editor):
+    """Move rows from the implicit jobSeekers_who_apply table into Application."""
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('jobs', 'Application')
+    Through = Job._meta.get_field('jobSeekers_who_apply').remote_field.through
+
+    batch = []
+    for job_id, user_id in Through.objects.values_list('job_id', 'user_id').iterator(chunk_size=BATCH_SIZE):
+        batch.append(Application(job_id=job_id, seeker_id=user_id))
+        if len(batch) >= BATCH_SIZE:
+            Application.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        Application.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_banner_pipeline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Application',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('submitted', 'Submitted'), ('reviewed', 'Reviewed'), ('shortlisted', 'Shortlisted'), ('rejected', 'Rejected')], default='submitted', max_length=20)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('message', models.TextField(blank=True)),
+                ('resume', models.FileField(blank=True, null=True, upload_to='resumes/%Y/%m/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.job')),
+                ('seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', '-created_at'], name='application_job_recent_idx'), models.Index(fields=['seeker', '-created_at'], name='application_seeker_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'seeker'), name='unique_application_per_job')],
+            },
+        ),
+        migrations.RunPython(copy_existing_applications, migrations.RunPython.noop),
+        # Django cannot add a through model to an existing M2M in place, so the
+        # field is recreated on top of Application once the rows are copied.
+        migrations.RemoveField(
+            model_name='job',
+            name='jobSeekers_who_apply',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='jobSeekers_who_apply',
+            field=models.ManyToManyField(blank=True, related_name='apply_jobs', through='jobs.Application', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
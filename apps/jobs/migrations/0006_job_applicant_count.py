@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_applicant_count(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('jobs', 'Application')
+    counts = (
+        Application.objects.filter(job_id=OuterRef('pk'))
+        .order_by().values('job_id').annotate(total=Count('id')).values('total')
+    )
+    Job.objects.update(applicant_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_application'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applicant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_applicant_count, migrations.RunPython.noop),
+    ]
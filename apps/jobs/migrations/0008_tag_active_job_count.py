@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_active_job_count(apps, schema_editor):
+    Tag = apps.get_model('jobs', 'Tag')
+    Job = apps.get_model('jobs', 'Job')
+    counts = (
+        Job.tags.through.objects.filter(tag_id=OuterRef('pk'), job__is_active=True)
+        .order_by().values('tag_id').annotate(total=Count('id')).values('total')
+    )
+    Tag.objects.update(active_job_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_jobalert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='active_job_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_active_job_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:25
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_active_job_count(apps, schema_editor):
+    Category = apps.get_model('jobs', 'Category')
+    Job = apps.get_model('jobs', 'Job')
+    counts = (
+        Job.objects.filter(category_id=OuterRef('pk'), is_active=True)
+        .order_by().values('category_id').annotate(total=Count('id')).values('total')
+    )
+    Category.objects.update(active_job_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_tag_active_job_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_job_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_active_job_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:28
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking writes to the job table
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0009_category_active_job_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='job_org_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='job_active_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at'], name='job_active_category_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(django.db.models.functions.text.Upper('location'), condition=models.Q(('is_active', True)), name='job_active_location_idx'),
+        ),
+    ]
@@ -1,13 +1,50 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Upper
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from apps.accounts.models import User
 from django.utils.text import slugify
-from .slug import generate_unique_slug
+from .slug import save_with_unique_slug
 from cloudinary.models import CloudinaryField
-from cloudinary.uploader import destroy
+from .tasks import enqueue_image_deletion
 
 # Create your models here.
 
-class Category(models.Model):
+# Weighted document used for job search: title matches rank above location,
+# which ranks above description. Keep in sync with migration 0002.
+JOB_SEARCH_CONFIG = 'english'
+JOB_SEARCH_FIELDS = ('title', 'location', 'description')
+JOB_SEARCH_VECTOR = (
+    SearchVector('title', weight='A', config=JOB_SEARCH_CONFIG)
+    + SearchVector('location', weight='B', config=JOB_SEARCH_CONFIG)
+    + SearchVector('description', weight='C', config=JOB_SEARCH_CONFIG)
+)
+
+class ActiveJobCounter(models.Model):
+    """Denormalized number of active jobs, kept current by the signals in signals.py."""
+
+    active_job_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def adjust_active_job_counts(cls, deltas):
+        """Apply {pk: change} to active_job_count, one UPDATE per distinct change."""
+        pks_by_delta = defaultdict(list)
+        for pk, delta in deltas.items():
+            if delta:
+                pks_by_delta[delta].append(pk)
+        for delta, pks in pks_by_delta.items():
+            cls.objects.filter(pk__in=pks).update(
+                active_job_count=Greatest(F('active_job_count') + delta, 0)
+            )
+        return bool(pks_by_delta)
+
+
+class Category(ActiveJobCounter):
     title = models.CharField(max_length=150, unique=True)
     slug = models.SlugField(null=True, blank=True)
     created_at = models.DateField(auto_now_add=True)
@@ -20,7 +57,7 @@ class Category(models.Model):
         super().save(*args, **kwargs)
 
 
-class Tag(models.Model):
+class Tag(ActiveJobCounter):
     title=models.CharField(max_length=150)
     slug=models.SlugField(null=True,blank=True)
     created_date=models.DateField(auto_now_add=True)
@@ -34,63 +71,235 @@ class Tag(models.Model):
 
 
 class Job(models.Model):
+
+    class BannerStatus(models.TextChoices):
+        NONE = 'none', 'No banner'
+        PENDING = 'pending', 'Upload pending'
+        READY = 'ready', 'Ready'
+        FAILED = 'failed', 'Upload failed'
+
     organization = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
     category = models.ForeignKey(
         Category, related_name="category_jobs", on_delete=models.CASCADE
     )
     tags=models.ManyToManyField(Tag,related_name='tag_jobs',blank=True)
-    jobSeekers_who_apply = models.ManyToManyField(User, blank=True, related_name="apply_jobs")
+    jobSeekers_who_apply = models.ManyToManyField(
+        User, through='Application', blank=True, related_name="apply_jobs"
+    )
     title = models.CharField(max_length=200)
-    slug=models.SlugField(null=True, blank=True)
+    slug=models.SlugField(null=True, blank=True, unique=True)
     description = models.TextField()
     location = models.CharField(max_length=200)
     banner = CloudinaryField('banner', null=True, blank=True)
+    banner_status = models.CharField(max_length=10, choices=BannerStatus.choices, default=BannerStatus.NONE)
+    banner_variants = models.JSONField(default=dict, blank=True)  # {variant name: url}
     salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    applicant_count = models.PositiveIntegerField(default=0, editable=False)  # Maintained by Application signals
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='job_search_vector_gin'),
+            # OrganizationJobListView: organization's jobs, newest first, keyset on (created_at, id)
+            models.Index(fields=['organization', '-created_at', '-id'], name='job_org_recent_idx'),
+            # JobSearchView: active jobs newest first, optionally within one category
+            models.Index(
+                fields=['-created_at', '-id'], name='job_active_recent_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['category', '-created_at'], name='job_active_category_recent_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # ?location= is matched case-insensitively (UPPER(location) = UPPER(%s))
+            models.Index(
+                Upper('location'), name='job_active_location_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return self.title
     
+    # Fields whose loaded values are snapshotted so save() can diff without a query
+    TRACKED_FIELDS = ('title', 'slug', 'banner', 'location', 'description', 'is_active', 'category_id')
+    # Columns never written back from a stale copy: F() counters, and the search
+    # document, which save() only writes when its source fields change
+    DB_MAINTAINED_FIELDS = ('applicant_count', 'search_vector')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def stored_value(self, name, default=None):
+        """Value of a tracked field as last loaded from or saved to the database."""
+        return getattr(self, '_loaded_values', {}).get(name, default)
+
+    def field_changed(self, name):
+        """Return True if a tracked field differs from the value loaded from the database."""
+        loaded_values = getattr(self, '_loaded_values', None)
+        if loaded_values is None or name not in loaded_values:
+            # Never loaded: unknown unless it has been assigned on this instance
+            return name in self.__dict__
+        field = self._meta.get_field(name)
+        return field.get_prep_value(loaded_values[name]) != field.get_prep_value(getattr(self, name))
+
     def save(self, *args, **kwargs):
         """🔹 Save method to handle image updates and avoid unnecessary queries."""
         updating = self.pk is not None  # Check if the object is being updated
+        update_fields = kwargs.get('update_fields')
+        if updating and not self._state.adding and update_fields is None:
+            # Never write back stale copies of columns maintained by atomic UPDATEs
+            update_fields = kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DB_MAINTAINED_FIELDS
+            ]
 
-        if updating:
-            # Fetch the original object to compare images and check for updates
-            original = Job.objects.get(pk=self.pk)
-            
-            # Check if any image has been updated, and delete the old image from Cloudinary
-            if original:
-                if original.banner != self.banner:
-                    if original.banner:
-                        self._delete_image_from_cloudinary(original.banner)
-                
-            # If the title has changed, generate a new slug
-            if original.title != self.title:
-                self.slug = generate_unique_slug(self, self.title, update=True)
-                
-        else:
-            # Generate slug only for new objects
-            self.slug = generate_unique_slug(self, self.title)
-
-        # Call the parent class save method to store the flat object
-        super().save(*args, **kwargs)
+        # Diff against the snapshot taken in from_db() instead of re-fetching the row
+        regenerate_slug = not updating or self.field_changed('title')
+        search_changed = not updating or any(self.field_changed(name) for name in JOB_SEARCH_FIELDS)
+        old_banner = None
+        if updating and self.field_changed('banner'):
+            old_banner = self.stored_value('banner')
+
+        written = set(kwargs['update_fields']) if update_fields is not None else None
+        write_document = search_changed and (written is None or bool(written & set(JOB_SEARCH_FIELDS)))
+        if write_document:
+            # Written in the same INSERT/UPDATE as the row rather than a second query
+            self.search_vector = self.search_document(written)
+            if written is not None:
+                written.add('search_vector')
+
+        if regenerate_slug and written is not None:
+            written.add('slug')
+        if written is not None:
+            kwargs['update_fields'] = written
+
+        try:
+            if regenerate_slug:
+                # The unique index on slug arbitrates collisions; see slug.save_with_unique_slug
+                save_with_unique_slug(self, self.title, lambda: super(Job, self).save(*args, **kwargs))
+            else:
+                super().save(*args, **kwargs)
+        finally:
+            if write_document:
+                # Drop the expression; the stored document is loaded again on access
+                del self.search_vector
+
+        if old_banner:
+            # Old image is removed by a worker once the new value is committed
+            self._schedule_image_deletion(old_banner)
+
+        # Only the columns just written match the database now
+        saved = self.TRACKED_FIELDS if written is None else {
+            self._meta.get_field(name).attname for name in written
+        }
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{name: self.__dict__[name] for name in self.TRACKED_FIELDS if name in saved and name in self.__dict__},
+        }
+
+    def search_document(self, written=None):
+        """
+        Search vector expression built from this instance's values, so it can be
+        saved with the row. Fields outside ``written`` keep their stored column.
+        """
+        def part(name, weight):
+            if written is None or name in written:
+                source = Value(getattr(self, name) or '', output_field=models.TextField())
+            else:
+                source = name
+            return SearchVector(source, weight=weight, config=JOB_SEARCH_CONFIG)
+
+        return part('title', 'A') + part('location', 'B') + part('description', 'C')
 
     def delete(self, *args, **kwargs):
         """Override delete method to remove images from Cloudinary when flat is deleted."""
         if self.banner:
-            self._delete_image_from_cloudinary(self.banner)
+            self._schedule_image_deletion(self.banner)
 
         # Call the parent class delete method to remove the record from the database
-        super().delete(*args, **kwargs)
-
-    def _delete_image_from_cloudinary(self, image_field):
-        """Helper function to delete image from Cloudinary."""
-        if image_field and image_field.url:
-            public_id = image_field.url.split('/')[-1].split('.')[0]  # Extract the public_id from URL
-            try:
-                destroy(public_id)  # Delete image from Cloudinary
-            except Exception as e:
-                print(f"Error deleting image from Cloudinary: {e}")
\ No newline at end of file
+        return super().delete(*args, **kwargs)
+
+    def _schedule_image_deletion(self, image_field):
+        """Queue deletion of a Cloudinary image after the surrounding transaction commits."""
+        public_id = getattr(image_field, 'public_id', None)
+        if public_id:
+            transaction.on_commit(lambda: enqueue_image_deletion(public_id))
+
+
+class Application(models.Model):
+
+    class Status(models.TextChoices):
+        SUBMITTED = 'submitted', 'Submitted'
+        REVIEWED = 'reviewed', 'Reviewed'
+        SHORTLISTED = 'shortlisted', 'Shortlisted'
+        REJECTED = 'rejected', 'Rejected'
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
+    seeker = models.ForeignKey(User, on_delete=models.CASCADE, related_name='applications')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.SUBMITTED)
+    phone = models.CharField(max_length=20, blank=True)
+    message = models.TextField(blank=True)
+    resume = models.FileField(upload_to='resumes/%Y/%m/', null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Duplicate applications are rejected by the database, not by a prior SELECT
+            models.UniqueConstraint(fields=['job', 'seeker'], name='unique_application_per_job'),
+        ]
+        indexes = [
+            models.Index(fields=['job', '-created_at'], name='application_job_recent_idx'),
+            models.Index(fields=['seeker', '-created_at'], name='application_seeker_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.seeker} -> {self.job}"
+
+
+class JobAlert(models.Model):
+    """
+    A job seeker's saved search. Every criterion left empty matches any job;
+    a job matches when it satisfies all the criteria that are set (and, for
+    tags, carries at least one of the alert's tags).
+    """
+
+    seeker = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_alerts')
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name='job_alerts', null=True, blank=True
+    )
+    tags = models.ManyToManyField(Tag, related_name='job_alerts', blank=True)
+    location = models.CharField(max_length=200, blank=True)  # Stored normalized, see normalize_location()
+    min_salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Fan-out walks active alerts in seeker order and filters on
+            # category/location without visiting the table
+            models.Index(
+                fields=['seeker', 'category', 'location'], name='job_alert_match_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Alert #{self.pk} for {self.seeker}"
+
+    @staticmethod
+    def normalize_location(location):
+        return ' '.join((location or '').split()).lower()
+
+    def save(self, *args, **kwargs):
+        self.location = self.normalize_location(self.location)
+        super().save(*args, **kwargs)
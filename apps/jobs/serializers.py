@@ -1,20 +1,103 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from apps.accounts.models import User
-from .models import Category, Tag, Job
-from cloudinary.uploader import upload  # For manual Cloudinary upload from URL
+from .models import Category, Tag, Job, Application, JobAlert
+from .storage import stage_banner
+from .tasks import enqueue_banner_upload
+
+class SparseFieldsetsMixin:
+    """
+    Let GET requests choose the serialized fields with ?fields=id,title,...
+    Unknown names are ignored; without the parameter every field is returned.
+    """
+
+    fields_query_param = 'fields'
+
+    @classmethod
+    def requested_fields(cls, request):
+        """Set of field names asked for by the request, or None for all fields."""
+        if request is None or request.method != 'GET':
+            return None
+        value = request.query_params.get(cls.fields_query_param)
+        if not value:
+            return None
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.requested_fields(self.context.get('request'))
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """Resolve a list of primary keys with one IN query instead of one query per key."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        pk_field = child.get_queryset().model._meta.pk
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+            try:
+                pks.append(pk_field.to_python(item))
+            except DjangoValidationError:
+                child.fail('incorrect_type', data_type=type(item).__name__)
+        found = child.get_queryset().in_bulk(pks)
+        for pk in pks:
+            if pk not in found:
+                child.fail('does_not_exist', pk_value=pk)
+        return [found[pk] for pk in dict.fromkeys(pks)]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField whose many=True form is a BulkManyRelatedField."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
 
 # Category Serializer
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = '_all__'
+        exclude = ['active_job_count']  # Listed by CategoryListView only, see CategoryCountSerializer
+
+
+# Category Serializer with the number of active jobs in the category
+class CategoryCountSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'title', 'slug', 'created_at', 'active_job_count']
 
 
 # Tag Serializer
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = '__all__'
+        exclude = ['active_job_count']  # Listed by TagListView only, see TagCountSerializer
+
+
+# Tag Serializer with the number of active jobs carrying the tag
+class TagCountSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['id', 'title', 'slug', 'created_date', 'active_job_count']
 
 
 # Organization Serializer
@@ -24,7 +107,7 @@ class OrganizationSerializer(serializers.ModelSerializer):
         fields = ['id', 'organization_name', 'email', 'website']
 
 
-# Job Seeker Serializer (for jobSeekers_who_apply)
+# Job Seeker Serializer (for job applicants)
 class JobSeekerSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -32,41 +115,70 @@ class JobSeekerSerializer(serializers.ModelSerializer):
 
 
 # Job Serializer (updated)
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), source='category', write_only=True
     )
     category_title = serializers.StringRelatedField(source='category', read_only=True)
     tags = TagSerializer(many=True, read_only=True)  # Read-only for output (full details)
-    tags_ids = serializers.PrimaryKeyRelatedField(  # New: Writable field for input (IDs)
+    tags_ids = BulkPrimaryKeyRelatedField(  # New: Writable field for input (IDs)
         queryset=Tag.objects.all(), many=True, source='tags', write_only=True
     )
     organization = OrganizationSerializer(read_only=True)  # Read-only for output
-    jobSeekers_who_apply = JobSeekerSerializer(many=True, read_only=True)  # New field
 
     class Meta:
         model = Job
         fields = [
             'id', 'title', 'organization', 'category', 'category_id', 'category_title',
             'tags', 'tags_ids', 'slug',  # Note: tags_ids for input
-            'description', 'location', 'banner', 'salary', 'is_active', 'jobSeekers_who_apply',
-            'created_at', 'updated_at'
+            'description', 'location', 'banner', 'banner_status', 'banner_variants',
+            'salary', 'is_active', 'applicant_count', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'slug', 'banner_status', 'banner_variants', 'applicant_count', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'slug', 'jobSeekers_who_apply', 'created_at', 'updated_at']
+
+    def validate_banner(self, value):
+        """
+        Validate an uploaded banner image before it is staged.
+        """
+        if isinstance(value, UploadedFile):
+            max_size = 5 * 1024 * 1024  # 5MB in bytes
+            if value.size > max_size:
+                raise serializers.ValidationError("Banner file size must be less than 5MB.")
+            if not (value.content_type or '').startswith('image/'):
+                raise serializers.ValidationError("Banner must be an image.")
+        return value
+
+    def _pop_banner_upload(self, validated_data):
+        """Take an uploaded banner file out of validated_data so it is not uploaded inline."""
+        if isinstance(validated_data.get('banner'), UploadedFile):
+            return validated_data.pop('banner')
+        return None
+
+    def _schedule_banner_upload(self, job, banner_file):
+        """Stage the file locally and let a Celery worker push it to banner storage."""
+        staged_name = stage_banner(banner_file)
+        job.banner_status = Job.BannerStatus.PENDING
+        job.save(update_fields=['banner_status'])
+        transaction.on_commit(lambda: enqueue_banner_upload(job.pk, staged_name))
 
     def validate(self, data):
         """
         Custom validation to ensure required fields are provided and valid.
         """
-        if not data.get('title'):
-            raise serializers.ValidationError({"title": "Title is required."})
-        if not data.get('description'):
-            raise serializers.ValidationError({"description": "Description is required."})
-        if not data.get('location'):
-            raise serializers.ValidationError({"location": "Location is required."})
-        if not data.get('category'):
-            raise serializers.ValidationError({"category_id": "Category is required."})
+        required = (
+            ('title', 'title', "Title is required."),
+            ('description', 'description', "Description is required."),
+            ('location', 'location', "Location is required."),
+            ('category', 'category_id', "Category is required."),
+        )
+        for field, error_key, message in required:
+            if self.partial and field not in data:
+                continue  # PATCH keeps the stored value
+            if not data.get(field):
+                raise serializers.ValidationError({error_key: message})
         # No need to validate organization_id anymore - it will be auto-set
         return data
 
@@ -77,6 +189,7 @@ class JobSerializer(serializers.ModelSerializer):
         """
         # Pop tags_ids (list of Tag instances from PrimaryKeyRelatedField)
         tags = validated_data.pop('tags', [])  # Now this will have instances if tags_ids provided
+        banner_file = self._pop_banner_upload(validated_data)
         # Auto-set organization from context (authenticated user)
         request = self.context.get('request')
         if request and request.user:
@@ -87,6 +200,8 @@ class JobSerializer(serializers.ModelSerializer):
         job = Job.objects.create(**validated_data)
         if tags:
             job.tags.set(tags)
+        if banner_file:
+            self._schedule_banner_upload(job, banner_file)
         return job
 
     def update(self, instance, validated_data):
@@ -94,22 +209,57 @@ class JobSerializer(serializers.ModelSerializer):
         Handle updating of a Job instance with related fields.
         """
         tags = validated_data.pop('tags', None)  # tags here means instances from tags_ids
+        banner_file = self._pop_banner_upload(validated_data)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
+        if 'banner' in validated_data and not validated_data['banner']:
+            instance.banner_status = Job.BannerStatus.NONE
+            instance.banner_variants = {}
         if tags is not None:
             instance.tags.set(tags)
         instance.save()
+        if banner_file:
+            self._schedule_banner_upload(instance, banner_file)
         return instance  # Fixed: was 'return job' (undefined)
 
 
+class NameListField(serializers.ListField):
+    """A list of names, also accepted as one comma-separated string (as in CSV cells)."""
+
+    child = serializers.CharField()
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [name.strip() for name in data.split(',') if name.strip()]
+        return super().to_internal_value(data)
+
+
+# One row of a bulk job import; category and tags are resolved per chunk by the importer
+class JobImportRowSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField()
+    location = serializers.CharField(max_length=200)
+    category = serializers.CharField()  # Category title or slug
+    tags = NameListField(required=False)  # Tag titles or slugs
+    salary = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    is_active = serializers.BooleanField(required=False, default=True)
+
+
 # Application Serializer
-class ApplicationSerializer(serializers.Serializer):
-    first_name = serializers.CharField(max_length=255)
-    last_name = serializers.CharField(max_length=255)
-    email = serializers.EmailField()
-    phone = serializers.CharField(max_length=20)
-    message = serializers.CharField(max_length=1000)
-    resume = serializers.FileField(required=False, allow_null=True)
+class ApplicationSerializer(serializers.ModelSerializer):
+    seeker = JobSeekerSerializer(read_only=True)
+    job_title = serializers.CharField(source='job.title', read_only=True)
+
+    class Meta:
+        model = Application
+        fields = [
+            'id', 'job', 'job_title', 'seeker', 'status', 'phone', 'message', 'resume', 'created_at'
+        ]
+        read_only_fields = ['id', 'job', 'seeker', 'status', 'created_at']
+        extra_kwargs = {
+            'phone': {'required': True, 'allow_blank': False},
+            'message': {'max_length': 1000},
+        }
 
     def validate_resume(self, value):
         """
@@ -133,4 +283,41 @@ class ApplicationSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 {"non_field_errors": "Either a message or a resume must be provided."}
             )
-        return data
\ No newline at end of file
+        return data
+
+# Job Alert Serializer
+class JobAlertSerializer(serializers.ModelSerializer):
+    category = CategorySerializer(read_only=True)
+    category_id = serializers.PrimaryKeyRelatedField(
+        queryset=Category.objects.all(), source='category', write_only=True,
+        required=False, allow_null=True
+    )
+    tags = TagSerializer(many=True, read_only=True)
+    tags_ids = BulkPrimaryKeyRelatedField(
+        queryset=Tag.objects.all(), many=True, source='tags', write_only=True, required=False
+    )
+
+    class Meta:
+        model = JobAlert
+        fields = [
+            'id', 'category', 'category_id', 'tags', 'tags_ids', 'location',
+            'min_salary', 'is_active', 'created_at'
+        ]
+        read_only_fields = ['id', 'created_at']
+
+    def create(self, validated_data):
+        tags = validated_data.pop('tags', [])
+        validated_data['seeker'] = self.context['request'].user
+        alert = JobAlert.objects.create(**validated_data)
+        if tags:
+            alert.tags.set(tags)
+        return alert
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save()
+        if tags is not None:
+            instance.tags.set(tags)
+        return instance
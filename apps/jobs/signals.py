@@ -0,0 +1,183 @@
+from collections import Counter
+
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.accounts.models import User
+from . import cache as job_cache
+from .models import Category, Tag, Job, Application
+
+
+@receiver(post_save, sender=Application)
+def increment_applicant_count(sender, instance, created, **kwargs):
+    """Keep Job.applicant_count in step with new applications (runs in the same transaction)."""
+    if created:
+        Job.objects.filter(pk=instance.job_id).update(applicant_count=F('applicant_count') + 1)
+
+
+def _deleted_model(origin):
+    """Model of the instance or queryset whose delete() started the cascade."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_delete, sender=Application)
+def decrement_applicant_count(sender, instance, origin=None, **kwargs):
+    # Cascades from a job, category or organization delete take the job along, and
+    # a deleted job seeker is settled in one UPDATE by release_seeker_applications()
+    if origin is not None and not issubclass(_deleted_model(origin), Application):
+        return
+    Job.objects.filter(pk=instance.job_id, applicant_count__gt=0).update(
+        applicant_count=F('applicant_count') - 1
+    )
+
+
+@receiver(pre_delete, sender=User)
+def release_seeker_applications(sender, instance, **kwargs):
+    """A job seeker holds at most one application per job, so each of their jobs loses one."""
+    if instance.role == User.Role.JOB_SEEKER:
+        Job.objects.filter(applications__seeker=instance, applicant_count__gt=0).update(
+            applicant_count=F('applicant_count') - 1
+        )
+
+
+# Tag.active_job_count: one per active job carrying the tag. Jobs count by
+# their stored is_active, so a serializer that changes tags before saving a
+# new is_active is settled by the post_save flip below.
+
+def _active_tag_links(instance, reverse, pk_set=None):
+    """Counter of tag id -> linked active jobs, for the links m2m_changed is about."""
+    links = Job.tags.through.objects.all()
+    if reverse:  # instance is a Tag, pk_set holds job ids
+        links = links.filter(tag_id=instance.pk, job__is_active=True)
+        if pk_set is not None:
+            links = links.filter(job_id__in=pk_set)
+        return Counter({instance.pk: links.count()})
+    if not instance.stored_value('is_active', instance.is_active):
+        return Counter()
+    links = links.filter(job_id=instance.pk)
+    if pk_set is not None:
+        links = links.filter(tag_id__in=pk_set)
+    return Counter(links.values_list('tag_id', flat=True))
+
+
+def _adjust_tag_counts(deltas):
+    if Tag.adjust_active_job_counts(deltas):
+        job_cache.invalidate_tags()
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def update_tag_job_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # Remember the links that actually exist; they are gone by post_remove/post_clear
+        instance._removed_tag_links = _active_tag_links(instance, reverse, pk_set)
+    elif action in ('post_remove', 'post_clear'):
+        removed = getattr(instance, '_removed_tag_links', Counter())
+        instance._removed_tag_links = Counter()
+        _adjust_tag_counts({tag_id: -count for tag_id, count in removed.items()})
+    elif action == 'post_add' and pk_set:
+        # pk_set only holds the links that were actually created
+        if reverse:
+            added = Counter({instance.pk: Job.objects.filter(pk__in=pk_set, is_active=True).count()})
+        elif instance.stored_value('is_active', instance.is_active):
+            added = Counter(pk_set)
+        else:
+            added = Counter()
+        _adjust_tag_counts(added)
+
+
+def _job_tag_ids(job):
+    return Job.tags.through.objects.filter(job_id=job.pk).values_list('tag_id', flat=True)
+
+
+@receiver(post_save, sender=Job)
+def update_tag_counts_on_activation(sender, instance, created, update_fields, **kwargs):
+    was_active = instance.stored_value('is_active')
+    if created or was_active is None or was_active == instance.is_active:
+        return
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+    change = 1 if instance.is_active else -1
+    _adjust_tag_counts({tag_id: change for tag_id in _job_tag_ids(instance)})
+
+
+@receiver(pre_delete, sender=Job)
+def update_tag_counts_on_delete(sender, instance, **kwargs):
+    # The delete collector removes through rows without sending m2m_changed
+    if instance.stored_value('is_active', instance.is_active):
+        _adjust_tag_counts({tag_id: -1 for tag_id in _job_tag_ids(instance)})
+
+
+# Category.active_job_count: one per active job in the category, moved by
+# creates, deletes, is_active flips and category changes. The
+# reconcile_active_job_counts task repairs any drift from bulk writes.
+
+def _adjust_category_counts(deltas):
+    if Category.adjust_active_job_counts(deltas):
+        job_cache.invalidate_categories()
+
+
+@receiver(post_save, sender=Job)
+def update_category_counts(sender, instance, created, update_fields, **kwargs):
+    deltas = Counter()
+    if created:
+        if instance.is_active:
+            deltas[instance.category_id] += 1
+    else:
+        was_active = instance.stored_value('is_active')
+        old_category_id = instance.stored_value('category_id')
+        if was_active is None or old_category_id is None:
+            return  # Nothing known about the stored row
+        written = set(update_fields) if update_fields is not None else None
+        is_active = instance.is_active if written is None or 'is_active' in written else was_active
+        category_id = (
+            instance.category_id if written is None or written & {'category', 'category_id'} else old_category_id
+        )
+        if was_active:
+            deltas[old_category_id] -= 1
+        if is_active:
+            deltas[category_id] += 1
+    _adjust_category_counts(deltas)
+
+
+@receiver(pre_delete, sender=Job)
+def update_category_counts_on_delete(sender, instance, **kwargs):
+    if instance.stored_value('is_active', instance.is_active):
+        _adjust_category_counts({instance.stored_value('category_id', instance.category_id): -1})
+
+
+# Response cache invalidation. Cached job details may show an applicant_count
+# up to JOBS_CACHE_TIMEOUT old, since the counter is bumped without a save().
+
+@receiver(post_save, sender=Job)
+def invalidate_saved_job(sender, instance, **kwargs):
+    # The stored values are still the pre-save ones when post_save fires
+    old_slug = instance.stored_value('slug')
+    job_cache.invalidate_job_detail(instance.slug, old_slug)
+
+
+@receiver(post_delete, sender=Job)
+def invalidate_deleted_job(sender, instance, **kwargs):
+    job_cache.invalidate_job_detail(instance.slug)
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def invalidate_job_tags(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        job_cache.invalidate_all_jobs()  # Changed from the tag side; affected jobs are unknown
+    else:
+        job_cache.invalidate_job_detail(instance.slug)
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tag(sender, instance, **kwargs):
+    job_cache.invalidate_tags()
+    job_cache.invalidate_all_jobs()
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    job_cache.invalidate_categories()
+    job_cache.invalidate_all_jobs()
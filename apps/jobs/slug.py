@@ -1,33 +1,70 @@
-import random
+import secrets
 import string
 
+from django.db import IntegrityError, transaction
 from django.utils.text import slugify
 
+SLUG_SUFFIX_LENGTH = 6
+SLUG_SUFFIX_ALPHABET = string.ascii_lowercase + string.digits
+MAX_SLUG_ATTEMPTS = 5
 
-def generate_unique_slug(instance, base_title, new_slug=False, update=False):
-    slug = slugify(base_title)
-    model = instance.__class__
 
-    if new_slug:
-        slug = new_slug
+def _base_slug(instance, base_title):
+    """Slugified title, truncated so a suffix still fits in the slug column."""
+    max_length = instance._meta.get_field('slug').max_length
+    slug = slugify(base_title)[:max_length - SLUG_SUFFIX_LENGTH - 1].strip('-')
+    return slug or instance._meta.model_name
 
-    if update:
-        slug_exists = model.objects.filter(
-        slug__icontains=slug
-    ).exclude(pk=instance.pk)
 
-    else:
-        slug_exists = model.objects.filter(
-        slug__icontains=slug
-    ).exists()
+def slug_candidates(instance, base_title):
+    """Yield the plain slug first, then randomly suffixed variants (36^6 possibilities each)."""
+    slug = _base_slug(instance, base_title)
+    yield slug
+    for _ in range(MAX_SLUG_ATTEMPTS - 1):
+        suffix = "".join(secrets.choice(SLUG_SUFFIX_ALPHABET) for _ in range(SLUG_SUFFIX_LENGTH))
+        yield f"{slug}-{suffix}"
 
-    if slug_exists:
-        random_string = "".join(random.choices(string.ascii_lowercase, k=4))
-        new = slugify(base_title + '-' + random_string)
-        return generate_unique_slug(
-            instance,
-            base_title,
-            new_slug=new
-        )
 
-    return slug
\ No newline at end of file
+def _slug_taken(instance, slug):
+    # Exact match, answered by the unique index on slug
+    return instance.__class__.objects.filter(slug=slug).exclude(pk=instance.pk).exists()
+
+
+def save_with_unique_slug(instance, base_title, save):
+    """
+    Assign a slug and call save() without checking for collisions first:
+    the unique index rejects a taken slug, in which case the next candidate
+    is tried inside a fresh savepoint.
+    """
+    for slug in slug_candidates(instance, base_title):
+        instance.slug = slug
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            if not _slug_taken(instance, slug):
+                raise  # Some other constraint failed
+    raise IntegrityError(f"Could not allocate a unique slug for {base_title!r}")
+
+
+def assign_bulk_slugs(instances, titles):
+    """
+    Give unsaved instances slugs with one query for the whole batch: the plain
+    slug when it is neither taken nor repeated within the batch, otherwise a
+    random-suffixed candidate. The unique index still arbitrates concurrent
+    writers, so callers retry the batch on IntegrityError.
+    """
+    if not instances:
+        return
+    candidates = [slug_candidates(instance, title) for instance, title in zip(instances, titles)]
+    plain = [next(slugs) for slugs in candidates]
+    model = instances[0].__class__
+    used = set(model.objects.filter(slug__in=set(plain)).values_list('slug', flat=True))
+    for instance, slug, slugs in zip(instances, plain, candidates):
+        while slug in used:
+            slug = next(slugs, None)
+            if slug is None:
+                raise IntegrityError(f"Could not allocate a unique slug for {instance}")
+        used.add(slug)
+        instance.slug = slug
@@ -0,0 +1,102 @@
+import os
+import shutil
+import uuid
+
+import cloudinary
+import cloudinary.uploader
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+
+def get_staging_storage():
+    """Local area where uploaded banners wait for the upload worker."""
+    return FileSystemStorage(location=settings.BANNER_STAGING_ROOT)
+
+
+def stage_banner(uploaded_file):
+    """Write an uploaded banner to the staging area and return its staged name."""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    return get_staging_storage().save(f"{uuid.uuid4().hex}{extension}", uploaded_file)
+
+
+def get_banner_storage():
+    """Instantiate the backend named by settings.BANNER_STORAGE_BACKEND."""
+    return import_string(settings.BANNER_STORAGE_BACKEND)()
+
+
+class BaseBannerStorage:
+    """
+    Interface for banner storage backends. upload() returns a dict with the
+    public id, the value to store in Job.banner and a {variant name: url}
+    mapping built from settings.BANNER_VARIANTS.
+    """
+
+    def upload(self, path, public_id):
+        raise NotImplementedError
+
+    def delete(self, public_id):
+        raise NotImplementedError
+
+
+class CloudinaryBannerStorage(BaseBannerStorage):
+    """Uploads to Cloudinary and generates the size variants eagerly at upload time."""
+
+    def _transformation(self, width, height):
+        return {'width': width, 'height': height, 'crop': 'fill'}
+
+    def upload(self, path, public_id):
+        variants = settings.BANNER_VARIANTS
+        result = cloudinary.uploader.upload(
+            path,
+            public_id=public_id,
+            eager=[self._transformation(*size) for size in variants.values()],
+        )
+        image = cloudinary.CloudinaryImage(result['public_id'], version=result['version'])
+        return {
+            'public_id': result['public_id'],
+            'value': (
+                f"{result['resource_type']}/{result['type']}/v{result['version']}/"
+                f"{result['public_id']}.{result['format']}"
+            ),
+            'variants': {
+                name: image.build_url(secure=True, **self._transformation(*size))
+                for name, size in variants.items()
+            },
+        }
+
+    def delete(self, public_id):
+        cloudinary.uploader.destroy(public_id)
+
+
+class LocalBannerStorage(BaseBannerStorage):
+    """Filesystem stand-in for Cloudinary, used in tests and offline development."""
+
+    def __init__(self):
+        self.storage = FileSystemStorage(
+            location=settings.BANNER_LOCAL_ROOT, base_url=settings.BANNER_LOCAL_URL
+        )
+
+    def upload(self, path, public_id):
+        extension = os.path.splitext(path)[1].lower() or '.jpg'
+        name = f"{public_id}{extension}"
+        target = self.storage.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+
+        variants = {}
+        with Image.open(path) as image:
+            for variant, size in settings.BANNER_VARIANTS.items():
+                variant_name = f"{public_id}_{variant}{extension}"
+                ImageOps.fit(image, size).save(self.storage.path(variant_name))
+                variants[variant] = self.storage.url(variant_name)
+        return {'public_id': public_id, 'value': f"image/upload/{name}", 'variants': variants}
+
+    def delete(self, public_id):
+        directory, prefix = os.path.split(self.storage.path(public_id))
+        if not os.path.isdir(directory):
+            return
+        for filename in os.listdir(directory):
+            if filename.startswith(f"{prefix}.") or filename.startswith(f"{prefix}_"):
+                os.remove(os.path.join(directory, filename))
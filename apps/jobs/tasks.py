@@ -0,0 +1,219 @@
+import logging
+import uuid
+from celery import current_app, shared_task
+from celery.exceptions import OperationalError
+from django.conf import settings
+from django.core.mail import get_connection
+from apps.accounts.emails import build_emails
+from apps.accounts.models import EmailNotification, User
+from apps.accounts.tasks import send_with_connection
+from .storage import get_banner_storage, get_staging_storage
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def delete_banner_image(self, public_id):
+    try:
+        get_banner_storage().delete(public_id)
+        logger.info(f"Deleted banner image public_id={public_id}")
+    except Exception as e:
+        logger.error(f"Failed to delete banner image public_id={public_id}: {str(e)}")
+        try:
+            self.retry(countdown=60)  # Retry after 60 seconds
+        except self.MaxRetriesExceededError:
+            logger.critical(f"Max retries exceeded for deleting banner image public_id={public_id}")
+            return False
+        return False
+    return True
+
+
+def enqueue_image_deletion(public_id):
+    """Queue a banner deletion; a broker outage only leaves an orphaned image behind."""
+    try:
+        delete_banner_image.delay(public_id)
+    except OperationalError as e:
+        logger.error(f"Failed to queue banner deletion for public_id={public_id}: {str(e)}")
+
+
+@shared_task(bind=True, max_retries=3)
+def process_job_banner(self, job_id, staged_name):
+    """Upload a staged banner, record its size variants on the job and clear the staging file."""
+    from .models import Job
+
+    staging = get_staging_storage()
+    if not staging.exists(staged_name):
+        logger.error(f"Staged banner {staged_name} for job_id={job_id} no longer exists")
+        return False
+
+    try:
+        result = get_banner_storage().upload(
+            staging.path(staged_name), public_id=f"jobs/banners/{job_id}-{uuid.uuid4().hex[:8]}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to upload banner for job_id={job_id}: {str(e)}")
+        try:
+            self.retry(countdown=60)  # Retry after 60 seconds
+        except self.MaxRetriesExceededError:
+            logger.critical(f"Max retries exceeded for uploading banner for job_id={job_id}")
+            # save() rather than QuerySet.update(), so the cached job detail is invalidated
+            job = Job.objects.filter(pk=job_id).first()
+            if job is not None:
+                job.banner_status = Job.BannerStatus.FAILED
+                job.save(update_fields=['banner_status', 'updated_at'])
+            staging.delete(staged_name)
+            return False
+        return False
+
+    try:
+        job = Job.objects.get(pk=job_id)
+    except Job.DoesNotExist:
+        logger.warning(f"Job job_id={job_id} was deleted before its banner finished uploading")
+        get_banner_storage().delete(result['public_id'])
+        staging.delete(staged_name)
+        return False
+
+    # save() schedules deletion of any banner this one replaces
+    job.banner = result['value']
+    job.banner_variants = result['variants']
+    job.banner_status = Job.BannerStatus.READY
+    job.save(update_fields=['banner', 'banner_variants', 'banner_status', 'updated_at'])
+    staging.delete(staged_name)
+    logger.info(f"Banner uploaded for job_id={job_id}")
+    return True
+
+
+def enqueue_banner_upload(job_id, staged_name):
+    """Queue the upload worker; the job stays 'pending' if the broker is unreachable."""
+    try:
+        process_job_banner.delay(job_id, staged_name)
+    except OperationalError as e:
+        logger.error(f"Failed to queue banner upload for job_id={job_id}: {str(e)}")
+
+
+@shared_task(bind=True, max_retries=3)
+def fan_out_job_alerts(self, job_id, job_url, after_id=0):
+    """
+    Split the seekers whose alerts match a new job into batches of
+    JOB_ALERT_BATCH_SIZE and queue one send_job_alert_batch per batch. A run
+    queues at most JOB_ALERT_BATCHES_PER_TASK batches, then hands the rest to a
+    fresh task starting after the last seeker id it reached.
+    """
+    from .alerts import load_alert_job, matching_seeker_ids
+
+    job = load_alert_job(job_id)
+    if job is None:
+        logger.info(f"Skipping alerts for job_id={job_id}: job is missing or inactive")
+        return 0
+
+    tag_ids = list(job.tags.values_list('id', flat=True))
+    batch_size = settings.JOB_ALERT_BATCH_SIZE
+    queued = 0
+    try:
+        with current_app.producer_or_acquire() as producer:
+            for _ in range(settings.JOB_ALERT_BATCHES_PER_TASK):
+                seeker_ids = matching_seeker_ids(job, tag_ids, after_id, batch_size)
+                if not seeker_ids:
+                    break
+                send_job_alert_batch.apply_async(args=(job_id, job_url, seeker_ids), producer=producer)
+                after_id = seeker_ids[-1]
+                queued += len(seeker_ids)
+                if len(seeker_ids) < batch_size:
+                    break
+            else:
+                # More subscribers may follow; continue in a new task
+                fan_out_job_alerts.apply_async(args=(job_id, job_url, after_id), producer=producer)
+    except Exception as e:
+        logger.error(f"Failed to fan out alerts for job_id={job_id} after seeker_id={after_id}: {str(e)}")
+        try:
+            # Resume after the last batch that was queued
+            self.retry(args=(job_id, job_url, after_id), countdown=60)
+        except self.MaxRetriesExceededError:
+            logger.critical(f"Max retries exceeded for fanning out alerts for job_id={job_id}")
+            return queued
+        return queued
+
+    logger.info(f"Queued job alerts for {queued} seekers for job_id={job_id}")
+    return queued
+
+
+@shared_task(bind=True, max_retries=3)
+def send_job_alert_batch(self, job_id, job_url, seeker_ids):
+    """Email one batch of seekers about a new job over a single mail connection."""
+    from .alerts import alert_context, load_alert_job
+
+    job = load_alert_job(job_id)
+    if job is None:
+        return 0
+
+    seekers = list(
+        User.objects.filter(id__in=seeker_ids, is_active=True).only('id', 'email', 'first_name')
+    )
+    messages = build_emails(
+        EmailNotification.Kind.JOB_ALERT,
+        ((seeker.email, alert_context(job, seeker, job_url)) for seeker in seekers),
+    )
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        outcomes = send_with_connection(connection, messages)
+        failed_ids = [seeker.id for seeker, (sent, _) in zip(seekers, outcomes) if not sent]
+    except Exception as e:
+        logger.error(f"Failed to open mail connection for job_id={job_id} alert batch: {str(e)}")
+        failed_ids = [seeker.id for seeker in seekers]
+    finally:
+        connection.close()
+
+    if failed_ids:
+        logger.error(f"Failed to send {len(failed_ids)} of {len(seekers)} alerts for job_id={job_id}")
+        try:
+            # Only the recipients that were not sent are retried
+            self.retry(args=(job_id, job_url, failed_ids), countdown=60)
+        except self.MaxRetriesExceededError:
+            logger.critical(f"Max retries exceeded for sending alerts for job_id={job_id} to seekers {failed_ids}")
+    sent = len(seekers) - len(failed_ids)
+    logger.info(f"Sent {sent} job alerts for job_id={job_id}")
+    return sent
+
+
+@shared_task
+def reconcile_active_job_counts():
+    """
+    Recount the active jobs of every category and tag and correct the
+    counters that drifted (writes that bypass the signals, such as
+    QuerySet.update() or raw SQL). Returns the number of rows corrected.
+    """
+    from django.db.models import Count, F, OuterRef, Subquery, Value
+    from django.db.models.functions import Coalesce
+    from . import cache as job_cache
+    from .models import Category, Job, Tag
+
+    recounts = (
+        (
+            Category,
+            Job.objects.filter(category_id=OuterRef('pk'), is_active=True)
+            .order_by().values('category_id').annotate(total=Count('id')).values('total'),
+            job_cache.invalidate_categories,
+        ),
+        (
+            Tag,
+            Job.tags.through.objects.filter(tag_id=OuterRef('pk'), job__is_active=True)
+            .order_by().values('tag_id').annotate(total=Count('id')).values('total'),
+            job_cache.invalidate_tags,
+        ),
+    )
+    corrected = 0
+    for model, counts, invalidate in recounts:
+        actual = Coalesce(Subquery(counts), Value(0))
+        drifted = list(
+            model.objects.annotate(actual=actual).exclude(active_job_count=F('actual')).values_list('pk', flat=True)
+        )
+        if not drifted:
+            continue
+        # Recounted inside the UPDATE so concurrent signal increments are not overwritten with stale values
+        model.objects.filter(pk__in=drifted).update(active_job_count=actual)
+        invalidate()
+        corrected += len(drifted)
+        logger.warning(f"Corrected active_job_count of {len(drifted)} {model._meta.verbose_name_plural}")
+    return corrected
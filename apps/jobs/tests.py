@@ -1,3 +1,1415 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import json
+import os
+import resource
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.test import TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from redis.exceptions import ConnectionError as RedisConnectionError
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.accounts.models import OutboxMessage, User
+from . import cache as job_cache
+from .models import Application, Category, Job, JobAlert, Tag, JOB_SEARCH_VECTOR
+from .exporter import APPLICATION_EXPORT_FIELDS, JOB_EXPORT_FIELDS
+from .importer import JobImporter, utf8_error_line
+from .slug import save_with_unique_slug
+from .storage import LocalBannerStorage, get_staging_storage
+from .alerts import matching_alerts, matching_seeker_ids
+from .tasks import fan_out_job_alerts, process_job_banner, reconcile_active_job_counts, send_job_alert_batch
+
+
+def insert_jobs(rows, organization_ids, category_ids, slug_prefix, locations=('Remote',), active_every=0):
+    """
+    Generate jobs in one INSERT ... SELECT; the ORM would take minutes for
+    the row counts these tests need. Row n belongs to organization and
+    category n modulo their counts, is n minutes old, and is inactive when
+    active_every divides n.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Job._meta.db_table} (
+                organization_id, category_id, title, slug, description, location, salary,
+                is_active, banner_status, banner_variants, applicant_count, created_at, updated_at
+            )
+            SELECT (%(organizations)s::bigint[])[1 + n %% %(organization_count)s],
+                   (%(categories)s::bigint[])[1 + n %% %(category_count)s],
+                   'Job ' || n, %(slug_prefix)s || n, 'Generated job',
+                   (%(locations)s::text[])[1 + n %% %(location_count)s], 1000,
+                   %(active_every)s = 0 OR n %% GREATEST(%(active_every)s, 1) <> 0, 'none', '{{}}', 0,
+                   now() - n * interval '1 minute', now()
+            FROM generate_series(1, %(rows)s) AS n
+            """,
+            {
+                'organizations': list(organization_ids), 'organization_count': len(organization_ids),
+                'categories': list(category_ids), 'category_count': len(category_ids),
+                'locations': list(locations), 'location_count': len(locations),
+                'slug_prefix': f'{slug_prefix}-', 'active_every': active_every, 'rows': rows,
+            },
+        )
+
+
+class JobExportTests(TestCase):
+    """Format and scope of the export endpoint, on a handful of rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'export-format@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Export',
+        )
+        other = User.objects.create_user(
+            'export-other@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Other',
+        )
+        cls.seeker = User.objects.create_user(
+            'export-seeker@example.com', 'password', role=User.Role.JOB_SEEKER, first_name='Ada', last_name='Lovelace',
+        )
+        category = Category.objects.create(title='Engineering')
+        tags = [Tag.objects.create(title=title) for title in ('python', 'django')]
+        cls.jobs = [
+            Job.objects.create(
+                organization=cls.organization, category=category, title=title,
+                description='Build APIs', location='Dhaka', salary=3000,
+            )
+            for title in ('Backend developer', 'Writer, "technical"')
+        ]
+        cls.jobs[0].tags.set(tags)
+        Job.objects.create(
+            organization=other, category=category, title='Not ours', description='-', location='Dhaka', salary=1,
+        )
+        Application.objects.create(job=cls.jobs[1], seeker=cls.seeker, phone='0123', message='Line one\nline two')
+
+    def export(self, path, user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.organization)
+        response = client.get(f'/api/jobs/export/{path}')
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    @override_settings(EXPORT_CHUNK_SIZE=1, EXPORT_BUFFER_SIZE=1)  # One row per fetch and per block
+    def test_jobs_csv(self):
+        response, body = self.export('jobs.csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="jobs.csv"')
+        header, *rows = csv.reader(io.StringIO(body))
+        self.assertEqual(header, list(JOB_EXPORT_FIELDS))
+        self.assertEqual([row[header.index('id')] for row in rows], [str(job.id) for job in self.jobs])
+        self.assertEqual(rows[0][header.index('tags')], 'django,python')
+        self.assertEqual(rows[1][header.index('title')], 'Writer, "technical"')
+        self.assertEqual(rows[1][header.index('tags')], '')
+        self.assertEqual(rows[0][header.index('category')], 'Engineering')
+
+    def test_applicants_jsonl(self):
+        response, body = self.export('applicants.jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        [row] = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(list(row), list(APPLICATION_EXPORT_FIELDS))
+        self.assertEqual(row['job_id'], self.jobs[1].id)
+        self.assertEqual(row['job_title'], 'Writer, "technical"')
+        self.assertEqual(row['seeker_email'], 'export-seeker@example.com')
+        self.assertEqual(row['message'], 'Line one\nline two')
+
+    def test_only_organizations_export(self):
+        client = APIClient()
+        client.force_authenticate(self.seeker)
+        self.assertEqual(client.get('/api/jobs/export/jobs.csv').status_code, 403)
+
+
+@tag('slow')
+@skipUnless(os.environ.get('RUN_SLOW_TESTS'), 'Inserts a million rows; set RUN_SLOW_TESTS=1 to run')
+class JobExportMemoryTests(TestCase):
+    """The jobs export streams from a server-side cursor, so memory stays flat as rows go out."""
+
+    ROWS = 1_000_000
+    CHECKPOINTS = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'export@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Export',
+        )
+        category = Category.objects.create(title='Export')
+        insert_jobs(cls.ROWS, [cls.organization.id], [category.id], slug_prefix='export')
+
+    def test_csv_export_of_a_million_rows_keeps_memory_flat(self):
+        client = APIClient()
+        client.force_authenticate(self.organization)
+        response = client.get('/api/jobs/export/jobs.csv')
+        self.assertEqual(response.status_code, 200)
+
+        lines, samples = 0, []
+        step = self.ROWS // self.CHECKPOINTS
+        for block in response.streaming_content:
+            lines += block.count(b'\n')
+            if lines >= step * (len(samples) + 1):
+                # Peak resident set size so far, in KiB on Linux
+                samples.append(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+        self.assertEqual(lines, self.ROWS + 1)  # Header included
+        self.assertEqual(len(samples), self.CHECKPOINTS)
+        # Whatever the first 100k rows needed is all the remaining 900k need;
+        # holding the rows in memory would add hundreds of MB
+        self.assertLess(samples[-1] - samples[0], 16 * 1024)
+
+
+class QueryPlanTestCase(TestCase):
+    """
+    Runs EXPLAIN on the SQL an endpoint actually sends and asserts how the
+    planner reaches a table. Subclasses seed enough rows, then ANALYZE, for
+    the planner to prefer indexes where they matter.
+    """
+
+    INDEX_SCANS = ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+
+    @classmethod
+    def analyze(cls, *models):
+        with connection.cursor() as cursor:
+            for model in models:
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def captured_sql(self, client, url, table, marker='LIMIT'):
+        """SELECTs on table containing marker that a GET of url executed."""
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql'] and marker in query['sql']
+        ]
+        self.assertTrue(statements, f"No query on {table} with {marker} for {url}")
+        return statements
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def plan_nodes(self, node):
+        yield node
+        for child in node.get('Plans', ()):
+            yield from self.plan_nodes(child)
+
+    def assertIndexScan(self, sql, table, *index_names):
+        """Every scan of table goes through an index, one of index_names if given."""
+        nodes = list(self.plan_nodes(self.plan(sql)))
+        scans = [node for node in nodes if node.get('Relation Name') == table]
+        self.assertTrue(scans, f"{table} is not scanned by: {sql}")
+        for node in scans:
+            self.assertIn(node['Node Type'], self.INDEX_SCANS, f"{node['Node Type']} on {table} for: {sql}")
+        if index_names:
+            used = {node['Index Name'] for node in nodes if 'Index Name' in node}
+            self.assertTrue(used & set(index_names), f"None of {index_names} used (used {used}) for: {sql}")
+
+
+class JobQueryPlanTests(QueryPlanTestCase):
+    """The hot job and application queries are served by the indexes declared for them."""
+
+    JOBS = 50_000
+    ORGANIZATIONS = 50
+    CATEGORIES = 20
+    LOCATIONS = [f'City {i}' for i in range(50)]
+    SEEKERS = 1_000
+    APPLICATIONS = 20_000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizations = User.objects.bulk_create([
+            User(email=f'plan-org-{i}@example.com', role=User.Role.ORGANIZATION, organization_name=f'Org {i}')
+            for i in range(cls.ORGANIZATIONS)
+        ])
+        cls.seekers = User.objects.bulk_create([
+            User(email=f'plan-seeker-{i}@example.com', role=User.Role.JOB_SEEKER, first_name='Seeker')
+            for i in range(cls.SEEKERS)
+        ])
+        cls.categories = Category.objects.bulk_create([
+            Category(title=f'Plan {i}', slug=f'plan-{i}') for i in range(cls.CATEGORIES)
+        ])
+        insert_jobs(
+            cls.JOBS, [org.id for org in cls.organizations], [category.id for category in cls.categories],
+            slug_prefix='plan', locations=cls.LOCATIONS, active_every=20,
+        )
+        # A niche category: walking every recent job to fill one page of it would be wasteful
+        cls.niche_category = Category.objects.create(title='Plan niche')
+        insert_jobs(100, [cls.organizations[0].id], [cls.niche_category.id], slug_prefix='plan-niche')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Application._meta.db_table} (
+                    job_id, seeker_id, status, phone, message, created_at, updated_at
+                )
+                SELECT job.id, (%s::bigint[])[1 + job.n %% %s], 'submitted', '0123', 'Hello',
+                       now() - job.n * interval '1 minute', now()
+                FROM (
+                    SELECT id, row_number() OVER (ORDER BY id) AS n
+                    FROM {Job._meta.db_table} ORDER BY id LIMIT %s
+                ) AS job
+                """,
+                [[seeker.id for seeker in cls.seekers], cls.SEEKERS, cls.APPLICATIONS],
+            )
+        cls.analyze(Job, Application, User, Category)
+        cls.job = Job.objects.filter(slug__startswith='plan-').order_by('id').first()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_organization_listing_pages_use_organization_index(self):
+        self.client.force_authenticate(self.organizations[0])
+        first_page = self.client.get('/api/jobs/my-jobs/').data
+        for url in ('/api/jobs/my-jobs/', first_page['next']):
+            for sql in self.captured_sql(self.client, url, Job._meta.db_table):
+                self.assertIndexScan(sql, Job._meta.db_table, 'job_org_recent_idx')
+
+    def test_active_job_listing_uses_partial_recent_index(self):
+        for sql in self.captured_sql(self.client, '/api/jobs/search/', Job._meta.db_table):
+            self.assertIndexScan(sql, Job._meta.db_table, 'job_active_recent_idx')
+
+    def test_category_listing_uses_an_index(self):
+        # A common category fills its page from the recent index after a few rows
+        url = f'/api/jobs/search/?category={self.categories[3].id}'
+        for sql in self.captured_sql(self.client, url, Job._meta.db_table):
+            self.assertIndexScan(sql, Job._meta.db_table, 'job_active_category_recent_idx', 'job_active_recent_idx')
+
+    def test_niche_category_listing_uses_partial_category_index(self):
+        url = f'/api/jobs/search/?category={self.niche_category.id}'
+        for sql in self.captured_sql(self.client, url, Job._meta.db_table):
+            self.assertIndexScan(sql, Job._meta.db_table, 'job_active_category_recent_idx')
+        for sql in self.captured_sql(self.client, f'{url}&count=exact', Job._meta.db_table, marker='COUNT('):
+            self.assertIndexScan(sql, Job._meta.db_table)
+
+    def test_location_filter_uses_expression_index(self):
+        url = '/api/jobs/search/?location=city 7&count=exact'
+        for sql in self.captured_sql(self.client, url, Job._meta.db_table, marker='COUNT('):
+            self.assertIndexScan(sql, Job._meta.db_table, 'job_active_location_idx')
+
+    def test_job_detail_uses_unique_slug_index(self):
+        url = f'/api/jobs/detail/{self.job.slug}/'
+        for sql in self.captured_sql(self.client, url, Job._meta.db_table, marker='"slug" ='):
+            self.assertIndexScan(sql, Job._meta.db_table)
+
+    def test_seeker_applications_use_seeker_index(self):
+        self.client.force_authenticate(self.seekers[0])
+        for sql in self.captured_sql(self.client, '/api/jobs/applications/', Application._meta.db_table):
+            self.assertIndexScan(sql, Application._meta.db_table, 'application_seeker_recent_idx')
+
+    def test_job_applicants_use_job_index(self):
+        self.client.force_authenticate(self.job.organization)
+        url = f'/api/jobs/{self.job.id}/applicants/'
+        for sql in self.captured_sql(self.client, url, Application._meta.db_table):
+            self.assertIndexScan(sql, Application._meta.db_table, 'application_job_recent_idx')
+
+
+class QueryCountTestCase(TestCase):
+    """
+    Asserts that an endpoint costs a fixed number of queries whatever the
+    size of what it reads or writes. seed(size) brings the fixtures to SIZES[0]
+    and then SIZES[1] rows; call(size) makes one request, counted with the
+    cache cleared so cached views pay for a miss.
+    """
+
+    SIZES = (9, 90)
+
+    def assertQueryCeiling(self, ceiling, call, seed=None):
+        counts = []
+        for size in self.SIZES:
+            if seed is not None:
+                seed(size)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = call(size)
+            self.assertLess(response.status_code, 400, getattr(response, 'data', response))
+            counts.append(len(queries))
+        self.assertEqual(
+            counts[0], counts[1],
+            f"{counts[0]} queries for {self.SIZES[0]} rows but {counts[1]} for {self.SIZES[1]}",
+        )
+        self.assertLessEqual(counts[-1], ceiling)
+
+    def client_for(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client
+
+
+class JobEndpointQueryCountTests(QueryCountTestCase):
+    """Every route in apps/jobs/urls.py, measured with 9 and 90 rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'queries-org@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Queries',
+        )
+        cls.seeker = User.objects.create_user(
+            'queries-seeker@example.com', 'password', role=User.Role.JOB_SEEKER,
+            first_name='Query', last_name='Seeker',
+        )
+        cls.category = Category.objects.create(title='Engineering')
+        cls.tags = [Tag.objects.create(title=f'Skill {i}') for i in range(max(cls.SIZES))]
+
+    def make_job(self, tags=3, **fields):
+        job = Job.objects.create(
+            organization=self.organization, category=self.category, title='Backend developer',
+            description='Build APIs', location='Dhaka', salary=3000, **fields,
+        )
+        job.tags.set(self.tags[:tags])
+        return job
+
+    def seed_jobs(self, size):
+        for _ in range(size - Job.objects.count()):
+            self.make_job()
+
+    def seed_seekers(self, size):
+        existing = User.objects.filter(role=User.Role.JOB_SEEKER).count()
+        return User.objects.bulk_create([
+            User(email=f'applicant-{existing + i}@example.com', role=User.Role.JOB_SEEKER, first_name='Applicant')
+            for i in range(size - existing)
+        ])
+
+    def seed_applications(self, job, size):
+        seekers = User.objects.filter(role=User.Role.JOB_SEEKER).exclude(applications__job=job)
+        Application.objects.bulk_create([
+            Application(job=job, seeker=seeker, phone='0123', message='Hello')
+            for seeker in seekers[:size - job.applications.count()]
+        ])
+
+    def test_category_list(self):
+        def seed(size):
+            for i in range(size - Category.objects.count()):
+                Category.objects.create(title=f'Category {size}-{i}')
+        self.assertQueryCeiling(1, lambda size: self.client_for().get('/api/categories/'), seed)
+
+    def test_tag_list(self):
+        def seed(size):
+            Tag.objects.exclude(pk__in=[tag.pk for tag in self.tags[:size]]).delete()
+            for i in range(size - Tag.objects.count()):
+                Tag.objects.create(title=f'Extra {size}-{i}')
+        self.assertQueryCeiling(1, lambda size: self.client_for().get('/api/tags/'), seed)
+
+    def test_post_job(self):
+        client = self.client_for(self.organization)
+        self.assertQueryCeiling(15, lambda size: client.post('/api/jobs/', {
+            'title': f'Data engineer {size}', 'description': 'Pipelines', 'location': 'Remote',
+            'category_id': self.category.id, 'tags_ids': [tag.id for tag in self.tags[:size]],
+        }, format='json'))
+
+    def test_bulk_import(self):
+        client = self.client_for(self.organization)
+
+        def call(size):
+            rows = ''.join(
+                json.dumps({
+                    'title': f'Imported {i}', 'description': 'From a file', 'location': 'Remote',
+                    'category': self.category.title, 'tags': [tag.title for tag in self.tags[:3]],
+                }) + '\n'
+                for i in range(size)
+            )
+            upload = SimpleUploadedFile('jobs.jsonl', rows.encode(), content_type='application/x-ndjson')
+            return client.post('/api/jobs/import/', {'file': upload}, format='multipart')
+        self.assertQueryCeiling(11, call)  # Includes the INSERT of the chunk's alert fan-outs
+
+    def test_job_export(self):
+        client = self.client_for(self.organization)
+
+        def call(size):
+            response = client.get('/api/jobs/export/jobs.csv')
+            b''.join(response.streaming_content)  # Rows are read while streaming
+            return response
+        self.assertQueryCeiling(1, call, self.seed_jobs)
+
+    def test_applicant_export(self):
+        client = self.client_for(self.organization)
+        job = self.make_job()
+
+        def seed(size):
+            self.seed_seekers(size)
+            self.seed_applications(job, size)
+
+        def call(size):
+            response = client.get('/api/jobs/export/applicants.jsonl')
+            b''.join(response.streaming_content)
+            return response
+        self.assertQueryCeiling(1, call, seed)
+
+    def test_job_search(self):
+        client = self.client_for()
+        self.assertQueryCeiling(
+            2, lambda size: client.get(f'/api/jobs/search/?page_size={size}'), self.seed_jobs,
+        )
+
+    def test_job_search_with_filters_and_facets(self):
+        client = self.client_for()
+        tag_slugs = ','.join(tag.slug for tag in self.tags[:3])
+        url = f'/api/jobs/search/?q=developer&category={self.category.id}&tags={tag_slugs}&facets=true'
+        self.assertQueryCeiling(4, lambda size: client.get(f'{url}&page_size={size}'), self.seed_jobs)
+
+    def test_organization_job_list(self):
+        client = self.client_for(self.organization)
+        self.assertQueryCeiling(
+            3, lambda size: client.get(f'/api/jobs/my-jobs/?page_size={size}&count=exact'), self.seed_jobs,
+        )
+
+    def test_job_update(self):
+        client = self.client_for(self.organization)
+        job = self.make_job()
+        self.assertQueryCeiling(
+            13, lambda size: client.patch(f'/api/jobs/{job.id}/', {
+                'title': f'Senior developer {size}', 'tags_ids': [tag.id for tag in self.tags[:size]],
+            }, format='json'),
+        )
+
+    def test_job_delete(self):
+        client = self.client_for(self.organization)
+        jobs = {}
+
+        def seed(size):
+            jobs[size] = self.make_job(tags=size)
+            self.seed_seekers(size)
+            self.seed_applications(jobs[size], size)
+        self.assertQueryCeiling(8, lambda size: client.delete(f'/api/jobs/{jobs[size].id}/'), seed)
+
+    def test_job_apply(self):
+        client = self.client_for(self.seeker)
+        job = self.make_job()
+
+        def seed(size):
+            self.seed_seekers(size)
+            self.seed_applications(job, size)
+            Application.objects.filter(job=job, seeker=self.seeker).delete()
+        self.assertQueryCeiling(
+            6, lambda size: client.post(f'/api/jobs/{job.id}/apply/', {'phone': '0123', 'message': 'Hi'}), seed,
+        )
+
+    def test_job_applicant_list(self):
+        client = self.client_for(self.organization)
+        job = self.make_job()
+
+        def seed(size):
+            self.seed_seekers(size)
+            self.seed_applications(job, size)
+        self.assertQueryCeiling(
+            2, lambda size: client.get(f'/api/jobs/{job.id}/applicants/?page_size={size}'), seed,
+        )
+
+    def test_my_application_list(self):
+        client = self.client_for(self.seeker)
+
+        def seed(size):
+            self.seed_jobs(size)
+            for job in Job.objects.exclude(applications__seeker=self.seeker):
+                Application.objects.create(job=job, seeker=self.seeker, phone='0123', message='Hello')
+        self.assertQueryCeiling(
+            1, lambda size: client.get(f'/api/jobs/applications/?page_size={size}'), seed,
+        )
+
+    def test_job_alert_list(self):
+        client = self.client_for(self.seeker)
+
+        def seed(size):
+            for _ in range(size - JobAlert.objects.count()):
+                alert = JobAlert.objects.create(seeker=self.seeker, category=self.category)
+                alert.tags.set(self.tags[:3])
+        self.assertQueryCeiling(2, lambda size: client.get('/api/alerts/'), seed)
+
+    def test_job_alert_create(self):
+        client = self.client_for(self.seeker)
+        self.assertQueryCeiling(6, lambda size: client.post('/api/alerts/', {
+            'category_id': self.category.id, 'tags_ids': [tag.id for tag in self.tags[:size]],
+        }, format='json'))
+
+    def test_job_alert_update(self):
+        client = self.client_for(self.seeker)
+        alert = JobAlert.objects.create(seeker=self.seeker)
+        self.assertQueryCeiling(
+            6, lambda size: client.patch(f'/api/alerts/{alert.id}/', {
+                'location': f'City {size}', 'tags_ids': [tag.id for tag in self.tags[:size]],
+            }, format='json'),
+        )
+
+    def test_job_alert_delete(self):
+        client = self.client_for(self.seeker)
+        alerts = {}
+
+        def seed(size):
+            alerts[size] = JobAlert.objects.create(seeker=self.seeker)
+            alerts[size].tags.set(self.tags[:size])
+        self.assertQueryCeiling(3, lambda size: client.delete(f'/api/alerts/{alerts[size].id}/'), seed)
+
+    def test_job_detail(self):
+        client = self.client_for()
+        jobs = {}
+
+        def seed(size):
+            jobs[size] = self.make_job(tags=size)
+        self.assertQueryCeiling(2, lambda size: client.get(f'/api/jobs/detail/{jobs[size].slug}/'), seed)
+
+
+class JobSearchPaginationTests(TestCase):
+    """The public search pages without COUNT(*), caps page sizes and never skips or repeats jobs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = User.objects.create_user(
+            'paging@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Paging',
+        )
+        category = Category.objects.create(title='Paging')
+        insert_jobs(250, [organization.id], [category.id], slug_prefix='paging')
+        # Identical timestamps (and, for ?q=, identical ranks) leave only the id to order by
+        Job.objects.update(
+            created_at=Job.objects.earliest('created_at').created_at, search_vector=JOB_SEARCH_VECTOR,
+        )
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(job['id'] for job in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_listing_without_query_uses_keyset_pages(self):
+        ids, pages = self.walk('/api/jobs/search/?page_size=40&fields=id')
+        self.assertEqual(pages, 7)
+        self.assertEqual(ids, sorted(Job.objects.values_list('id', flat=True), reverse=True))
+
+    def test_ranked_pages_do_not_skip_or_repeat_tied_jobs(self):
+        ids, pages = self.walk('/api/jobs/search/?q=job&page_size=40&fields=id')
+        self.assertEqual(pages, 7)
+        self.assertEqual(len(ids), 250)
+        self.assertEqual(len(set(ids)), 250)
+
+    def test_page_size_is_capped(self):
+        for url in ('/api/jobs/search/?page_size=20000&fields=id', '/api/jobs/search/?q=job&page_size=20000&fields=id'):
+            response = self.client.get(url)
+            self.assertEqual(len(response.data['results']), 100, url)
+            self.assertEqual(response.data['page_size'], 100, url)
+
+    def test_count_only_on_request(self):
+        for url in ('/api/jobs/search/?fields=id', '/api/jobs/search/?q=job&fields=id'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertIsNone(response.data['count'], url)
+            self.assertFalse([q for q in queries.captured_queries if 'COUNT(' in q['sql']], url)
+            self.assertEqual(self.client.get(f'{url}&count=exact').data['count'], 250, url)
+
+    def test_ranked_pages_stop_at_max_page(self):
+        self.assertEqual(self.client.get('/api/jobs/search/?q=job&page=101').status_code, 404)
+
+
+class JobCacheInvalidationTests(TestCase):
+    """Version bumps wait for the commit, and a lost counter never revives an old version."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_waits_for_commit(self):
+        before = job_cache.category_list_key()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            job_cache.invalidate_categories()
+            self.assertEqual(job_cache.category_list_key(), before)
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(job_cache.category_list_key(), before)
+
+    def test_evicted_counter_does_not_reuse_versions(self):
+        seen = {job_cache.category_list_key()}
+        for _ in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                job_cache.invalidate_categories()
+            seen.add(job_cache.category_list_key())
+        cache.delete(job_cache.CATEGORIES_VERSION)  # Evicted
+        self.assertNotIn(job_cache.category_list_key(), seen)
+        with self.captureOnCommitCallbacks(execute=True):
+            cache.delete(job_cache.CATEGORIES_VERSION)
+            job_cache.invalidate_categories()  # Bumps a missing counter
+        self.assertNotIn(job_cache.category_list_key(), seen)
+
+
+class JobApplyTests(TestCase):
+    """The unique constraint, not a prior SELECT, turns a repeated apply away."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'apply-org@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Apply',
+        )
+        cls.seeker = User.objects.create_user('apply-seeker@example.com', 'password', role=User.Role.JOB_SEEKER)
+        cls.category = Category.objects.create(title='Engineering')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def make_job(self, **fields):
+        return Job.objects.create(
+            organization=self.organization, category=self.category, title='Backend developer',
+            description='Build APIs', location='Dhaka', salary=3000, **fields,
+        )
+
+    def apply(self, job_id):
+        return self.client.post(f'/api/jobs/{job_id}/apply/', {'phone': '0123', 'message': 'Hi'})
+
+    def test_second_apply_conflicts_and_counts_once(self):
+        job = self.make_job()
+        self.assertEqual(self.apply(job.id).status_code, 201)
+        with self.assertNumQueries(4):  # The rejected INSERT and its savepoint; no SELECT
+            response = self.apply(job.id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data, {'error': 'You have already applied to this job.'})
+        job.refresh_from_db()
+        self.assertEqual(job.applicant_count, 1)
+        self.assertEqual(Application.objects.filter(job=job, seeker=self.seeker).count(), 1)
+
+    def test_inactive_or_missing_job_is_not_found(self):
+        job = self.make_job(is_active=False)
+        self.assertEqual(self.apply(job.id).status_code, 404)
+        self.assertEqual(self.apply(job.id + 1000).status_code, 404)
+        job.refresh_from_db()
+        self.assertEqual(job.applicant_count, 0)
+        self.assertFalse(Application.objects.exists())
+
+
+class JobSlugTests(TestCase):
+    """Slugs are allocated by the unique index on Job.slug, not by a prior SELECT."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'slug-org@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Slugs',
+        )
+        cls.category = Category.objects.create(title='Engineering')
+
+    def make_job(self, title='Backend developer', save=True):
+        job = Job(
+            organization=self.organization, category=self.category, title=title,
+            description='Build APIs', location='Dhaka', salary=3000,
+        )
+        if save:
+            job.save()
+        return job
+
+    def test_same_titles_get_distinct_slugs(self):
+        first, second, third = (self.make_job() for _ in range(3))
+        self.assertEqual(first.slug, 'backend-developer')
+        self.assertRegex(second.slug, r'^backend-developer-[a-z0-9]{6}$')
+        self.assertEqual(len({first.slug, second.slug, third.slug}), 3)
+
+    def test_taken_slug_is_retried_after_the_integrity_error(self):
+        # A row inserted by a concurrent writer looks the same to save() as an
+        # older one: either way the first INSERT is what finds the slug taken
+        taken = self.make_job()
+        job = self.make_job(save=False)
+        attempts = []
+
+        def save():
+            attempts.append(job.slug)
+            models.Model.save(job)
+
+        with CaptureQueriesContext(connection) as queries:
+            save_with_unique_slug(job, job.title, save)
+        self.assertTrue(queries[1]['sql'].startswith('INSERT'), queries[1]['sql'])  # After the SAVEPOINT
+        self.assertEqual(attempts[0], taken.slug)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(Job.objects.get(pk=job.pk).slug, attempts[1])
+
+    def test_other_integrity_errors_are_not_retried(self):
+        job = self.make_job(save=False)
+        attempts = []
+
+        def save():
+            attempts.append(job.slug)
+            raise IntegrityError('violates check constraint "salary_positive"')
+
+        with self.assertRaises(IntegrityError):
+            save_with_unique_slug(job, job.title, save)
+        self.assertEqual(len(attempts), 1)
+
+    def test_migration_suffix_skips_slugs_already_taken(self):
+        free_slug = importlib.import_module('apps.jobs.migrations.0003_job_slug_unique')._free_slug
+        job = self.make_job()
+        self.assertEqual(free_slug(Job, 'backend-developer', job.id), f'backend-developer-{job.id}')
+        self.make_job(title=f'Backend developer {job.id}')  # Holds backend-developer-<id>
+        self.assertEqual(free_slug(Job, 'backend-developer', job.id), f'backend-developer-{job.id}-2')
+
+
+class JobSnapshotSaveTests(TestCase):
+    """Job.save() diffs against the values loaded from the database instead of re-reading the row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'snapshot-org@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Snapshots',
+        )
+        cls.category = Category.objects.create(title='Engineering')
+
+    def setUp(self):
+        job = Job.objects.create(
+            organization=self.organization, category=self.category, title='Backend developer',
+            description='Build APIs', location='Dhaka', salary=3000,
+        )
+        self.job = Job.objects.get(pk=job.pk)
+
+    def save_queries(self, job, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            job.save(**kwargs)
+        return [query['sql'] for query in queries]
+
+    def matches(self, term):
+        return Job.objects.filter(pk=self.job.pk, search_vector=term).exists()
+
+    def test_slug_regenerated_only_on_title_change(self):
+        self.job.description = 'Build services'
+        queries = self.save_queries(self.job)
+        self.assertEqual(len(queries), 1, queries)  # No slug savepoint or lookup
+        self.assertEqual(Job.objects.get(pk=self.job.pk).slug, 'backend-developer')
+
+        self.job.title = 'Platform engineer'
+        self.save_queries(self.job)
+        self.assertEqual(Job.objects.get(pk=self.job.pk).slug, 'platform-engineer')
+
+    def test_search_document_written_only_when_search_fields_change(self):
+        self.job.salary = 4000
+        [update] = self.save_queries(self.job)
+        self.assertNotIn('search_vector', update)
+
+        self.job.description = 'Kubernetes operators'
+        [update] = self.save_queries(self.job)  # Same UPDATE as the row
+        self.assertIn('search_vector', update)
+        self.assertTrue(self.matches('kubernetes'))
+        self.assertFalse(self.matches('apis'))
+
+    def test_limited_save_rebuilds_document_from_stored_columns(self):
+        self.job.location = 'Chittagong'
+        self.job.description = 'Kubernetes operators'  # Not written below
+        self.save_queries(self.job, update_fields=['location'])
+        self.assertTrue(self.matches('chittagong'))
+        self.assertTrue(self.matches('apis'))
+        self.assertFalse(self.matches('kubernetes'))
+
+    def test_limited_save_leaves_unwritten_changes_pending(self):
+        self.job.title = 'Platform engineer'
+        self.job.salary = 4000
+        self.job.save(update_fields=['salary'])
+        self.assertTrue(self.job.field_changed('title'))
+
+        self.job.save()
+        stored = Job.objects.get(pk=self.job.pk)
+        self.assertEqual(stored.slug, 'platform-engineer')
+        self.assertTrue(self.matches('platform'))
+
+    def test_old_banner_deleted_only_after_commit(self):
+        Job.objects.filter(pk=self.job.pk).update(banner='jobs/old')
+        job = Job.objects.get(pk=self.job.pk)
+        job.banner = 'jobs/new'
+        with mock.patch('apps.jobs.models.enqueue_image_deletion') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                job.save()
+                enqueue.assert_not_called()
+        enqueue.assert_called_once_with('jobs/old')
+
+    def test_old_banner_kept_on_rollback(self):
+        Job.objects.filter(pk=self.job.pk).update(banner='jobs/old')
+        job = Job.objects.get(pk=self.job.pk)
+        job.banner = 'jobs/new'
+        with mock.patch('apps.jobs.models.enqueue_image_deletion') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    job.save()
+                    raise RuntimeError('Rolled back')
+        enqueue.assert_not_called()
+        self.assertEqual(Job.objects.get(pk=self.job.pk).banner.public_id, 'jobs/old')
+
+
+def banner_png(size=(600, 300)):
+    """PNG bytes for a solid-colour banner."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class JobBannerTaskTests(TestCase):
+    """process_job_banner records the uploaded variants, or marks the job failed; cached detail included."""
+
+    def setUp(self):
+        cache.clear()
+        staging_root, local_root = tempfile.TemporaryDirectory(), tempfile.TemporaryDirectory()
+        self.addCleanup(staging_root.cleanup)
+        self.addCleanup(local_root.cleanup)
+        overrides = self.settings(
+            BANNER_STAGING_ROOT=staging_root.name, BANNER_LOCAL_ROOT=local_root.name,
+            BANNER_STORAGE_BACKEND='apps.jobs.storage.LocalBannerStorage',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        organization = User.objects.create_user(
+            'banner-org@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Banners',
+        )
+        self.job = Job.objects.create(
+            organization=organization, category=Category.objects.create(title='Design'), title='Designer',
+            description='Draw', location='Dhaka', salary=2000, banner_status=Job.BannerStatus.PENDING,
+        )
+
+    def test_failed_upload_invalidates_cached_detail(self):
+        detail_url = f'/api/jobs/detail/{self.job.slug}/'
+        self.assertEqual(APIClient().get(detail_url).data['banner_status'], Job.BannerStatus.PENDING)  # Cached
+
+        staging = get_staging_storage()
+        staged_name = staging.save('banner.png', io.BytesIO(b'png'))
+        storage = mock.Mock()
+        storage.upload.side_effect = ConnectionError('Upload refused')
+        with mock.patch('apps.jobs.tasks.get_banner_storage', return_value=storage), \
+                self.assertLogs('apps.jobs.tasks', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            # On its last retry, as after three failed attempts
+            self.assertFalse(process_job_banner.apply(args=(self.job.id, staged_name), retries=3).get())
+
+        self.assertEqual(APIClient().get(detail_url).data['banner_status'], Job.BannerStatus.FAILED)
+        self.assertFalse(staging.exists(staged_name))
+
+    def test_uploaded_variants_are_recorded_and_cached_detail_invalidated(self):
+        detail_url = f'/api/jobs/detail/{self.job.slug}/'
+        self.assertEqual(APIClient().get(detail_url).data['banner_status'], Job.BannerStatus.PENDING)  # Cached
+
+        staging = get_staging_storage()
+        staged_name = staging.save('banner.png', io.BytesIO(banner_png()))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(process_job_banner.apply(args=(self.job.id, staged_name)).get())
+
+        job = Job.objects.get(pk=self.job.pk)
+        self.assertEqual(job.banner_status, Job.BannerStatus.READY)
+        self.assertRegex(job.banner.public_id, rf'^jobs/banners/{job.id}-[0-9a-f]{{8}}$')
+        self.assertEqual(set(job.banner_variants), set(settings.BANNER_VARIANTS))
+        self.assertFalse(staging.exists(staged_name))
+
+        detail = APIClient().get(detail_url).data
+        self.assertEqual(detail['banner_status'], Job.BannerStatus.READY)
+        self.assertEqual(detail['banner_variants'], job.banner_variants)
+
+
+class LocalBannerStorageTests(TestCase):
+    """The filesystem banner backend stores the original plus one fitted image per BANNER_VARIANTS entry."""
+
+    def setUp(self):
+        local_root = tempfile.TemporaryDirectory()
+        self.addCleanup(local_root.cleanup)
+        overrides = self.settings(BANNER_LOCAL_ROOT=local_root.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.root = local_root.name
+
+        source = tempfile.NamedTemporaryFile(suffix='.PNG', delete=False)
+        self.addCleanup(os.remove, source.name)
+        with source:
+            source.write(banner_png())
+        self.source = source.name
+        self.storage = LocalBannerStorage()
+
+    def stored_files(self):
+        return sorted(os.listdir(os.path.join(self.root, 'jobs', 'banners')))
+
+    def test_upload_writes_original_and_fitted_variants(self):
+        result = self.storage.upload(self.source, public_id='jobs/banners/7-abc')
+
+        self.assertEqual(result['public_id'], 'jobs/banners/7-abc')
+        self.assertEqual(result['value'], 'image/upload/jobs/banners/7-abc.png')
+        self.assertEqual(result['variants'], {
+            name: f'{settings.BANNER_LOCAL_URL}jobs/banners/7-abc_{name}.png' for name in settings.BANNER_VARIANTS
+        })
+        self.assertEqual(
+            self.stored_files(),
+            sorted(['7-abc.png', *(f'7-abc_{name}.png' for name in settings.BANNER_VARIANTS)]),
+        )
+        for name, size in settings.BANNER_VARIANTS.items():
+            with Image.open(os.path.join(self.root, 'jobs', 'banners', f'7-abc_{name}.png')) as image:
+                self.assertEqual(image.size, size)
+
+    def test_delete_removes_only_that_banner(self):
+        self.storage.upload(self.source, public_id='jobs/banners/7-abc')
+        self.storage.upload(self.source, public_id='jobs/banners/7-abcd')
+
+        self.storage.delete('jobs/banners/7-abc')
+        self.assertTrue(self.stored_files())
+        self.assertTrue(all(name.startswith('7-abcd') for name in self.stored_files()))
+
+    def test_delete_without_uploads_is_a_no_op(self):
+        self.storage.delete('jobs/banners/missing')
+
+
+class JobImportAlertTests(TestCase):
+    """Imported active jobs get the same alert fan-out as jobs posted one by one."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'import-alerts@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Imports',
+        )
+        cls.category = Category.objects.create(title='Engineering')
+
+    def rows(self, *active):
+        return [
+            (i + 1, {
+                'title': f'Imported {i}', 'description': 'From a file', 'location': 'Remote',
+                'category': self.category.title, 'is_active': is_active,
+            }, None)
+            for i, is_active in enumerate(active)
+        ]
+
+    def test_upload_queues_fan_out_for_active_jobs(self):
+        client = APIClient()
+        client.force_authenticate(self.organization)
+        rows = ''.join(json.dumps(data) + '\n' for _, data, _ in self.rows(True, False, True))
+        upload = SimpleUploadedFile('jobs.jsonl', rows.encode(), content_type='application/x-ndjson')
+        self.assertEqual(client.post('/api/jobs/import/', {'file': upload}, format='multipart').status_code, 201)
+
+        active = Job.objects.filter(is_active=True).order_by('id')
+        self.assertEqual(
+            list(OutboxMessage.objects.order_by('id').values_list('task_name', 'args')),
+            [
+                (fan_out_job_alerts.name, [job.id, f'http://testserver/api/jobs/detail/{job.slug}/'])
+                for job in active
+            ],
+        )
+
+    def test_each_chunk_queues_its_own_jobs(self):
+        importer = JobImporter(self.organization, chunk_size=2, job_url=lambda slug: f'https://jobs.example.com/{slug}')
+        self.assertEqual(importer.run(self.rows(True, True, True))['created'], 3)
+        self.assertEqual(
+            sorted(args[0] for args in OutboxMessage.objects.values_list('args', flat=True)),
+            sorted(Job.objects.values_list('id', flat=True)),
+        )
+
+    def test_no_job_url_queues_nothing(self):
+        JobImporter(self.organization).run(self.rows(True))
+        self.assertTrue(Job.objects.exists())
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+@override_settings(JOB_IMPORT_CHUNK_SIZE=2)
+class JobImportEncodingTests(TestCase):
+    """Chunks commit as they go, so an upload that is not UTF-8 is turned away before the first one."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'import-encoding@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Encoding',
+        )
+        cls.category = Category.objects.create(title='Engineering')
+
+    def upload(self, content):
+        client = APIClient()
+        client.force_authenticate(self.organization)
+        upload = SimpleUploadedFile('jobs.jsonl', content, content_type='application/x-ndjson')
+        return client.post('/api/jobs/import/', {'file': upload}, format='multipart')
+
+    def line(self, title):
+        row = {'title': title, 'description': 'From a file', 'location': 'Remote', 'category': self.category.title}
+        return json.dumps(row, ensure_ascii=False).encode() + b'\n'
+
+    def test_bad_byte_after_the_first_chunk_imports_nothing(self):
+        content = b''.join(self.line(f'Imported {i}') for i in range(3)) + self.line('Caf\xe9').replace(b'\xc3\xa9', b'\xe9')
+        response = self.upload(content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('line 4', response.data['error'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_multibyte_characters_are_imported(self):
+        response = self.upload(b''.join(self.line(title) for title in ('Café', 'Ingénieur', 'Développeur')))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(Job.objects.values_list('title', flat=True)), ['Café', 'Développeur', 'Ingénieur'])
+
+    def test_error_line_counts_across_blocks(self):
+        # A two-byte character split between blocks is not an error
+        self.assertIsNone(utf8_error_line([b'a\nb\xc3', b'\xa9\n']))
+        self.assertEqual(utf8_error_line([b'a\nb\n', b'c\n\xff\n']), 4)
+        self.assertEqual(utf8_error_line([b'a\n\xc3']), 2)  # Truncated at the end
+
+
+class JobSearchParameterTests(TestCase):
+    """Malformed filters are a 400, and inactive jobs are listed only to their organization or staff."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization, other = (
+            User.objects.create_user(
+                f'{name}@example.com', 'password', role=User.Role.ORGANIZATION, organization_name=name,
+            )
+            for name in ('search-owner', 'search-other')
+        )
+        cls.staff = User.objects.create_user(
+            'search-staff@example.com', 'password', role=User.Role.JOB_SEEKER, is_staff=True,
+        )
+        cls.seeker = User.objects.create_user('search-seeker@example.com', 'password', role=User.Role.JOB_SEEKER)
+        category = Category.objects.create(title='Engineering')
+        cls.jobs = {
+            (owner, is_active): Job.objects.create(
+                organization=owner, category=category, title='Developer', description='Code',
+                location='Dhaka', salary=3000, is_active=is_active,
+            )
+            for owner in (cls.organization, other) for is_active in (True, False)
+        }
+        cls.other = other
+
+    def search(self, query, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client.get(f'/api/jobs/search/?fields=id&{query}')
+
+    def ids(self, query, user=None):
+        response = self.search(query, user)
+        self.assertEqual(response.status_code, 200, response.data)
+        return {job['id'] for job in response.data['results']}
+
+    def test_non_finite_salaries_are_rejected(self):
+        for value in ('NaN', 'sNaN', 'Infinity', '-inf'):
+            for name in ('min_salary', 'max_salary'):
+                self.assertEqual(self.search(f'{name}={value}').status_code, 400, f'{name}={value}')
+
+    def test_ids_must_be_ascii_bigints(self):
+        for value in ('²', '١', '0', '9' * 20, '9223372036854775808'):
+            self.assertEqual(self.search(f'category={value}').status_code, 400, value)
+        self.assertEqual(self.ids('category=9223372036854775807'), set())
+        # Anything but ids is taken as tag slugs
+        self.assertEqual(self.ids('tags=²,١'), set())
+        self.assertEqual(self.ids(f'tags={"9" * 20}'), set())
+
+    def test_inactive_jobs_are_not_public(self):
+        for query in ('is_active=false', 'is_active=all', 'is_active=0'):
+            self.assertEqual(self.search(query).status_code, 403, query)
+            self.assertEqual(self.search(query, self.seeker).status_code, 403, query)
+
+    def test_organization_sees_its_own_inactive_jobs(self):
+        own_inactive = self.jobs[self.organization, False].id
+        self.assertEqual(self.ids('is_active=false', self.organization), {own_inactive})
+        self.assertEqual(
+            self.ids('is_active=all', self.organization),
+            {own_inactive, self.jobs[self.organization, True].id, self.jobs[self.other, True].id},
+        )
+
+    def test_staff_see_every_inactive_job(self):
+        self.assertEqual(
+            self.ids('is_active=false', self.staff),
+            {self.jobs[self.organization, False].id, self.jobs[self.other, False].id},
+        )
+        self.assertEqual(self.ids('is_active=all', self.staff), {job.id for job in self.jobs.values()})
+
+
+class ActiveJobCounterTests(TestCase):
+    """Category.active_job_count and Tag.active_job_count through every job transition the signals handle."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'counters@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Counters',
+        )
+        cls.engineering, cls.design = (Category.objects.create(title=title) for title in ('Engineering', 'Design'))
+        cls.python, cls.django, cls.figma = (Tag.objects.create(title=title) for title in ('python', 'django', 'figma'))
+
+    def make_job(self, category=None, is_active=True, tags=()):
+        job = Job.objects.create(
+            organization=self.organization, category=category or self.engineering, title='Developer',
+            description='Code', location='Dhaka', salary=3000, is_active=is_active,
+        )
+        job.tags.add(*tags)
+        return job
+
+    def assertCounts(self, categories=None, tags=None):
+        """Expected counts by title; anything not named must be 0."""
+        self.assertEqual(
+            dict(Category.objects.values_list('title', 'active_job_count')),
+            {'Engineering': 0, 'Design': 0, **(categories or {})},
+        )
+        self.assertEqual(
+            dict(Tag.objects.values_list('title', 'active_job_count')),
+            {'python': 0, 'django': 0, 'figma': 0, **(tags or {})},
+        )
+
+    def test_create(self):
+        self.make_job(tags=[self.python, self.django])
+        self.make_job(is_active=False, tags=[self.python])
+        self.assertCounts({'Engineering': 1}, {'python': 1, 'django': 1})
+
+    def test_activation_toggle(self):
+        job = self.make_job(tags=[self.python])
+        job.is_active = False
+        job.save()
+        self.assertCounts()
+        job.is_active = False
+        job.save()  # Already inactive: nothing to take away twice
+        self.assertCounts()
+        job.is_active = True
+        job.save(update_fields=['is_active'])
+        self.assertCounts({'Engineering': 1}, {'python': 1})
+
+    def test_unsaved_flip_outside_update_fields_is_not_counted(self):
+        job = self.make_job(tags=[self.python])
+        job.is_active = False
+        job.save(update_fields=['salary'])
+        self.assertCounts({'Engineering': 1}, {'python': 1})
+        self.assertTrue(Job.objects.get(pk=job.pk).is_active)
+
+    def test_category_change(self):
+        job = self.make_job()
+        job.category = self.design
+        job.save()
+        self.assertCounts({'Design': 1})
+        inactive = self.make_job(is_active=False)
+        inactive.category = self.engineering
+        inactive.category = self.design
+        inactive.save()
+        self.assertCounts({'Design': 1})
+        # Moved and deactivated in one save
+        job.category, job.is_active = self.engineering, False
+        job.save()
+        self.assertCounts()
+
+    def test_tag_add_remove_and_clear(self):
+        job = self.make_job()
+        job.tags.add(self.python, self.django)
+        job.tags.add(self.python)  # Already linked
+        self.assertCounts({'Engineering': 1}, {'python': 1, 'django': 1})
+        job.tags.remove(self.python, self.figma)  # figma was never linked
+        self.assertCounts({'Engineering': 1}, {'django': 1})
+        job.tags.clear()
+        self.assertCounts({'Engineering': 1})
+        job.tags.set([self.figma])
+        self.assertCounts({'Engineering': 1}, {'figma': 1})
+
+        inactive = self.make_job(is_active=False)
+        inactive.tags.add(self.python)
+        inactive.tags.clear()
+        self.assertCounts({'Engineering': 1}, {'figma': 1})
+
+    def test_tag_changes_from_the_tag_side(self):
+        active, inactive = self.make_job(), self.make_job(is_active=False)
+        self.python.tag_jobs.add(active, inactive)
+        self.assertCounts({'Engineering': 1}, {'python': 1})
+        self.python.tag_jobs.clear()
+        self.assertCounts({'Engineering': 1})
+
+    def test_delete(self):
+        active = self.make_job(tags=[self.python, self.django])
+        inactive = self.make_job(category=self.design, is_active=False, tags=[self.python])
+        inactive.delete()
+        self.assertCounts({'Engineering': 1}, {'python': 1, 'django': 1})
+        active.delete()
+        self.assertCounts()
+
+    def test_reconcile_repairs_drifted_counters(self):
+        self.make_job(tags=[self.python, self.django])
+        self.make_job(category=self.design, tags=[self.python])
+        self.make_job(is_active=False, tags=[self.figma])
+        # Writes that bypass the signals
+        Category.objects.filter(title='Engineering').update(active_job_count=7)
+        Tag.objects.filter(title='python').update(active_job_count=0)
+        Job.objects.filter(category=self.design).update(is_active=False)
+
+        with self.assertLogs('apps.jobs.tasks', 'WARNING'):
+            self.assertEqual(reconcile_active_job_counts(), 3)  # Engineering, Design and python
+        for model, active_jobs in (
+            (Category, Job.objects.filter(category=OuterRef('pk'), is_active=True)),
+            (Tag, Job.objects.filter(tags=OuterRef('pk'), is_active=True)),
+        ):
+            recount = model.objects.annotate(actual=Coalesce(Subquery(
+                active_jobs.order_by().values('is_active').annotate(total=Count('id')).values('total')
+            ), 0))
+            self.assertEqual(
+                {row.title: row.active_job_count for row in recount}, {row.title: row.actual for row in recount},
+            )
+        self.assertCounts({'Engineering': 1}, {'python': 1, 'django': 1})
+        self.assertEqual(reconcile_active_job_counts(), 0)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class JobAlertMatchingTests(TestCase):
+    """The matching rules of JobAlert's docstring, and the fan-out walk over matching seekers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = User.objects.create_user(
+            'alerts-org@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='Alerts',
+        )
+        cls.engineering, cls.design = (Category.objects.create(title=title) for title in ('Engineering', 'Design'))
+        cls.python, cls.django, cls.figma = (Tag.objects.create(title=title) for title in ('python', 'django', 'figma'))
+
+    def make_job(self, category=None, location='Dhaka', salary=3000, tags=()):
+        job = Job.objects.create(
+            organization=self.organization, category=category or self.engineering, title='Developer',
+            description='Code', location=location, salary=salary,
+        )
+        job.tags.add(*tags)
+        return job
+
+    def make_alert(self, tags=(), seeker=None, **criteria):
+        if seeker is None:
+            seeker = User.objects.create_user(
+                f'alert-{User.objects.count()}@example.com', 'password', role=User.Role.JOB_SEEKER,
+            )
+        alert = JobAlert.objects.create(seeker=seeker, **criteria)
+        alert.tags.add(*tags)
+        return alert
+
+    def matches(self, job):
+        return set(matching_alerts(job, list(job.tags.values_list('id', flat=True))))
+
+    def test_empty_criteria_match_any_job(self):
+        alert = self.make_alert()
+        self.assertEqual(self.matches(self.make_job()), {alert})
+        self.assertEqual(self.matches(self.make_job(category=self.design, location='', salary=None)), {alert})
+
+    def test_category(self):
+        alert = self.make_alert(category=self.design)
+        self.assertEqual(self.matches(self.make_job(category=self.design)), {alert})
+        self.assertEqual(self.matches(self.make_job(category=self.engineering)), set())
+
+    def test_tags_match_on_any_overlap(self):
+        alert = self.make_alert(tags=[self.python, self.figma])
+        self.assertEqual(self.matches(self.make_job(tags=[self.python, self.django])), {alert})
+        self.assertEqual(self.matches(self.make_job(tags=[self.django])), set())
+        self.assertEqual(self.matches(self.make_job()), set())
+
+    def test_location_is_normalized(self):
+        alert = self.make_alert(location='  New   York ')
+        self.assertEqual(alert.location, 'new york')
+        self.assertEqual(self.matches(self.make_job(location='NEW york')), {alert})
+        self.assertEqual(self.matches(self.make_job(location='New Yorkshire')), set())
+
+    def test_min_salary(self):
+        any_salary = self.make_alert()
+        at_least = self.make_alert(min_salary=3000)
+        self.make_alert(min_salary=3001)
+        self.assertEqual(self.matches(self.make_job(salary=3000)), {any_salary, at_least})
+        # A job without a salary cannot satisfy a minimum
+        self.assertEqual(self.matches(self.make_job(salary=None)), {any_salary})
+
+    def test_only_active_alerts_of_active_job_seekers(self):
+        alert = self.make_alert()
+        self.make_alert(is_active=False)
+        inactive_seeker = self.make_alert().seeker
+        User.objects.filter(pk=inactive_seeker.pk).update(is_active=False)
+        self.make_alert(seeker=self.organization)
+        self.assertEqual(self.matches(self.make_job()), {alert})
+
+    def test_seekers_are_listed_once_in_id_order(self):
+        job = self.make_job(tags=[self.python])
+        seekers = [self.make_alert().seeker for _ in range(3)]
+        self.make_alert(seeker=seekers[0], tags=[self.python])  # A second matching alert
+        ids = [seeker.id for seeker in seekers]
+        self.assertEqual(matching_seeker_ids(job, [self.python.id]), ids)
+        self.assertEqual(matching_seeker_ids(job, [self.python.id], after_id=ids[0], limit=1), ids[1:2])
+
+    @override_settings(JOB_ALERT_BATCH_SIZE=2, JOB_ALERT_BATCHES_PER_TASK=2)
+    def test_fan_out_continues_after_the_last_seeker_reached(self):
+        job = self.make_job()
+        ids = [self.make_alert().seeker.id for _ in range(5)]
+        url = 'https://jobs.example.com/developer/'
+
+        with mock.patch('apps.jobs.tasks.current_app'), \
+                mock.patch.object(send_job_alert_batch, 'apply_async') as send_batch, \
+                mock.patch.object(fan_out_job_alerts, 'apply_async') as continue_fan_out:
+            self.assertEqual(fan_out_job_alerts(job.id, url), 4)
+            self.assertEqual(
+                [call.kwargs['args'] for call in send_batch.call_args_list],
+                [(job.id, url, ids[0:2]), (job.id, url, ids[2:4])],
+            )
+            [continuation] = continue_fan_out.call_args_list
+            self.assertEqual(continuation.kwargs['args'], (job.id, url, ids[3]))
+
+            send_batch.reset_mock()
+            self.assertEqual(fan_out_job_alerts(*continuation.kwargs['args']), 1)
+            self.assertEqual([call.kwargs['args'] for call in send_batch.call_args_list], [(job.id, url, ids[4:])])
+            self.assertEqual(continue_fan_out.call_count, 1)  # The last page was short
+
+    def test_alert_batch_emails_active_seekers(self):
+        job = self.make_job()
+        seekers = [self.make_alert().seeker for _ in range(3)]
+        User.objects.filter(pk=seekers[2].pk).update(is_active=False)
+        url = 'https://jobs.example.com/developer/'
+
+        self.assertEqual(send_job_alert_batch(job.id, url, [seeker.id for seeker in seekers]), 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [seekers[0].email, seekers[1].email])
+        self.assertIn(url, mail.outbox[0].body)
+
+
+class CachedJobDetailTests(TestCase):
+    """ETag revalidation of the cached job detail, across updates and renames."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = User.objects.create_user(
+            'etag@example.com', 'password', role=User.Role.ORGANIZATION, organization_name='ETags',
+        )
+        cls.job = Job.objects.create(
+            organization=organization, category=Category.objects.create(title='Engineering'),
+            title='Backend developer', description='Build APIs', location='Dhaka', salary=3000,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def detail(self, slug, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(f'/api/jobs/detail/{slug}/', **headers)
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.detail(self.job.slug)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            revalidated = self.detail(self.job.slug, etag)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], etag)
+        self.assertEqual(revalidated.content, b'')
+        self.assertEqual(self.detail(self.job.slug, f'"other", {etag}').status_code, 304)
+        self.assertEqual(self.detail(self.job.slug, '"other"').status_code, 200)
+
+    def test_update_serves_new_data_and_etag(self):
+        etag = self.detail(self.job.slug)['ETag']
+        self.job.salary = 4500
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        response = self.detail(self.job.slug, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['salary'], '4500.00')
+        self.assertEqual(self.detail(self.job.slug, response['ETag']).status_code, 304)
+
+    def test_renamed_job_is_gone_from_its_old_slug(self):
+        old_slug = self.job.slug
+        etag = self.detail(old_slug)['ETag']
+        self.job.title = 'Platform engineer'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        self.assertEqual(self.detail(old_slug).status_code, 404)
+        self.assertEqual(self.detail(old_slug, etag).status_code, 404)
+        self.assertEqual(self.detail(self.job.slug).data['title'], 'Platform engineer')
+
+    def test_cache_outage_falls_back_to_the_database(self):
+        with mock.patch('apps.jobs.cache.get_cache') as get_cache:
+            get_cache.return_value.get_many.side_effect = RedisConnectionError('Cache down')
+            get_cache.return_value.get.side_effect = RedisConnectionError('Cache down')
+            with self.assertLogs('apps.jobs.views', 'WARNING'):
+                response = self.detail(self.job.slug)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Backend developer')
+
+    def test_programming_errors_are_not_swallowed(self):
+        with mock.patch('apps.jobs.views.job_cache.job_detail_key', side_effect=TypeError('Bug')):
+            with self.assertRaises(TypeError), self.assertLogs('django.request', 'ERROR'):
+                self.detail(self.job.slug)
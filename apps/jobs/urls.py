@@ -1,10 +1,23 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 urlpatterns = [
+    path('categories/', views.CategoryListView.as_view(), name='category-list'),
+    path('tags/', views.TagListView.as_view(), name='tag-list'),
     # Create a new job (POST only)
     path('jobs/', views.PostJobView.as_view(), name='post-job'),
+    path('jobs/import/', views.JobBulkImportView.as_view(), name='job-import'),
+    re_path(
+        r'^jobs/export/(?P<resource>jobs|applicants)\.(?P<fmt>csv|jsonl)$',
+        views.JobExportView.as_view(), name='job-export',
+    ),
+    path('jobs/search/', views.JobSearchView.as_view(), name='job-search'),
     path('jobs/my-jobs/', views.OrganizationJobListView.as_view(), name='organization-job-list'),
     path('jobs/<int:pk>/', views.JobPostUpdateDeleteView.as_view(), name='job-update-delete'),
+    path('jobs/<int:pk>/apply/', views.JobApplyView.as_view(), name='job-apply'),
+    path('jobs/<int:pk>/applicants/', views.JobApplicantListView.as_view(), name='job-applicants'),
+    path('jobs/applications/', views.MyApplicationListView.as_view(), name='my-applications'),
+    path('alerts/', views.JobAlertListCreateView.as_view(), name='job-alert-list'),
+    path('alerts/<int:pk>/', views.JobAlertDetailView.as_view(), name='job-alert-detail'),
     path('jobs/detail/<slug:slug>/', views.JobPostDetailView.as_view(), name='job-detail'),
 ]
\ No newline at end of file
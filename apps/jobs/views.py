@@ -6,60 +6,313 @@ from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
     AllowAny,
 )
-from rest_framework.exceptions import ValidationError
-from django.db.models import Q, Exists, OuterRef
+from rest_framework.exceptions import ValidationError, NotFound, PermissionDenied
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.db import connections, transaction, IntegrityError
+from django.db.models import Q, F, Exists, OuterRef
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from rest_framework.response import Response
 from django.core.mail import EmailMultiAlternatives, send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.urls import reverse
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
 from rest_framework import status, pagination
 from rest_framework.views import APIView
+from decimal import Decimal, InvalidOperation
+from datetime import datetime
+import base64
+import binascii
+import io
+import json
+import logging
 
+from job_portal.cache import CACHE_ERRORS
+from job_portal.db_routing import read_from_primary
+from . import cache as job_cache
 from .models import (
     Category, 
     Tag,
     Job,
+    Application,
+    JobAlert,
+    JOB_SEARCH_CONFIG,
 )
 from .serializers import (
     CategorySerializer,
+    CategoryCountSerializer,
     TagSerializer,
+    TagCountSerializer,
     OrganizationSerializer,
     JobSerializer,
     ApplicationSerializer,
-    
+    JobAlertSerializer,
 )
+from .facets import job_facets
+from .exporter import EXPORT_FORMATS, stream_export
+from .importer import IMPORT_FORMATS, JobImporter, detect_format, read_rows, utf8_error_line
+from .tasks import fan_out_job_alerts
+from apps.accounts.outbox import enqueue_task
 
+logger = logging.getLogger(__name__)
 
-# Custom pagination class
-class PaginationView(pagination.PageNumberPagination):
-    page_size = 9  # Default page size
+
+def approximate_count(queryset):
+    """Row estimate from the PostgreSQL planner statistics, without scanning the rows."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def with_job_relations(queryset, request):
+    """Join and prefetch only the relations JobSerializer will output for this request."""
+    fields = JobSerializer.requested_fields(request)
+
+    def wanted(*names):
+        return fields is None or any(name in fields for name in names)
+
+    related = [
+        name for name, outputs in (
+            ("organization", ("organization",)),
+            ("category", ("category", "category_title")),
+        )
+        if wanted(*outputs)
+    ]
+    if related:
+        queryset = queryset.select_related(*related)
+    if wanted("tags"):
+        queryset = queryset.prefetch_related("tags")
+    return queryset.defer("search_vector")  # Only used inside the database
+
+
+class UncountedPagination(pagination.BasePagination):
+    """
+    Base for paginations that skip COUNT(*): a page fetches one extra row to
+    know whether another follows. Pass ?count=exact or ?count=approx to
+    include a total count. ?page_size is clamped to max_page_size.
+    """
+
+    page_size = 9
     page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "exact":
+            return queryset.count()
+        if mode == "approx":
+            return approximate_count(queryset)
+        return None
+
+
+# Keyset (cursor) pagination for job listings
+class JobCursorPagination(UncountedPagination):
+    """
+    Newest-first pagination keyed on (created_at, id). Each page is a single
+    index range scan, so deep pages cost the same as the first one.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def encode_cursor(self, created_at, pk):
+        raw = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split("|")
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = self.get_count(queryset, request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor:
+            created_at, pk = cursor
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1].created_at, rows[-1].pk) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
 
-    def get_max_page_size(self, total_records):
-        """Dynamically set max page size based on total records."""
-        return max(50, total_records // 9)  # Ensures at least 50
+    def get_paginated_response(self, data):
+        return Response({
+            "count": self.count,  # None unless ?count=exact|approx
+            "page_size": self.page_size,
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'page_size': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class RankedSearchPagination(UncountedPagination):
+    """
+    Page numbers for results ordered by search rank, which has no keyset to
+    walk. Pages past max_page are refused: each one costs an OFFSET over
+    every better-ranked match.
+    """
+
+    page_query_param = 'page'
+    max_page = 100
+    invalid_page_message = 'Invalid page'
+
+    def get_page_number(self, request):
+        try:
+            number = int(request.query_params.get(self.page_query_param, 1))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message)
+        if not 1 <= number <= self.max_page:
+            raise NotFound(self.invalid_page_message)
+        return number
 
     def paginate_queryset(self, queryset, request, view=None):
-        total_records = len(queryset)  # Total data count
-        self.max_page_size = self.get_max_page_size(total_records)  # Set max dynamically
-        return super().paginate_queryset(queryset, request, view)
-    
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.page_number = self.get_page_number(request)
+        self.count = self.get_count(queryset, request)
+
+        offset = (self.page_number - 1) * self.page_size
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size and self.page_number < self.max_page
+        return rows[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
     def get_paginated_response(self, data):
-        """Customize paginated response to include page links."""
         return Response({
-            "count": self.page.paginator.count,  # Total items
-            "total_pages": self.page.paginator.num_pages,  # Total pages
-            "current_page": self.page.number,  # Current page number
-            "page_size": self.page.paginator.per_page,  # Items per page
-            "next": self.get_next_link(),  # Next page URL
-            "previous": self.get_previous_link(),  # Previous page URL
-            "results": data  # Paginated results
+            "count": self.count,  # None unless ?count=exact|approx
+            "current_page": self.page_number,
+            "page_size": self.page_size,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
         })
 
-# List all Categories
-class CategoryListView(ListAPIView):
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'current_page': {'type': 'integer'},
+                'page_size': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+class CachedResponseMixin:
+    """
+    Serve GET responses from the jobs cache (see cache.py) and answer a
+    matching If-None-Match with 304 Not Modified. Subclasses provide
+    get_cache_key(); entries are invalidated by the signals in signals.py.
+    """
+
+    def get_cache_key(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        try:
+            key = self.get_cache_key()
+        except CACHE_ERRORS as e:
+            logger.warning(f"Cache unavailable for {request.path}: {str(e)}")
+            return super().get(request, *args, **kwargs)
+
+        entry = job_cache.get_entry(key)
+        if entry is None:
+            # A lagging replica would leave stale data in the cache until it expires
+            with read_from_primary():
+                response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = job_cache.build_entry(response.data)
+            job_cache.set_entry(key, entry)
+
+        headers = {"ETag": entry["etag"]}
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if entry["etag"] in if_none_match or "*" in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry["data"], headers=headers)
+
+
+# List all Categories with their active job counts (a plain read of the category table)
+class CategoryListView(CachedResponseMixin, ListAPIView):
     queryset = Category.objects.all()
-    serializer_class = CategorySerializer 
+    serializer_class = CategoryCountSerializer
+
+    def get_cache_key(self):
+        return job_cache.category_list_key()
+
+
+# List all Tags with their active job counts (maintained by signals, no GROUP BY)
+class TagListView(CachedResponseMixin, ListAPIView):
+    queryset = Tag.objects.order_by("title")
+    serializer_class = TagCountSerializer
+
+    def get_cache_key(self):
+        return job_cache.tag_list_key()
 
 
 class PostJobView(APIView):
@@ -73,16 +326,87 @@ class PostJobView(APIView):
 
         serializer = JobSerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                job = serializer.save()
+                if job.is_active:
+                    # Alert fan-out is committed together with the job (see accounts.outbox)
+                    job_url = request.build_absolute_uri(reverse("job-detail", args=[job.slug]))
+                    enqueue_task(fan_out_job_alerts, job.id, job_url)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class JobBulkImportView(APIView):
+    """Create jobs for the logged-in organization from an uploaded JSON Lines or CSV file"""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role != "organization":
+            return Response(
+                {"error": "Only Organization can import Jobs"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "Upload a JSON Lines or CSV file as 'file'"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        fmt = request.data.get("format") or detect_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"format must be one of: {', '.join(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Rejected up front: chunks are committed as they are imported
+        error_line = utf8_error_line(upload.chunks())
+        if error_line is not None:
+            return Response(
+                {"error": f"File must be UTF-8 encoded (invalid bytes on line {error_line}); nothing was imported"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        upload.seek(0)
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        importer = JobImporter(
+            request.user,
+            job_url=lambda slug: request.build_absolute_uri(reverse("job-detail", args=[slug])),
+        )
+        report = importer.run(read_rows(stream, fmt))
+
+        logger.info(
+            f"Job import by organization_id={request.user.id}: "
+            f"{report['created']} created, {report['failed']} failed"
+        )
+        return Response(
+            report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST
+        )
+
+
+class JobExportView(APIView):
+    """Stream the logged-in organization's jobs or applicants as CSV or JSON Lines"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, resource, fmt):
+        if request.user.role != "organization":
+            return Response(
+                {"error": "Only organization can export their jobs"}, status=status.HTTP_403_FORBIDDEN
+            )
+        response = StreamingHttpResponse(
+            stream_export(request.user, resource, fmt), content_type=EXPORT_FORMATS[fmt]
+        )
+        response["Content-Disposition"] = f'attachment; filename="{resource}.{fmt}"'
+        return response
+
+
 class OrganizationJobListView(ListAPIView):
     """List all flats added by the logged-in owner"""
 
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = JobCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -91,10 +415,8 @@ class OrganizationJobListView(ListAPIView):
             return Job.objects.none()  # Return an empty queryset instead of filtering
 
         return (
-            Job.objects.filter(organization=user)
-            .select_related("organization","category")
-            .prefetch_related("tags", "jobSeekers_who_apply")
-            .order_by("-created_at")  # Show newest job first
+            with_job_relations(Job.objects.filter(organization=user), self.request)
+            .order_by("-created_at", "-id")  # Show newest job first
         )
 
     def list(self, request, *args, **kwargs):
@@ -114,7 +436,7 @@ class JobPostUpdateDeleteView(APIView):
         """Helper method to get job object and check ownership."""
         try:
             job = Job.objects.get(pk=pk)
-            if job.organization != user or user.role != "organization":
+            if job.organization_id != user.id or user.role != "organization":
                 raise ValidationError({"error": "You do not have permission to modify this job."})
             return job
         except Job.DoesNotExist:
@@ -147,11 +469,270 @@ class JobPostUpdateDeleteView(APIView):
 
 
 # Retrieve details of a specific job post
-class JobPostDetailView(RetrieveAPIView):
-    queryset = Job.objects.select_related(
-        "organization", "category"
-    ).prefetch_related("tags", "jobSeekers_who_apply")
+class JobPostDetailView(CachedResponseMixin, RetrieveAPIView):
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]  # Anyone can view, but modifications require authentication
     lookup_field = "slug"  # Retrieve job details using the slug
 
+    def get_cache_key(self):
+        fields = JobSerializer.requested_fields(self.request)
+        return job_cache.job_detail_key(self.kwargs["slug"], ",".join(sorted(fields or ())))
+
+    def get_queryset(self):
+        return with_job_relations(Job.objects.all(), self.request)
+
+
+
+# Public ranked full-text search over job postings
+class JobSearchView(ListAPIView):
+    """
+    Search jobs by title, location and description using the GIN-indexed
+    search vector. Supports ?q=, ?category=, ?tags= (tag ids or slugs,
+    comma-separated; any of them matches), ?min_salary=, ?max_salary=,
+    ?location= and ?is_active= (defaults to active jobs only; false and all
+    add an organization's own inactive jobs, or every one for staff). With
+    ?facets=true the response also carries category, location and salary
+    bucket counts for all matching jobs. Pages hold at most 100 jobs and
+    carry a total only with ?count=exact or ?count=approx.
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = [AllowAny]
+    pagination_class = RankedSearchPagination  # Ranked results (?q=); plain listings use JobCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            # Without ?q= the listing is newest first, which a keyset walks at constant cost per page
+            paginator_class = self.pagination_class if self.get_search_query() is not None else JobCursorPagination
+            self._paginator = paginator_class()
+        return self._paginator
+
+    def _decimal_param(self, name):
+        value = self.request.query_params.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({name: "Must be a number."})
+        if not number.is_finite():  # NaN and Infinity parse, but cannot be compared with a column
+            raise ValidationError({name: "Must be a number."})
+        return number
+
+    @staticmethod
+    def _id_value(value):
+        """value as a row id (a positive bigint), or None. str.isdigit() alone accepts '²' or '١'."""
+        if not (value.isascii() and value.isdigit()) or len(value) > 19:
+            return None
+        number = int(value)
+        return number if 0 < number < 2 ** 63 else None
+
+    def _list_param(self, name):
+        value = self.request.query_params.get(name, "")
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    def get_filtered_queryset(self):
+        """Jobs matching every filter parameter, including ?q=, unordered."""
+        params = self.request.query_params
+        queryset = with_job_relations(Job.objects.all(), self.request)
+
+        is_active = params.get("is_active", "true").lower()
+        if is_active in ("true", "1"):
+            queryset = queryset.filter(is_active=True)
+        elif is_active in ("false", "0", "all"):
+            user = self.request.user
+            if user.is_authenticated and user.is_staff:
+                inactive = Q(is_active=False)
+            elif user.is_authenticated and user.role == "organization":
+                inactive = Q(is_active=False, organization=user)  # Only their own unpublished jobs
+            else:
+                raise PermissionDenied("Only organizations (for their own jobs) and staff can list inactive jobs.")
+            queryset = queryset.filter(inactive if is_active != "all" else Q(is_active=True) | inactive)
+        else:
+            raise ValidationError({"is_active": "Must be true, false or all."})
+
+        category = params.get("category")
+        if category:
+            category_id = self._id_value(category)
+            if category_id is None:
+                raise ValidationError({"category": "Must be a category id."})
+            queryset = queryset.filter(category_id=category_id)
+
+        tags = self._list_param("tags")
+        if tags:
+            # EXISTS avoids the row duplication (and DISTINCT) of joining the tag table
+            links = Job.tags.through.objects.filter(job_id=OuterRef("pk"))
+            tag_ids = [self._id_value(tag) for tag in tags]
+            if None not in tag_ids:
+                links = links.filter(tag_id__in=tag_ids)
+            else:
+                links = links.filter(tag__slug__in=tags)
+            queryset = queryset.filter(Exists(links))
+
+        min_salary = self._decimal_param("min_salary")
+        if min_salary is not None:
+            queryset = queryset.filter(salary__gte=min_salary)
+        max_salary = self._decimal_param("max_salary")
+        if max_salary is not None:
+            queryset = queryset.filter(salary__lte=max_salary)
+
+        location = params.get("location", "").strip()
+        if location:
+            queryset = queryset.filter(location__iexact=location)
+
+        query = self.get_search_query()
+        if query is not None:
+            queryset = queryset.filter(search_vector=query)  # Matches via the GIN index
+        return queryset
+
+    def get_search_query(self):
+        term = self.request.query_params.get("q", "").strip()
+        if term:
+            return SearchQuery(term, search_type="websearch", config=JOB_SEARCH_CONFIG)
+        return None
+
+    def get_queryset(self):
+        queryset = self.get_filtered_queryset()
+        query = self.get_search_query()
+        if query is None:
+            return queryset.order_by("-created_at", "-id")  # Matches job_active_recent_idx
+        # id breaks ties, so OFFSET pages neither skip nor repeat jobs of equal rank and age.
+        # Ranking scores every match before the page is cut, so common terms cost the most
+        return queryset.annotate(rank=SearchRank(F("search_vector"), query)).order_by("-rank", "-created_at", "-id")
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get("facets", "").lower() in ("true", "1"):
+            # All facets in one pass over the matching jobs, see facets.py
+            response.data["facets"] = job_facets(self.get_filtered_queryset())
+        return response
+
+
+
+# Apply to a job post
+class JobApplyView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        if request.user.role != "job_seeker":
+            return Response(
+                {"error": "Only job seekers can apply to jobs"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = ApplicationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # The unique (job, seeker) constraint rejects duplicates at the INSERT, so a
+        # repeated apply costs no SELECT. The job is checked after the INSERT, in the
+        # same transaction: its foreign key is deferred and would only fail at COMMIT.
+        try:
+            with transaction.atomic():
+                serializer.save(job_id=pk, seeker=request.user)
+                if not Job.objects.filter(pk=pk, is_active=True).exists():
+                    raise Job.DoesNotExist
+        except Job.DoesNotExist:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        except IntegrityError as e:
+            if "unique_application_per_job" not in str(e):
+                raise
+            return Response(
+                {"error": "You have already applied to this job."}, status=status.HTTP_409_CONFLICT
+            )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class MyApplicationListView(ListAPIView):
+    """List the logged-in job seeker's applications, newest first"""
+
+    serializer_class = ApplicationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = JobCursorPagination  # Keyed on (created_at, id), like job listings
+
+    def get_queryset(self):
+        if self.request.user.role != "job_seeker":
+            return Application.objects.none()
+        # Served by the (seeker, -created_at) index
+        return Application.objects.filter(seeker=self.request.user).select_related("job", "seeker")
+
+
+class JobApplicantListView(ListAPIView):
+    """List applications for one of the logged-in organization's jobs, newest first"""
+
+    serializer_class = ApplicationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = JobCursorPagination
+
+    def get_queryset(self):
+        # Served by the (job, -created_at) index
+        return Application.objects.filter(job_id=self.kwargs["pk"]).select_related("job", "seeker")
+
+    def list(self, request, *args, **kwargs):
+        if request.user.role != "organization":
+            return Response(
+                {"error": "Only organization can view applicants"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if not Job.objects.filter(pk=kwargs["pk"], organization=request.user).exists():
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return super().list(request, *args, **kwargs)
+
+
+class JobAlertListCreateView(APIView):
+    """List or create the logged-in job seeker's job alerts"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != "job_seeker":
+            return Response(
+                {"error": "Only job seekers can have job alerts"}, status=status.HTTP_403_FORBIDDEN
+            )
+        alerts = (
+            JobAlert.objects.filter(seeker=request.user)
+            .select_related("category")
+            .prefetch_related("tags")
+            .order_by("-created_at")
+        )
+        return Response(JobAlertSerializer(alerts, many=True).data)
+
+    def post(self, request):
+        if request.user.role != "job_seeker":
+            return Response(
+                {"error": "Only job seekers can create job alerts"}, status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = JobAlertSerializer(data=request.data, context={"request": request})
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class JobAlertDetailView(APIView):
+    """Update or delete one of the logged-in job seeker's job alerts"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self, request, pk):
+        try:
+            return JobAlert.objects.get(pk=pk, seeker=request.user)
+        except JobAlert.DoesNotExist:
+            return None
+
+    def patch(self, request, pk):
+        alert = self.get_object(request, pk)
+        if alert is None:
+            return Response({"error": "Job alert not found"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = JobAlertSerializer(alert, data=request.data, partial=True, context={"request": request})
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        alert = self.get_object(request, pk)
+        if alert is None:
+            return Response({"error": "Job alert not found"}, status=status.HTTP_404_NOT_FOUND)
+        alert.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
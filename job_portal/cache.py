@@ -0,0 +1,118 @@
+"""
+Cache backends with hit/miss accounting.
+
+Lookups are counted per key namespace (the first two ':'-separated parts of
+a key, e.g. "jobs:detail" or "users:auth"). Counts are kept per process and
+added to shared counters in the cache every CACHE_STATS_FLUSH_EVERY lookups,
+so /api/cache-stats/ reports totals across every worker.
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache as DjangoLocMemCache
+from django.core.cache.backends.redis import RedisCache as DjangoRedisCache
+from redis.exceptions import RedisError
+
+from .instrumentation import record_cache_lookup
+
+STATS_KEY_PREFIX = 'cache-stats'
+STATS_INDEX_KEY = f'{STATS_KEY_PREFIX}:namespaces'
+OUTCOMES = ('hits', 'misses')
+_MISSING = object()
+
+# What a cache backend raises when its server is down or misbehaving. Callers
+# that fall back to the database catch these only, so bugs still surface
+CACHE_ERRORS = (RedisError, OSError)
+
+
+def key_namespace(key):
+    return ':'.join(str(key).split(':')[:2])
+
+
+def _stats_key(namespace, outcome):
+    return f"{STATS_KEY_PREFIX}:{namespace}:{outcome}"
+
+
+class CacheStats:
+    """Thread-safe per-process hit/miss counters, flushed to the cache in batches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._lookups = 0
+        self._indexed = set()
+
+    def record(self, backend, key, hit):
+        record_cache_lookup(hit)
+        with self._lock:
+            self._pending[(key_namespace(key), 'hits' if hit else 'misses')] += 1
+            self._lookups += 1
+            if self._lookups < settings.CACHE_STATS_FLUSH_EVERY:
+                return
+            pending, self._pending, self._lookups = self._pending, Counter(), 0
+        self.flush(backend, pending)
+
+    def flush(self, backend, pending):
+        try:
+            namespaces = {namespace for namespace, _ in pending} - self._indexed
+            if namespaces:
+                index = set(backend.get(STATS_INDEX_KEY, ()))
+                backend.set(STATS_INDEX_KEY, sorted(index | namespaces), timeout=None)
+                self._indexed |= namespaces
+            for (namespace, outcome), count in pending.items():
+                key = _stats_key(namespace, outcome)
+                backend.add(key, 0, timeout=None)
+                backend.incr(key, count)
+        except Exception:
+            pass  # Statistics must never break a request
+
+    def snapshot(self, backend):
+        """Shared totals plus this process's unflushed counts, by namespace."""
+        with self._lock:
+            totals = Counter(self._pending)
+        namespaces = set(backend.get(STATS_INDEX_KEY, ())) | {namespace for namespace, _ in totals}
+        keys = [_stats_key(namespace, outcome) for namespace in namespaces for outcome in OUTCOMES]
+        shared = backend.get_many(keys)
+        report = {}
+        for namespace in sorted(namespaces):
+            counts = {
+                outcome: totals[(namespace, outcome)] + shared.get(_stats_key(namespace, outcome), 0)
+                for outcome in OUTCOMES
+            }
+            lookups = counts['hits'] + counts['misses']
+            counts['hit_rate'] = round(counts['hits'] / lookups, 4) if lookups else None
+            report[namespace] = counts
+        return report
+
+
+stats = CacheStats()
+
+
+def _counted(key):
+    return not str(key).startswith(STATS_KEY_PREFIX)
+
+
+class StatsMixin:
+    """Record a hit or miss for every get() lookup."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if _counted(key):
+            stats.record(self, key, value is not _MISSING)
+        return default if value is _MISSING else value
+
+
+class RedisCache(StatsMixin, DjangoRedisCache):
+    """Redis backend; get_many() is a single MGET, so its keys are counted here."""
+
+    def get_many(self, keys, version=None):
+        values = super().get_many(keys, version)
+        for key in keys:
+            if _counted(key):
+                stats.record(self, key, key in values)
+        return values
+
+
+class LocMemCache(StatsMixin, DjangoLocMemCache):
+    """In-process backend for tests; its get_many() goes through get(), which counts."""
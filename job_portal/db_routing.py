@@ -0,0 +1,152 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+With DATABASE_REPLICA_URLS set, ReplicaRoutingMiddleware lets the reads of
+GET, HEAD and OPTIONS requests go to one replica, picked per request. Writes
+always go to the primary ("default"), and so does every query of:
+
+- unsafe-method requests (POST, PUT, PATCH, DELETE), which may read what
+  they are about to write;
+- the rest of a request after its first write, and reads inside atomic();
+- the requests of a user for REPLICA_PIN_SECONDS after a request of theirs
+  wrote, so they see their own changes despite replication lag. The pin is
+  kept in the shared cache, keyed by the user id of the JWT;
+- Celery tasks, management commands and anything else outside a request.
+
+Responses that fill a shared cache are built from the primary (see
+read_from_primary()); filled from a lagging replica, the cache would keep
+the old data for its whole timeout instead of the lag.
+"""
+import contextvars
+import logging
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS_PREFIX = 'replica_'
+
+_current = contextvars.ContextVar('db_routing', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_ALIAS_PREFIX)]
+
+
+def pin_key(user_id):
+    return f"db:pin:{user_id}"
+
+
+class RoutingState:
+    """Routing of the request being handled; replica is None once it must use the primary."""
+
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+
+@contextmanager
+def read_from_primary():
+    """Send the reads made inside the block to the primary."""
+    state = _current.get()
+    if state is None or state.replica is None:
+        yield
+        return
+    replica, state.replica = state.replica, None
+    try:
+        yield
+    finally:
+        if not state.wrote:
+            state.replica = replica
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or state.replica is None:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS  # Reads in a transaction belong with its writes
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+            state.replica = None  # Later reads of this request must see the write
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Place before any middleware that queries the database. Removes itself
+    at startup (MiddlewareNotUsed) when no replica is configured.
+    """
+
+    def __init__(self, get_response):
+        self.replicas = replica_aliases()
+        if not self.replicas:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.authentication = JWTAuthentication()
+
+    def __call__(self, request):
+        user_id = self.token_user_id(request)
+        pinned = request.method not in SAFE_METHODS or self.is_pinned(user_id)
+        state = RoutingState(None if pinned else random.choice(self.replicas))
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        if state.wrote and user_id is not None:
+            self.pin(user_id)
+        return response
+
+    def token_user_id(self, request):
+        """User id of a valid access token in the Authorization header, without a database query."""
+        header = self.authentication.get_header(request)
+        if header is None:
+            return None
+        try:
+            raw_token = self.authentication.get_raw_token(header)
+            if raw_token is None:
+                return None
+            return self.authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+        except AuthenticationFailed:
+            return None  # DRF rejects the request itself
+
+    def is_pinned(self, user_id):
+        if user_id is None:
+            return False
+        try:
+            return cache.get(pin_key(user_id)) is not None
+        except Exception as e:
+            logger.warning(f"Replica pin read failed for user_id={user_id}: {str(e)}")
+            return True  # Without the pin we cannot tell; the primary is always up to date
+
+    def pin(self, user_id):
+        try:
+            cache.set(pin_key(user_id), 1, timeout=settings.REPLICA_PIN_SECONDS)
+        except Exception as e:
+            logger.warning(f"Replica pin write failed for user_id={user_id}: {str(e)}")
@@ -0,0 +1,195 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware records, for each request, the number of database
+queries and the time spent in them (through a connection.execute_wrapper on
+every database alias), the time spent in the view, in DRF serializers
+(is_valid() and .data) and in rendering, and the cache hits and misses of
+job_portal.cache. The numbers go out as a Server-Timing header and as one
+log line on the "job_portal.performance" logger; requests over
+PERFORMANCE_QUERY_BUDGET queries or PERFORMANCE_LATENCY_BUDGET_MS are
+logged as warnings.
+
+With PERFORMANCE_INSTRUMENTATION off the middleware removes itself at
+startup (MiddlewareNotUsed) and the serializer hooks are never installed, so
+the only remaining cost is one context variable lookup per cache lookup.
+
+Streaming responses are measured up to the point the response object is
+returned; the time spent sending the body is not included.
+"""
+import contextvars
+import logging
+import time
+from contextlib import ExitStack
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('job_portal.performance')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters for the request being handled; times are in seconds."""
+
+    __slots__ = (
+        'started', 'queries', 'db_time', 'serializer_time', 'view_started', 'view_time',
+        'render_started', 'cache_hits', 'cache_misses', '_serializer_depth',
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.view_started = None
+        self.view_time = None
+        self.render_started = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def record_cache_lookup(hit):
+    """Called by job_portal.cache for every counted lookup."""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def _timed_serializer_call(function):
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return function(self, *args, **kwargs)
+        # Only the outermost call counts: ListSerializer.is_valid() runs its child's validation
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            metrics._serializer_depth -= 1
+            if not metrics._serializer_depth:
+                metrics.serializer_time += time.perf_counter() - started
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def install_serializer_hooks():
+    """Time BaseSerializer.is_valid() and .data, which every DRF serializer goes through."""
+    from rest_framework.serializers import BaseSerializer
+
+    if getattr(BaseSerializer.is_valid, 'instrumented', False):
+        return
+    BaseSerializer.is_valid = _timed_serializer_call(BaseSerializer.is_valid)
+    BaseSerializer.data = property(_timed_serializer_call(BaseSerializer.data.fget))
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+class PerformanceMiddleware:
+    """
+    Place first in MIDDLEWARE so the total covers every other middleware.
+    View time runs from process_view() until the view returns its response
+    (process_template_response() for DRF responses, which are rendered
+    afterwards); render time is what remains until the response is ready.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_serializer_hooks()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        finished = time.perf_counter()
+        if metrics.view_started is not None and metrics.view_time is None:
+            metrics.view_time = finished - metrics.view_started
+        summary = self.summarize(request, response, metrics, finished)
+        response['Server-Timing'] = self.server_timing(summary)
+        self.log(summary)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _current.get().view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        metrics = _current.get()
+        metrics.render_started = time.perf_counter()
+        if metrics.view_started is not None:
+            metrics.view_time = metrics.render_started - metrics.view_started
+        return response
+
+    def summarize(self, request, response, metrics, finished):
+        total = finished - metrics.started
+        over_budget = []
+        if metrics.queries > settings.PERFORMANCE_QUERY_BUDGET:
+            over_budget.append('queries')
+        if total * 1000 > settings.PERFORMANCE_LATENCY_BUDGET_MS:
+            over_budget.append('latency')
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'view_ms': _ms(metrics.view_time) if metrics.view_time is not None else None,
+            'render_ms': _ms(finished - metrics.render_started) if metrics.render_started is not None else None,
+            'serializer_ms': _ms(metrics.serializer_time),
+            'queries': metrics.queries,
+            'db_ms': _ms(metrics.db_time),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            'over_budget': over_budget,
+        }
+
+    def server_timing(self, summary):
+        metrics = [
+            f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+            f'ser;dur={summary["serializer_ms"]}',
+        ]
+        if summary['view_ms'] is not None:
+            metrics.append(f'view;dur={summary["view_ms"]}')
+        if summary['render_ms'] is not None:
+            metrics.append(f'render;dur={summary["render_ms"]}')
+        metrics.append(f'cache;desc="{summary["cache_hits"]} hits, {summary["cache_misses"]} misses"')
+        metrics.append(f'total;dur={summary["total_ms"]}')
+        return ', '.join(metrics)
+
+    def log(self, summary):
+        # One key=value line per request; the dict is also attached for structured handlers
+        line = ' '.join(
+            f"{key}={','.join(value) if isinstance(value, list) else value}"
+            for key, value in summary.items() if value not in (None, [])
+        )
+        level = logging.WARNING if summary['over_budget'] else logging.INFO
+        logger.log(level, f"request {line}", extra={'performance': summary})
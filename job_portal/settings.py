@@ -15,7 +15,7 @@ import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 from datetime import timedelta
 
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'apps.accounts',
     'apps.jobs',
     'rest_framework',
@@ -55,6 +56,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'job_portal.instrumentation.PerformanceMiddleware',  # First, so its total covers the others
+    'job_portal.db_routing.ReplicaRoutingMiddleware',  # Before anything that queries the database
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -95,6 +98,18 @@ DATABASES = {
     )
 }
 
+# Optional read replicas, e.g. DATABASE_REPLICA_URLS=postgres://replica1/db,postgres://replica2/db.
+# Reads of GET/HEAD/OPTIONS requests go to a replica; writes, and a user's reads for
+# REPLICA_PIN_SECONDS after they wrote, go to the primary (see job_portal/db_routing.py).
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=Csv())
+for number, url in enumerate(DATABASE_REPLICA_URLS):
+    DATABASES[f'replica_{number}'] = {
+        **dj_database_url.parse(url, conn_max_age=600),
+        'TEST': {'MIRROR': 'default'},  # No separate test database; run the test suite without replicas
+    }
+DATABASE_ROUTERS = ['job_portal.db_routing.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)  # Longer than the replication lag
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,7 +151,7 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ),
 }
 
@@ -164,6 +179,39 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 
+# Queued emails (accounts.EmailNotification) are sent in batches over one SMTP connection
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=100, cast=int)
+EMAIL_MAX_BATCHES_PER_TASK = 10
+EMAIL_MAX_ATTEMPTS = 3
+EMAIL_CLAIM_TIMEOUT = 600  # Seconds before a batch claimed by a dead worker is sent again
+
+# Task calls written to accounts.OutboxMessage are published by relay_outbox in batches
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_MAX_ATTEMPTS = 10  # Failed publishes before a message is parked
+OUTBOX_RETRY_DELAY = 30  # Seconds before the first retry; doubles with every failure
+OUTBOX_MAX_RETRY_DELAY = 3600
+
+# New jobs are fanned out to matching JobAlert subscribers in batches, one mail connection per batch
+JOB_ALERT_BATCH_SIZE = config('JOB_ALERT_BATCH_SIZE', default=500, cast=int)
+JOB_ALERT_BATCHES_PER_TASK = 20
+
+# Bulk job import (POST /api/jobs/import/, manage.py import_jobs)
+JOB_IMPORT_CHUNK_SIZE = config('JOB_IMPORT_CHUNK_SIZE', default=2000, cast=int)
+JOB_IMPORT_MAX_ERRORS = 1000  # Row errors listed in the report; the rest are only counted
+
+# Search facets (GET /api/jobs/search/?facets=true)
+JOB_SALARY_BUCKETS = [1000, 2500, 5000, 10000]  # Ascending bucket edges
+JOB_FACET_LOCATION_LIMIT = 20
+
+# Streaming exports (GET /api/jobs/export/<jobs|applicants>.<csv|jsonl>)
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched per round trip from the server-side cursor
+EXPORT_BUFFER_SIZE = 64 * 1024  # Bytes per streamed block
+
+# Per-request Server-Timing header and log line (job_portal.instrumentation)
+PERFORMANCE_INSTRUMENTATION = config('PERFORMANCE_INSTRUMENTATION', default=False, cast=bool)
+PERFORMANCE_QUERY_BUDGET = config('PERFORMANCE_QUERY_BUDGET', default=20, cast=int)  # Queries per request
+PERFORMANCE_LATENCY_BUDGET_MS = config('PERFORMANCE_LATENCY_BUDGET_MS', default=500, cast=int)
+
 
 
 
@@ -177,6 +225,19 @@ cloudinary.config(
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
 
+# Job banners are staged on local disk by the web process and uploaded by a Celery worker.
+# Set BANNER_STORAGE_BACKEND=apps.jobs.storage.LocalBannerStorage to run without Cloudinary.
+BANNER_STORAGE_BACKEND = config('BANNER_STORAGE_BACKEND', default='apps.jobs.storage.CloudinaryBannerStorage')
+BANNER_STAGING_ROOT = config('BANNER_STAGING_ROOT', default=str(BASE_DIR / 'media' / 'banner_staging'))
+BANNER_LOCAL_ROOT = config('BANNER_LOCAL_ROOT', default=str(BASE_DIR / 'media' / 'banners'))
+BANNER_LOCAL_URL = '/media/banners/'
+BANNER_VARIANTS = {
+    'thumbnail': (150, 150),
+    'card': (480, 270),
+    'hero': (1200, 400),
+}
+
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True  # Crucial for JWT
@@ -196,8 +257,54 @@ CORS_ALLOW_HEADERS = (
 
 
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+
+
+# Cache: Redis by default (same server as the Celery broker, separate database),
+# shared by every web and worker process through a bounded connection pool.
+# Set CACHE_URL=locmem:// to use a per-process in-memory cache, e.g. in tests.
+CACHE_URL = config('CACHE_URL', default='redis://localhost:6379/1')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'job_portal.cache.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'job_portal',
+            'OPTIONS': {
+                'max_connections': config('CACHE_MAX_CONNECTIONS', default=50, cast=int),
+                'socket_connect_timeout': 0.5,  # Seconds; a dead cache must not stall requests
+                'socket_timeout': 0.5,
+                'health_check_interval': 30,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'job_portal.cache.LocMemCache',
+            'KEY_PREFIX': 'job_portal',
+        }
+    }
+
+CACHE_STATS_FLUSH_EVERY = 100  # Lookups counted locally before adding them to the shared totals
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)  # Seconds
+JOBS_CACHE_ALIAS = 'default'
+JOBS_CACHE_TIMEOUT = config('JOBS_CACHE_TIMEOUT', default=300, cast=int)  # Seconds
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+CELERY_BEAT_SCHEDULE = {
+    'relay-outbox': {
+        'task': 'apps.accounts.tasks.relay_outbox',
+        'schedule': 2.0,  # Seconds; `manage.py relay_outbox --loop` is an alternative
+    },
+    'send-queued-emails': {
+        'task': 'apps.accounts.tasks.send_queued_emails',
+        'schedule': 10.0,  # Seconds
+    },
+    'reconcile-active-job-counts': {
+        'task': 'apps.jobs.tasks.reconcile_active_job_counts',
+        'schedule': 3600.0,  # Seconds
+    },
+}
 
 
 LOGGING = {
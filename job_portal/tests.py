@@ -0,0 +1,209 @@
+import re
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, router, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.serializers import BaseSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+from apps.jobs.models import Category, Job
+from . import instrumentation
+from .db_routing import ReplicaRoutingMiddleware, pin_key, read_from_primary
+from .instrumentation import PerformanceMiddleware, RequestMetrics, install_serializer_hooks
+
+
+@override_settings(REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Routing decisions of ReplicaRoutingMiddleware and PrimaryReplicaRouter,
+    with one replica alias named but never queried. A TransactionTestCase,
+    because TestCase's transaction would make every read an atomic() read.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user('routing@example.com', 'password', role=User.Role.ORGANIZATION)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        with mock.patch('job_portal.db_routing.replica_aliases', return_value=['replica_0']):
+            self.middleware = ReplicaRoutingMiddleware(self.view)
+
+    def view(self, request):
+        """Record where reads would go at each point of the request."""
+        self.routes = {'read': router.db_for_read(Job)}
+        with transaction.atomic():
+            self.routes['atomic read'] = router.db_for_read(Job)
+        with read_from_primary():
+            self.routes['primary read'] = router.db_for_read(Job)
+        self.routes['read after primary block'] = router.db_for_read(Job)
+        if request.GET.get('write'):
+            self.routes['write'] = router.db_for_write(Category)
+            Category.objects.create(title=request.GET['write'])
+            self.routes['read after write'] = router.db_for_read(Job)
+        return HttpResponse()
+
+    def request(self, method='get', path='/api/jobs/', token=None, **params):
+        headers = {'HTTP_AUTHORIZATION': f'JP {token}'} if token else {}
+        self.middleware(getattr(self.factory, method)(path, params, **headers))
+        return self.routes
+
+    def test_safe_reads_go_to_the_replica(self):
+        for method in ('get', 'head', 'options'):
+            self.assertEqual(self.request(method)['read'], 'replica_0', method)
+        routes = self.request()
+        self.assertEqual(routes['primary read'], 'default')
+        self.assertEqual(routes['read after primary block'], 'replica_0')
+
+    def test_writes_and_atomic_reads_go_to_the_primary(self):
+        routes = self.request(write='Routing')
+        self.assertEqual(routes['atomic read'], 'default')
+        self.assertEqual(routes['write'], 'default')
+        self.assertEqual(routes['read after write'], 'default')
+        self.assertTrue(Category.objects.filter(title='Routing').exists())
+
+    def test_unsafe_methods_never_reach_the_replica(self):
+        for method in ('post', 'put', 'patch', 'delete'):
+            routes = self.request(method)
+            self.assertEqual(set(routes.values()), {'default'}, method)
+
+    def test_user_who_wrote_is_pinned_to_the_primary(self):
+        self.request(token=self.token, write='Pinned')
+        self.assertIsNotNone(cache.get(pin_key(self.user.id)))
+        self.assertEqual(self.request(token=self.token)['read'], 'default')
+        # Someone else, and anonymous requests, still read from the replica
+        other = User.objects.create_user('other@example.com', 'password', role=User.Role.JOB_SEEKER)
+        self.assertEqual(self.request(token=str(RefreshToken.for_user(other).access_token))['read'], 'replica_0')
+        self.assertEqual(self.request()['read'], 'replica_0')
+
+    @override_settings(REPLICA_PIN_SECONDS=1)
+    def test_pin_expires_after_the_window(self):
+        self.request(token=self.token, write='Expiring')
+        self.assertEqual(self.request(token=self.token)['read'], 'default')
+        time.sleep(1.1)
+        self.assertEqual(self.request(token=self.token)['read'], 'replica_0')
+
+    def test_anonymous_and_invalid_token_writes_pin_nobody(self):
+        self.request(write='Anonymous')
+        self.request(token='not-a-token', write='Invalid')
+        self.assertEqual(self.request(token=self.token)['read'], 'replica_0')
+
+    def test_queries_outside_requests_use_the_primary(self):
+        self.assertEqual(router.db_for_read(Job), 'default')
+        self.assertEqual(router.db_for_write(Job), 'default')
+
+    def test_middleware_is_not_used_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(self.view)
+
+
+def remove_serializer_hooks():
+    """Undo install_serializer_hooks(), so each test starts from plain DRF serializers."""
+    if getattr(BaseSerializer.is_valid, 'instrumented', False):
+        BaseSerializer.is_valid = BaseSerializer.is_valid.__wrapped__
+        BaseSerializer.data = property(BaseSerializer.data.fget.__wrapped__)
+
+
+class TagInput(serializers.Serializer):
+    title = serializers.CharField(max_length=20)
+
+    def validate_title(self, value):
+        if value == 'invalid':
+            raise serializers.ValidationError('Not allowed.')
+        return value.strip()
+
+
+class JobInput(serializers.Serializer):
+    title = serializers.CharField()
+    salary = serializers.IntegerField(min_value=0)
+    tags = TagInput(many=True)
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        remove_serializer_hooks()
+        self.addCleanup(remove_serializer_hooks)
+        cache.clear()
+
+    def server_timing(self, response):
+        """{metric name: {parameter: value}} from the Server-Timing header."""
+        metrics = {}
+        for entry in re.split(r', (?=[a-z]+(?:;|$))', response['Server-Timing']):
+            name, *params = entry.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=True)
+    def test_server_timing_reports_the_request(self):
+        Category.objects.create(title='Timing')
+        client = Client()
+        with CaptureQueriesContext(connection) as queries, self.assertLogs('job_portal.performance', 'INFO') as logs:
+            response = client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+
+        metrics = self.server_timing(response)
+        self.assertEqual(list(metrics), ['db', 'ser', 'view', 'render', 'cache', 'total'])
+        self.assertEqual(metrics['db']['desc'], f'"{len(queries)} queries"')
+        self.assertGreater(len(queries), 0)
+        for name in ('db', 'ser', 'view', 'render', 'total'):
+            self.assertGreaterEqual(float(metrics[name]['dur']), 0, name)
+        self.assertLessEqual(float(metrics['db']['dur']), float(metrics['total']['dur']))
+        self.assertRegex(metrics['cache']['desc'], r'^"0 hits, [1-9]\d* misses"$')
+
+        [record] = logs.records
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertEqual(record.performance['queries'], len(queries))
+        self.assertIn('path=/api/categories/ status=200', record.getMessage())
+
+        # Served again from the cache
+        with CaptureQueriesContext(connection) as queries:
+            metrics = self.server_timing(client.get('/api/categories/'))
+        self.assertRegex(metrics['cache']['desc'], r'^"[1-9]\d* hits, 0 misses"$')
+        self.assertEqual(metrics['db']['desc'], f'"{len(queries)} queries"')
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=True, PERFORMANCE_QUERY_BUDGET=0)
+    def test_requests_over_budget_are_warnings(self):
+        with self.assertLogs('job_portal.performance', 'INFO') as logs:
+            Client().get('/api/categories/')
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        self.assertEqual(logs.records[0].performance['over_budget'], ['queries'])
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=False)
+    def test_disabled_middleware_removes_itself_and_leaves_serializers_alone(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PerformanceMiddleware(lambda request: HttpResponse())
+        response = Client().get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+        self.assertFalse(getattr(BaseSerializer.is_valid, 'instrumented', False))
+
+    def test_hooks_do_not_change_serializer_behaviour(self):
+        inputs = [
+            {'title': 'Engineer', 'salary': 10, 'tags': [{'title': ' python '}]},
+            {'title': 'Engineer', 'salary': -1, 'tags': [{'title': 'invalid'}, {'title': 'x' * 30}]},
+            [{'title': 'One', 'salary': 1, 'tags': []}, {'salary': 'lots', 'tags': None}],
+        ]
+
+        def run(data):
+            serializer = JobInput(data=data, many=isinstance(data, list))
+            return serializer.is_valid(), serializer.errors, serializer.data if not serializer.errors else None
+
+        plain = [run(data) for data in inputs]
+        install_serializer_hooks()
+        self.assertTrue(BaseSerializer.is_valid.instrumented)
+        self.assertEqual([run(data) for data in inputs], plain)  # Outside a request
+
+        metrics = RequestMetrics()
+        token = instrumentation._current.set(metrics)
+        try:
+            self.assertEqual([run(data) for data in inputs], plain)  # Measured, inside a request
+        finally:
+            instrumentation._current.reset(token)
+        self.assertGreater(metrics.serializer_time, 0)
+        self.assertEqual(metrics._serializer_depth, 0)
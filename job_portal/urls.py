@@ -16,8 +16,10 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .views import CacheStatsView
 
 api_urlpatterns = [
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
     path('', include('apps.accounts.urls')),
     path('', include('apps.jobs.urls')),
 ]
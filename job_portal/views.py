@@ -0,0 +1,15 @@
+from django.core.cache import cache
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import stats
+
+
+class CacheStatsView(APIView):
+    """Cache hit/miss totals per key namespace, across all processes (staff only)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(stats.snapshot(cache))